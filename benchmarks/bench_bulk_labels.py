@@ -0,0 +1,61 @@
+"""Compares looped set_label/get_object_labels/clear_labels calls against the bulk datastore operations.
+
+Run with: python -m benchmarks.bench_bulk_labels [member count]
+"""
+
+from dippy.labels.memory_store import MemoryStore
+from dippy.labels.sqlite_store import SqliteStore
+import gc
+import sys
+import time
+
+
+def looped(store, members):
+    start = time.perf_counter()
+    for member_id in members:
+        store.set_label("user", member_id, "role", "member")
+    set_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    [store.get_object_labels("user", member_id) for member_id in members]
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for member_id in members:
+        store.clear_labels("user", member_id)
+    return set_time, get_time, time.perf_counter() - start
+
+
+def bulk(store, members):
+    start = time.perf_counter()
+    store.set_labels_many(
+        ("user", member_id, "role", "member") for member_id in members
+    )
+    set_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.get_object_labels_many(("user", member_id) for member_id in members)
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.clear_labels_many(("user", member_id) for member_id in members)
+    return set_time, get_time, time.perf_counter() - start
+
+
+def main(member_count: int):
+    # Collections triggered by the stores' allocations would otherwise be timed as part of whichever operation is running
+    gc.disable()
+    members = range(member_count)
+    print(f"{member_count} members, labels per second")
+    print(f"{'store':>8}  {'mode':>6}  {'set':>12}  {'get':>12}  {'clear':>12}")
+    for name, store_type in (("memory", MemoryStore), ("sqlite", SqliteStore)):
+        for mode, run in (("looped", looped), ("bulk", bulk)):
+            timings = run(store_type(), members)
+            print(
+                f"{name:>8}  {mode:>6}  "
+                + "  ".join(f"{member_count / timing:>12,.0f}" for timing in timings)
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
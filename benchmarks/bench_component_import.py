@@ -0,0 +1,92 @@
+"""Compares a cold component import, with no cached bytecode, and a warm import, with bytecode cached in __pycache__,
+when component files are imported serially and on a thread pool, and the startup cost of the lazy activation policy,
+which only registers event stubs. Compiling holds the GIL, so the thread pool only gains from overlapping file reads
+with running modules and gains nothing on a single core.
+
+Run with: python -m benchmarks.bench_component_import [component count]
+"""
+
+from dippy.components import Component
+from dippy.components.manager import ComponentManager
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+import bevy
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+COMPONENT = '''
+from dippy.components import Component, event_handler
+
+
+class Component{index}(Component):
+    """A component with enough code to make compiling it noticeable."""
+
+    @event_handler("event_{index}")
+    async def on_event(self, event):
+        return event
+
+{methods}
+'''
+
+METHOD = """    async def on_event_{index}(self, event):
+        values = [value * {index} for value in range(10) if value % 2]
+        return {{"total": sum(values), "event": event, "name": "event_{index}"}}
+"""
+
+
+def write_components(app_path: pathlib.Path, component_count: int):
+    location = app_path / "components"
+    location.mkdir()
+    methods = "\n".join(METHOD.format(index=index) for index in range(40))
+    for index in range(component_count):
+        (location / f"component_{index}.py").write_text(
+            COMPONENT.format(index=index, methods=methods)
+        )
+
+
+def load(app_path: pathlib.Path, settings: str) -> float:
+    (app_path / "config.yaml").write_text(
+        "components:\n  groups:\n    - location: components\n" + settings
+    )
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(app_path), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    manager = context.create(ComponentManager, "bench")
+    Component.__components__.clear()
+    start = time.perf_counter()
+    manager.load_components(app_path)
+    return time.perf_counter() - start
+
+
+def main(component_count: int):
+    # The warm runs need the bytecode cache even when PYTHONDONTWRITEBYTECODE is set
+    sys.dont_write_bytecode = False
+    with tempfile.TemporaryDirectory() as directory:
+        app_path = pathlib.Path(directory)
+        write_components(app_path, component_count)
+        print(f"{component_count} component files")
+        lazy_events = "".join(
+            f"        component_{index}: [event_{index}]\n"
+            for index in range(component_count)
+        )
+        for mode, settings in (
+            ("serial", ""),
+            ("parallel", "  parallel_import: true\n"),
+            ("lazy", "      activation: LAZY\n      events:\n" + lazy_events),
+        ):
+            shutil.rmtree(app_path / "components" / "__pycache__", ignore_errors=True)
+            cold = load(app_path, settings)
+            warm = min(load(app_path, settings) for _ in range(3))
+            print(
+                f"  {mode:>8}  cold {cold * 1000:>8.1f}ms  warm {warm * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150)
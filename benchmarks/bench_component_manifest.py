@@ -0,0 +1,57 @@
+"""Compares startup of a lazily activated component group that does not declare its events in the config, without a
+component manifest, where every file is scanned and imported, and with a warm manifest, where the directory listing
+and each file's events come from the manifest and only event stubs are registered.
+
+Run with: python -m benchmarks.bench_component_manifest [component count]
+"""
+
+from benchmarks.bench_component_import import write_components
+from dippy.components import Component
+from dippy.components.manager import ComponentManager
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+import bevy
+import pathlib
+import sys
+import tempfile
+import time
+
+
+def start(app_path: pathlib.Path, manifest: bool):
+    (app_path / "config.yaml").write_text(
+        "components:\n"
+        "  groups:\n"
+        "    - location: components\n"
+        "      activation: LAZY\n"
+        + ("  manifest: .manifest.json\n" if manifest else "")
+    )
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(app_path), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    manager = context.create(ComponentManager, "bench")
+    Component.__components__.clear()
+    started = time.perf_counter()
+    manager.load_components(app_path)
+    manager.create_components()
+    return time.perf_counter() - started, len(manager.components)
+
+
+def main(component_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        app_path = pathlib.Path(directory)
+        write_components(app_path, component_count)
+        print(f"{component_count} component files")
+        for name, manifest in (
+            ("no manifest", False),
+            ("manifest cold", True),
+            ("manifest warm", True),
+        ):
+            elapsed, created = start(app_path, manifest)
+            print(f"  {name:>14}  {elapsed * 1000:>8.1f}ms  {created:>4} created")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150)
@@ -0,0 +1,72 @@
+"""Simulates bot startup creating a logger for each of several hundred components, counting how many times the config
+file is parsed and the logging settings are validated with and without the ConfigManager cache.
+
+Run with: python -m benchmarks.bench_config [component count]
+"""
+
+from dippy.config import ConfigManager
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigLoader
+from dippy.logging import Logging
+import bevy
+import pathlib
+import sys
+import tempfile
+import time
+
+CONFIG = """
+logging:
+  level: info
+  global_level: warn
+components:
+  groups:
+"""
+
+
+def startup(config_dir: pathlib.Path, component_count: int, **options):
+    parses = 0
+
+    def counting_loader(file_path):
+        nonlocal parses
+        parses += 1
+        return yaml_loader.load(file_path)
+
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(config_dir),
+            config_files=("production.yaml",),
+            config_loaders=(ConfigLoader("yaml", r"\.ya?ml$", counting_loader),),
+            **options,
+        )
+    )
+
+    start = time.perf_counter()
+    loggers = [
+        context.create(Logging, f"bot.component_{index}")
+        for index in range(component_count)
+    ]
+    elapsed = time.perf_counter() - start
+    validations = len({id(logger.settings) for logger in loggers})
+    return elapsed, parses, validations
+
+
+def main(component_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        config_dir = pathlib.Path(directory)
+        (config_dir / "production.yaml").write_text(
+            CONFIG + "".join(f"    - location: group_{i}\n" for i in range(200))
+        )
+        print(f"{component_count} components")
+        for name, options in (("uncached", {"cache_size": 0}), ("cached", {})):
+            elapsed, parses, validations = startup(
+                config_dir, component_count, **options
+            )
+            print(
+                f"  {name:>8}  {elapsed * 1000:>8.1f}ms  {parses:>4} parses"
+                f"  {validations:>4} validations"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,51 @@
+"""Compares parsing a large per-guild YAML config with the pure Python SafeLoader, the libyaml CSafeLoader used by
+yaml_loader, and a warm snapshot_loader.
+
+Run with: python -m benchmarks.bench_config_loaders [guild count]
+"""
+
+from dippy.config.loaders import snapshot_loader, yaml_loader
+import pathlib
+import sys
+import tempfile
+import timeit
+import yaml
+
+
+def write_config(path: pathlib.Path, guild_count: int):
+    guilds = {
+        f"guild_{guild_id}": {
+            "prefix": "!",
+            "channels": list(range(10)),
+            "roles": {"admin": guild_id, "moderator": guild_id + 1},
+            "enabled": True,
+        }
+        for guild_id in range(guild_count)
+    }
+    path.write_text(yaml.safe_dump({"logging": {"level": "info"}, "guilds": guilds}))
+
+
+def pure_python_loader(path: pathlib.Path):
+    with path.open("r") as yaml_file:
+        return yaml.safe_load(yaml_file)
+
+
+def main(guild_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "production.yaml"
+        write_config(path, guild_count)
+        snapshot = snapshot_loader(yaml_loader)
+        snapshot.load(path)
+
+        print(f"{guild_count} guilds, {path.stat().st_size / 1024:.0f}KiB")
+        for name, load in (
+            ("SafeLoader", pure_python_loader),
+            ("CSafeLoader", yaml_loader.load),
+            ("snapshot", snapshot.load),
+        ):
+            elapsed = min(timeit.repeat(lambda: load(path), number=1, repeat=3))
+            print(f"  {name:>12}  {elapsed * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
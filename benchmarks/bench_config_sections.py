@@ -0,0 +1,75 @@
+"""Compares loading one guild's section of a per-guild YAML config by parsing the whole file and with a lazy
+ConfigManager, across file sizes. Reports the time and peak memory of a single key read after the section index has
+been built, and the one time cost of building the index.
+
+Run with: python -m benchmarks.bench_config_sections [largest guild count]
+"""
+
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+import yaml
+
+
+def write_config(path: pathlib.Path, guild_count: int):
+    guilds = {
+        f"guild_{guild_id}": {
+            "prefix": "!",
+            "channels": list(range(10)),
+            "roles": {"admin": guild_id, "moderator": guild_id + 1},
+            "enabled": True,
+        }
+        for guild_id in range(guild_count)
+    }
+    path.write_text(yaml.safe_dump(guilds))
+
+
+def measure(load):
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(largest: int):
+    guild_counts = [count for count in (1_000, 10_000) if count < largest]
+    print(
+        f"{'guilds':>8}  {'size':>8}  {'full parse':>22}  {'lazy key':>20}  {'index':>10}"
+    )
+    for guild_count in guild_counts + [largest]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "production.yaml"
+            write_config(path, guild_count)
+            key = f"guild_{guild_count // 2}"
+
+            eager = ConfigManager(directory, config_loaders=[yaml_loader], cache_size=0)
+            lazy = ConfigManager(
+                directory, config_loaders=[yaml_loader], cache_size=0, lazy=True
+            )
+            start = time.perf_counter()
+            lazy.load("production.yaml", key=key)
+            index_time = time.perf_counter() - start
+            full_time, full_peak = measure(
+                lambda: eager.load("production.yaml", key=key)
+            )
+            lazy_time, lazy_peak = measure(
+                lambda: lazy.load("production.yaml", key=key)
+            )
+            print(
+                f"{guild_count:>8}  {path.stat().st_size / 1024:>6.0f}KiB"
+                f"  {full_time * 1000:>9.2f}ms {full_peak / 1024:>8.0f}KiB"
+                f"  {lazy_time * 1000:>7.3f}ms {lazy_peak / 1024:>8.1f}KiB"
+                f"  {index_time * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,63 @@
+"""Runs the same label workload against MemoryStore and SqliteStore.
+
+Run with: python -m benchmarks.bench_datastores [object count]
+"""
+
+from dippy.labels.datastore import Datastore
+from dippy.labels.memory_store import MemoryStore
+from dippy.labels.sqlite_store import SqliteStore
+import contextlib
+import pathlib
+import sys
+import tempfile
+import time
+
+
+def workload(store: Datastore, object_count: int) -> dict:
+    timings = {}
+    batch = getattr(store, "batch", contextlib.nullcontext)
+
+    start = time.perf_counter()
+    with batch():
+        for object_id in range(object_count):
+            store.set_label("user", object_id, "team", f"team-{object_id % 100}")
+    timings["set"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for object_id in range(0, object_count, max(object_count // 1000, 1)):
+        store.get_object_labels("user", object_id)
+    timings["get object x1000"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for team in range(100):
+        store.get_labels(team=f"team-{team}")
+    timings["query x100"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.update_label("flag", True, team="team-7")
+    timings["update"] = time.perf_counter() - start
+    return timings
+
+
+def main(object_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            "memory": MemoryStore(),
+            "sqlite": SqliteStore(pathlib.Path(directory) / "labels.db"),
+        }
+        results = {
+            name: workload(store, object_count) for name, store in stores.items()
+        }
+        stores["sqlite"].close()
+
+    print(f"{object_count} objects")
+    print(f"{'operation':>18}  {'memory':>10}  {'sqlite':>10}")
+    for operation in results["memory"]:
+        print(
+            f"{operation:>18}  {results['memory'][operation] * 1000:>8.2f}ms"
+            f"  {results['sqlite'][operation] * 1000:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,62 @@
+"""Measures memory and construction time of Event against the dataclass it replaced.
+
+Run with: python -m benchmarks.bench_event
+"""
+
+from dataclasses import dataclass, field
+from dippy.filters.event import Event, FrozenEvent
+from types import SimpleNamespace
+from typing import Optional, Set
+import timeit
+import tracemalloc
+
+
+@dataclass
+class DataclassEvent:
+    guild_id: Optional[int] = None
+    channel_id: Optional[int] = None
+    role_ids: Set[int] = field(default_factory=set)
+    member_id: Optional[int] = None
+    labels: Set[str] = field(default_factory=set)
+
+
+def allocated_per_event(event_type, count: int = 100_000) -> float:
+    tracemalloc.start()
+    events = [
+        event_type(guild_id=index, channel_id=index, member_id=index)
+        for index in range(count)
+    ]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return allocated / count
+
+
+def main(number: int = 200_000):
+    message = SimpleNamespace(
+        guild=SimpleNamespace(id=1),
+        channel=SimpleNamespace(id=2),
+        author=SimpleNamespace(id=3, roles=[]),
+    )
+    print(f"{'event':>16}  {'bytes/event':>12}  {'construct':>10}")
+    for event_type in (DataclassEvent, Event, FrozenEvent):
+        construct = min(
+            timeit.repeat(
+                lambda: event_type(guild_id=1, channel_id=2, member_id=3),
+                number=number,
+                repeat=3,
+            )
+        )
+        print(
+            f"{event_type.__name__:>16}  {allocated_per_event(event_type):>12.0f}"
+            f"  {construct / number * 1e9:>8.0f}ns"
+        )
+
+    from_message = min(
+        timeit.repeat(lambda: Event.from_message(message), number=number, repeat=3)
+    )
+    print(f"Event.from_message  {from_message / number * 1e9:.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
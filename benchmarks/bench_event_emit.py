@@ -0,0 +1,50 @@
+"""Measures the cost of EventHub.emit per handler count with strongly and weakly held handlers, using handlers that
+return immediately so the dispatch itself dominates.
+
+Run with: python -m benchmarks.bench_event_emit
+"""
+
+from dippy.events import EventHub
+import asyncio
+import time
+
+EMITS = 2_000
+
+
+class Listener:
+    async def handle(self, event):
+        pass
+
+
+def create_hub(handler_count: int, weak: bool):
+    hub = EventHub(weak_handlers=weak)
+    listeners = [Listener() for _ in range(handler_count)]
+    for listener in listeners:
+        hub.on("message", listener.handle)
+    return hub, listeners
+
+
+async def measure(hub: EventHub) -> float:
+    start = time.perf_counter()
+    for _ in range(EMITS):
+        await hub.emit("message", None)
+    return (time.perf_counter() - start) / EMITS
+
+
+def main():
+    print(
+        f"{'handlers':>8}  {'strong':>10}  {'per handler':>11}  {'weak':>10}  {'per handler':>11}"
+    )
+    for handler_count in (1, 10, 100, 1000):
+        strong_hub, strong_listeners = create_hub(handler_count, False)
+        weak_hub, weak_listeners = create_hub(handler_count, True)
+        strong = asyncio.run(measure(strong_hub))
+        weak = asyncio.run(measure(weak_hub))
+        print(
+            f"{handler_count:>8}  {strong * 1e6:>8.1f}µs  {strong / handler_count * 1e6:>9.2f}µs"
+            f"  {weak * 1e6:>8.1f}µs  {weak / handler_count * 1e6:>9.2f}µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
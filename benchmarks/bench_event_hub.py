@@ -0,0 +1,48 @@
+"""Measures EventHub.emit latency with slow handlers in sequential and concurrent modes.
+
+Run with: python -m benchmarks.bench_event_hub
+"""
+
+from dippy.events import EventHub
+import asyncio
+import time
+
+HANDLER_DELAY = 0.01
+
+
+def create_hub(handler_count: int, **options) -> EventHub:
+    hub = EventHub(**options)
+    for _ in range(handler_count):
+
+        async def handler(event):
+            await asyncio.sleep(HANDLER_DELAY)
+
+        hub.on("message", handler)
+    return hub
+
+
+async def measure(hub: EventHub, rounds: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await hub.emit("message", None)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    print(
+        f"{'handlers':>8}  {'sequential':>12}  {'concurrent':>12}  {'bounded(8)':>12}"
+    )
+    for handler_count in (1, 10, 50, 100):
+        sequential = asyncio.run(measure(create_hub(handler_count)))
+        concurrent = asyncio.run(measure(create_hub(handler_count, concurrent=True)))
+        bounded = asyncio.run(
+            measure(create_hub(handler_count, concurrent=True, max_concurrency=8))
+        )
+        print(
+            f"{handler_count:>8}  {sequential * 1000:>10.2f}ms  {concurrent * 1000:>10.2f}ms"
+            f"  {bounded * 1000:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
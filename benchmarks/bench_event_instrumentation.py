@@ -0,0 +1,48 @@
+"""Measures the overhead EventHubInstrumentation adds to EventHub.emit with handlers that return immediately, the
+worst case for the instrumentation's share of the time.
+
+Run with: python -m benchmarks.bench_event_instrumentation
+"""
+
+from dippy.events import EventHub, EventHubInstrumentation
+import asyncio
+import time
+
+EMITS = 20_000
+
+
+def create_hub(handler_count: int, **options) -> EventHub:
+    hub = EventHub(**options)
+    for _ in range(handler_count):
+
+        async def handler(event):
+            pass
+
+        hub.on("message", handler)
+    return hub
+
+
+async def measure(hub: EventHub) -> float:
+    start = time.perf_counter()
+    for _ in range(EMITS):
+        await hub.emit("message", None)
+    return (time.perf_counter() - start) / EMITS
+
+
+def main():
+    print(f"{'handlers':>8}  {'plain':>10}  {'instrumented':>12}  {'overhead':>10}")
+    for handler_count in (1, 10, 50):
+        plain = asyncio.run(measure(create_hub(handler_count)))
+        instrumented = asyncio.run(
+            measure(
+                create_hub(handler_count, instrumentation=EventHubInstrumentation())
+            )
+        )
+        print(
+            f"{handler_count:>8}  {plain * 1e6:>8.1f}µs  {instrumented * 1e6:>10.1f}µs"
+            f"  {(instrumented - plain) / handler_count * 1e6:>6.2f}µs/handler"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compares emitting an event to handlers that each check their own filter against handlers routed by the EventHub
+filter index, with one handler per guild.
+
+Run with: python -m benchmarks.bench_event_routing [handler count]
+"""
+
+from dippy.events import EventHub
+from dippy.filters.event import Event
+from dippy.filters.filters import ChannelFilter, GuildFilter
+import asyncio
+import sys
+import time
+
+
+def self_filtering_hub(handler_count: int) -> EventHub:
+    hub = EventHub()
+    for guild_id in range(handler_count):
+        filter_ = GuildFilter(guild_id) & ~ChannelFilter(0)
+
+        async def handler(event, filter_=filter_):
+            if filter_.matches(event):
+                pass
+
+        hub.on("message", handler)
+    return hub
+
+
+def routed_hub(handler_count: int) -> EventHub:
+    hub = EventHub()
+    for guild_id in range(handler_count):
+
+        async def handler(event):
+            pass
+
+        hub.on("message", handler, GuildFilter(guild_id) & ~ChannelFilter(0))
+    return hub
+
+
+async def measure(hub: EventHub, handler_count: int, rounds: int = 2_000) -> float:
+    events = [
+        Event(guild_id=guild_id % handler_count, channel_id=1)
+        for guild_id in range(rounds)
+    ]
+    start = time.perf_counter()
+    for event in events:
+        await hub.emit("message", event)
+    return (time.perf_counter() - start) / rounds
+
+
+def main(handler_count: int):
+    self_filtering = asyncio.run(
+        measure(self_filtering_hub(handler_count), handler_count)
+    )
+    routed = asyncio.run(measure(routed_hub(handler_count), handler_count))
+    print(f"{handler_count} handlers over {handler_count} guilds, per emit")
+    print(f"  self filtering  {self_filtering * 1e6:>10.1f}us")
+    print(f"  routed          {routed * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
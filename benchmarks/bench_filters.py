@@ -0,0 +1,61 @@
+"""Compares interpreted BaseFilter.matches against compiled filter predicates.
+
+Run with: python -m benchmarks.bench_filters
+"""
+
+from dippy.filters.event import Event
+from dippy.filters.filters import (
+    ChannelFilter,
+    GuildFilter,
+    LabelFilter,
+    RoleFilter,
+    UserFilter,
+)
+import timeit
+
+
+def build_filters():
+    simple = GuildFilter(1) & ChannelFilter(2)
+    wide = GuildFilter(1)
+    for guild_id in range(2, 50):
+        wide = wide | GuildFilter(guild_id)
+    deep = GuildFilter(1)
+    for depth in range(10):
+        deep = ~~(deep | (ChannelFilter(depth) & ~UserFilter(depth)))
+    mixed = (
+        (GuildFilter(1) | GuildFilter(2))
+        & ~UserFilter(3)
+        & (LabelFilter("staff") | RoleFilter(4))
+    )
+    return {"simple": simple, "wide": wide, "deep": deep, "mixed": mixed}
+
+
+def main(number: int = 100_000):
+    events = [
+        Event(guild_id=49, channel_id=2, member_id=5, labels={"staff"}),
+        Event(guild_id=7, channel_id=9, member_id=3, role_ids={4}),
+    ]
+    print(f"{'filter':>8}  {'matches':>10}  {'compiled':>10}  {'speedup':>8}")
+    for name, filter_ in build_filters().items():
+        predicate = filter_.compile()
+        interpreted = min(
+            timeit.repeat(
+                lambda: [filter_.matches(event) for event in events],
+                number=number,
+                repeat=3,
+            )
+        )
+        compiled = min(
+            timeit.repeat(
+                lambda: [predicate(event) for event in events], number=number, repeat=3
+            )
+        )
+        print(
+            f"{name:>8}  {interpreted / number * 1e9 / len(events):>8.0f}ns"
+            f"  {compiled / number * 1e9 / len(events):>8.0f}ns"
+            f"  {interpreted / compiled:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
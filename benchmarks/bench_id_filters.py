@@ -0,0 +1,31 @@
+"""Measures Guild/Channel/User filter matching as the number of allow-listed IDs grows, compared with the tuple scan
+the filters used before they were backed by sets.
+
+Run with: python -m benchmarks.bench_id_filters
+"""
+
+from dippy.filters.event import Event
+from dippy.filters.filters import ChannelFilter
+import timeit
+
+
+def main(number: int = 100_000):
+    print(f"{'ids':>6}  {'tuple scan':>10}  {'set':>10}")
+    for id_count in (10, 100, 1_000, 10_000):
+        ids = tuple(range(id_count))
+        filter_ = ChannelFilter(*ids)
+        missing = Event(channel_id=-1)
+        tuple_time = min(
+            timeit.repeat(lambda: missing.channel_id in ids, number=number, repeat=3)
+        )
+        set_time = min(
+            timeit.repeat(lambda: filter_.matches(missing), number=number, repeat=3)
+        )
+        print(
+            f"{id_count:>6}  {tuple_time / number * 1e9:>8.0f}ns"
+            f"  {set_time / number * 1e9:>8.0f}ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
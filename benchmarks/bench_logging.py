@@ -0,0 +1,120 @@
+"""Measures heavy debug logging from the event loop thread with the root handlers called directly and with the
+QueueHandler/QueueListener mode, writing to a file and to a sink that blocks for 50µs on every write, like a full pipe
+or a remote log collector. Reports the time the loop spends logging, the total time until every record is
+written, and the lag of a 1ms ticker task running on the loop while another task logs. Also compares the cost of a
+disabled debug call with an eagerly built f-string and with lazy %-style arguments.
+
+Run with: python -m benchmarks.bench_logging [record count]
+"""
+
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+from dippy.logging import Logging, start_queue_listener, stop_queue_listener
+import asyncio
+import bevy
+import logging
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+
+def create_logging(directory: pathlib.Path, level: str) -> Logging:
+    (directory / "config.yaml").write_text(f"logging:\n  level: {level}\n")
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(directory), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    return context.create(Logging, "bench.component")
+
+
+async def log_with_ticker(logger: Logging, record_count: int):
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    ticking = asyncio.get_running_loop().create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    for index in range(record_count):
+        logger.debug("Handled event %d for guild %s in %.3fms", index, 1234, 0.5)
+        if index % 100 == 0:
+            await asyncio.sleep(0)
+    logging_time = time.perf_counter() - started
+    done = True
+    await ticking
+    return logging_time, lags
+
+
+class BlockingHandler(logging.FileHandler):
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        time.sleep(0.00005)
+
+
+def run(directory: pathlib.Path, record_count: int, handler_type: type, queue: bool):
+    root = logging.getLogger()
+    handler = handler_type(directory / "bench.log")
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s  %(levelname)-5s  %(name)-32s  %(message)s")
+    )
+    root.handlers[:] = [handler]
+    root.setLevel(logging.DEBUG)
+    if queue:
+        start_queue_listener()
+
+    logger = create_logging(directory, "debug")
+    started = time.perf_counter()
+    logging_time, lags = asyncio.run(log_with_ticker(logger, record_count))
+    stop_queue_listener()
+    handler.close()
+    total_time = time.perf_counter() - started
+    lags.sort()
+    return logging_time, total_time, lags
+
+
+def main(record_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        print(f"{record_count} debug records")
+        for name, handler_type, queue in (
+            ("file direct", logging.FileHandler, False),
+            ("file queue", logging.FileHandler, True),
+            ("blocking direct", BlockingHandler, False),
+            ("blocking queue", BlockingHandler, True),
+        ):
+            logging_time, total_time, lags = run(
+                directory, record_count, handler_type, queue
+            )
+            print(
+                f"  {name:>15}  on loop {logging_time * 1000:>8.1f}ms"
+                f"  written {total_time * 1000:>8.1f}ms"
+                f"  tick lag median {statistics.median(lags) * 1000:.2f}ms"
+                f" p99 {lags[int(len(lags) * 0.99)] * 1000:.2f}ms"
+                f" max {lags[-1] * 1000:.2f}ms"
+            )
+
+        logger = create_logging(directory, "info")
+        guild = {"id": 1234, "name": "guild"}
+        eager = timeit.timeit(
+            lambda: logger.debug(f"Event for {guild}"), number=100_000
+        )
+        lazy = timeit.timeit(
+            lambda: logger.debug("Event for %s", guild), number=100_000
+        )
+        print("disabled debug call")
+        print(f"  f-string  {eager * 10:>6.2f}µs")
+        print(f"  %-style   {lazy * 10:>6.2f}µs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,50 @@
+"""Compares indexed MemoryStore label queries against a full scan of the store.
+
+Run with: python -m benchmarks.bench_memory_store [object counts...]
+"""
+
+from dippy.labels.memory_store import MemoryStore
+import sys
+import time
+
+
+def populate(object_count: int) -> MemoryStore:
+    store = MemoryStore()
+    for object_id in range(object_count):
+        store.set_label("user", object_id, "team", f"team-{object_id % 100}")
+        store.set_label("user", object_id, "active", object_id % 2 == 0)
+    return store
+
+
+def scan(store: MemoryStore, **labels):
+    """The query strategy MemoryStore used before it had indexes."""
+    results = []
+    for (object_type, object_id), object_labels in store.store.items():
+        item = dict(object_labels, object_type=object_type, object_id=object_id)
+        if all(key in item and item[key] == value for key, value in labels.items()):
+            results.append(item)
+    return results
+
+
+def timed(function, *args, rounds: int = 5, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function(*args, **kwargs)
+    return (time.perf_counter() - start) / rounds
+
+
+def main(object_counts):
+    print(f"{'objects':>9}  {'scan':>10}  {'indexed':>10}  {'update':>10}")
+    for object_count in object_counts:
+        store = populate(object_count)
+        scanned = timed(scan, store, team="team-7", active=False)
+        indexed = timed(store.get_labels, team="team-7", active=False)
+        updated = timed(store.update_label, "flag", True, team="team-7", rounds=1)
+        print(
+            f"{object_count:>9}  {scanned * 1000:>8.2f}ms  {indexed * 1000:>8.2f}ms"
+            f"  {updated * 1000:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,119 @@
+"""Measures exporting the metrics registry in the Prometheus text format for an instrumented event hub with many
+handlers, when no values have changed since the last export and when every value has changed, and counts the
+memory blocks an export allocates. Also times a scrape through the MetricsServer.
+
+Run with: python -m benchmarks.bench_metrics_export [events] [handlers per event]
+"""
+
+from dippy.events import EventHub, EventHubInstrumentation
+from dippy.metrics import MetricsRegistry, MetricsServer
+from dippy.metrics.collectors import EventHubCollector
+import asyncio
+import sys
+import time
+import tracemalloc
+
+ROUNDS = 50
+
+
+def create_registry(event_count: int, handler_count: int):
+    instrumentation = EventHubInstrumentation()
+    hub = EventHub(instrumentation=instrumentation)
+    for event in range(event_count):
+        for index in range(handler_count):
+
+            async def handler(data):
+                pass
+
+            handler.__qualname__ = f"handler_{index}"
+            hub.on(f"event_{event}", handler)
+
+    registry = MetricsRegistry()
+    registry.add_collector(EventHubCollector(registry, instrumentation))
+    return registry, hub
+
+
+async def emit_all(hub: EventHub, event_count: int):
+    for event in range(event_count):
+        await hub.emit(f"event_{event}", None)
+
+
+def measure(export, prepare=None) -> float:
+    total = 0.0
+    for _ in range(ROUNDS):
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        export()
+        total += time.perf_counter() - start
+    return total / ROUNDS
+
+
+def count_allocations(export) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    body = export()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del body
+    return sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "lineno")
+        if stat.count_diff > 0
+    )
+
+
+async def scrape(server: MetricsServer) -> float:
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await reader.read()
+    writer.close()
+    return time.perf_counter() - start
+
+
+async def measure_scrape(registry: MetricsRegistry) -> float:
+    server = MetricsServer(registry, port=0)
+    await server.start()
+    try:
+        total = 0.0
+        for _ in range(ROUNDS):
+            total += await scrape(server)
+        return total / ROUNDS
+    finally:
+        await server.stop()
+
+
+def main():
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    handler_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    registry, hub = create_registry(event_count, handler_count)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(emit_all(hub, event_count))
+
+    body = registry.export()
+    series = sum(len(metric.values) for metric in registry.metrics.values())
+    print(
+        f"{event_count} events x {handler_count} handlers: {series} series, "
+        f"{len(body.splitlines())} lines, {len(body) / 1024:.0f}KiB"
+    )
+
+    unchanged = measure(registry.export)
+    changed = measure(
+        registry.export, lambda: loop.run_until_complete(emit_all(hub, event_count))
+    )
+    print(f"  export, nothing changed   {unchanged * 1000:>7.2f}ms")
+    print(f"  export, everything changed{changed * 1000:>7.2f}ms")
+
+    registry.export()
+    print(
+        f"  blocks allocated by an unchanged export: {count_allocations(registry.export)}"
+    )
+    print(
+        f"  HTTP scrape               {loop.run_until_complete(measure_scrape(registry)) * 1000:>7.2f}ms"
+    )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,34 @@
 from dippy.components import ComponentManager
-from dippy.config import ConfigManager
+from dippy.config import ConfigFactory, ConfigManager
 from dippy.config.loaders import yaml_loader
 from dippy.config.manager import ConfigLoader
-from dippy.events import EventClient
+from dippy.events import EventHub, EventHubInstrumentation
 from dippy.logging import Logging
-from typing import Sequence, Union
+from dippy.metrics import MetricsRegistry, MetricsServer, MetricsSettingsModel
+from dippy.metrics.collectors import (
+    ComponentTimingCollector,
+    ConfigLoadMetrics,
+    EventHubCollector,
+)
+from typing import Optional, Sequence, Union
 import bevy
 import pathlib
 
 
 class Bot:
+    """ Creates the bot's components and runs the Discord client.
+
+    When metrics are enabled in the metrics config section, Bot.create instruments the event hub and the config
+    manager and run starts a MetricsServer on the event loop before connecting to Discord. It serves the event hub's
+    handler stats, the loop lag, config load times, component load and setup times, and any other metrics added to
+    the MetricsRegistry, such as a TimedDatastore's operation timings. """
+
     component_manager: ComponentManager
     config_manager: ConfigManager
     logger_factory: bevy.Factory[Logging]
+    metrics_config_factory: ConfigFactory[MetricsSettingsModel]
+    metrics: MetricsRegistry
+    event_hub: EventHub
 
     def __init__(
         self,
@@ -23,23 +39,52 @@ class Bot:
         **kwargs,
     ):
         self.bot_name = bot_name
+        self.metrics_settings = self.metrics_config_factory(key="metrics")
+        self.metrics_server: Optional[MetricsServer] = None
 
         self.logger: Logging = self.logger_factory(self.bot_name)
         self.logger.setup_logger()
 
-        self.logger.info(f"Starting bot {self.bot_name!r}")
+        self.logger.info("Starting bot %r", self.bot_name)
 
         self.component_manager.load_components(pathlib.Path(application_path))
         self.component_manager.create_components()
 
         self.bot = self.create_bot_client(status=status, **kwargs)
 
-    def create_bot_client(self, **kwargs) -> EventClient:
+    def create_bot_client(self, **kwargs) -> "EventClient":
+        # Imported here so the rest of the framework can be imported without the Discord client
+        from dippy.events import EventClient
+
         return EventClient(**kwargs)
 
     def run(self, token: str):
+        self.bot.loop.run_until_complete(self.component_manager.start())
+        if self.metrics_settings.enabled:
+            self.bot.loop.run_until_complete(self.start_metrics_server())
         self.bot.run(token)
 
+    async def start_metrics_server(self):
+        settings = self.metrics_settings
+        self.metrics.add_collector(
+            ComponentTimingCollector(self.metrics, self.component_manager)
+        )
+        instrumentation = self.event_hub.instrumentation
+        if instrumentation:
+            self.metrics.add_collector(EventHubCollector(self.metrics, instrumentation))
+            instrumentation.start_loop_lag_monitor(settings.loop_lag_interval)
+
+        self.metrics_server = MetricsServer(
+            self.metrics, settings.host, settings.port, settings.path
+        )
+        await self.metrics_server.start()
+        self.logger.info(
+            "Serving metrics on http://%s:%d%s",
+            settings.host,
+            self.metrics_server.port,
+            settings.path,
+        )
+
     @classmethod
     def create(
         cls,
@@ -51,16 +96,31 @@ class Bot:
         config_dir: str = "config",
         config_files: Sequence[str] = ("development.yaml", "production.yaml"),
         loaders: Sequence[ConfigLoader] = (yaml_loader,),
+        lazy_config: bool = False,
     ) -> "Bot":
         context = bevy.Context()
-        context.load(
-            ConfigManager(
-                application_path,
-                config_dir,
-                config_files=config_files,
-                config_loaders=loaders,
-            )
+        config_manager = ConfigManager(
+            application_path,
+            config_dir,
+            config_files=config_files,
+            config_loaders=loaders,
+            lazy=lazy_config,
         )
+        context.load(config_manager)
+
+        metrics_settings = config_manager.build(MetricsSettingsModel, key="metrics")
+        if metrics_settings.enabled:
+            metrics = MetricsRegistry()
+            context.load(metrics)
+            config_manager.profiler = ConfigLoadMetrics(metrics)
+            context.load(
+                EventHub(
+                    instrumentation=EventHubInstrumentation(
+                        slow_handler_threshold=metrics_settings.slow_handler_threshold
+                    )
+                )
+            )
+
         context.load(context.create(ComponentManager, bot_name))
 
         bot = context.create(Bot, bot_name, status, application_path)
@@ -1,5 +1,5 @@
-from dippy.components.component import Component
+from dippy.components.component import Component, event_handler
 from dippy.components.manager import ComponentManager
 
 
-__all__ = ["ComponentManager", "Component"]
+__all__ = ["ComponentManager", "Component", "event_handler"]
@@ -1,5 +1,34 @@
+from typing import Callable, Dict, Tuple
+
+
 class Component:
+    """ Base class for bot components. Every subclass is registered in __components__ so the component manager can
+    create it. Methods decorated with event_handler are registered with the event hub when the component is created,
+    __event_handlers__ maps the names of the events a component handles to the names of the methods that handle
+    them. """
+
     __components__ = []
+    __event_handlers__: Dict[str, Tuple[str, ...]] = {}
 
     def __init_subclass__(cls, **kwargs):
         Component.__components__.append(cls)
+
+        handlers: Dict[str, Dict[str, None]] = {}
+        for base in reversed(cls.__mro__):
+            for name, value in vars(base).items():
+                for event_name in getattr(value, "__event_names__", ()):
+                    handlers.setdefault(event_name, {})[name] = None
+
+        cls.__event_handlers__ = {
+            event_name: tuple(names) for event_name, names in handlers.items()
+        }
+
+
+def event_handler(*event_names: str) -> Callable[[Callable], Callable]:
+    """ Marks a component's coroutine method as the handler for the named events. """
+
+    def mark(method: Callable) -> Callable:
+        method.__event_names__ = (*getattr(method, "__event_names__", ()), *event_names)
+        return method
+
+    return mark
@@ -1,13 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from dippy.components import Component
+from dippy.components.manifest import ComponentManifest
 from dippy.config import ConfigFactory
+from dippy.events import EventHub
 from dippy.logging import Logging
-from typing import List, Optional
-from types import ModuleType
+from importlib.machinery import ModuleSpec
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from types import CodeType, ModuleType
+import asyncio
 import bevy
 import importlib.util
 import pathlib
 import pydantic
 import enum
+import time
 
 
 class ComponentAutoloadPolicyEnum(enum.Enum):
@@ -15,34 +21,281 @@ class ComponentAutoloadPolicyEnum(enum.Enum):
     DISABLED = "DISABLED"
 
 
+class ComponentActivationPolicyEnum(enum.Enum):
+    EAGER = "EAGER"
+    LAZY = "LAZY"
+
+
 class ComponentGroupModel(pydantic.BaseModel):
     location: str
     policy: Optional[ComponentAutoloadPolicyEnum]
     components: Optional[List[str]]
+    activation: Optional[ComponentActivationPolicyEnum]
+    events: Dict[str, List[str]] = {}
 
 
 class ComponentSettingsModel(pydantic.BaseModel):
     groups: List[ComponentGroupModel]
     policy: ComponentAutoloadPolicyEnum = ComponentAutoloadPolicyEnum.ENABLED
+    activation: ComponentActivationPolicyEnum = ComponentActivationPolicyEnum.EAGER
+    # Path relative to the app path of a ComponentManifest recording the component directories, the components each
+    # file defined, and the events they handle. Directories that have not changed are not scanned again, and files in
+    # lazy groups that do not declare their events use the events recorded in the manifest, so after the first start
+    # they are deferred without being imported.
+    manifest: Optional[str] = None
+    watch_interval: Optional[float] = None
+    parallel_import: bool = False
+    import_workers: Optional[int] = None
+
+
+class ComponentTiming(NamedTuple):
+    """ How long one stage of loading a component file or starting a component took. The compile stage reads the
+    file's cached bytecode or compiles its source, import runs the module, create builds the component, and setup runs
+    its setup hook. """
+
+    name: str
+    stage: str
+    seconds: float
 
 
 class ComponentManager:
+    """ Finds, imports, and creates the bot's components. Methods decorated with event_handler are registered with the
+    event hub when their component is created. """
+
     config_factory: ConfigFactory[ComponentSettingsModel]
     logger_factory: bevy.Factory[Logging]
     context: bevy.Context
+    event_hub: EventHub
 
     def __init__(self, bot_name: str):
         self.bot_name = bot_name
         self.config = self.config_factory(key="components")
         self.logger: Logging = self.logger_factory(f"{bot_name}.components")
+        self.components: List[Component] = []
+        self.lazy_components: List[LazyComponents] = []
+        self.manifest: Optional[ComponentManifest] = None
+        self.timings: List[ComponentTiming] = []
+        self._file_components: Dict[pathlib.Path, List[type]] = {}
+        self._file_versions: Dict[pathlib.Path, Tuple[int, int]] = {}
+        self._watcher: Optional[asyncio.Task] = None
 
     def load_components(self, app_path: pathlib.Path):
+        """ Imports the component files found in the component groups. Files are imported one after another unless
+        parallel_import is enabled in the component settings. Then the files' bytecode is read, or their source
+        compiled, on a thread pool with import_workers threads while the modules are run in the order the files were
+        found, so components are registered in the same order as a serial import. The time each stage takes for each
+        file is logged and kept in timings.
+
+        Files in groups using the lazy activation policy that declare the events they handle, in the group's events
+        or in the manifest, are deferred with LazyComponents rather than imported. """
         self.logger.debug("Loading components")
         if not app_path.is_dir():
             app_path = app_path.parent
 
+        if self.config.manifest:
+            self.manifest = ComponentManifest.load(app_path / self.config.manifest)
+
+        files = []
+        for file, event_names in self._find_component_files(app_path):
+            if event_names:
+                self.logger.debug("Deferring %s until %s", file, ", ".join(event_names))
+                lazy_components = LazyComponents(self, file, event_names)
+                lazy_components.register(self.event_hub)
+                self.lazy_components.append(lazy_components)
+            else:
+                files.append(file)
+
+        if self.config.parallel_import:
+            with ThreadPoolExecutor(self.config.import_workers) as executor:
+                for file, compiled in zip(files, executor.map(self._compile, files)):
+                    self.logger.debug("Loading %s", file)
+                    self._exec(*compiled)
+        else:
+            for file in files:
+                self.logger.debug("Loading %s", file)
+                self._import(file)
+
+        self._save_manifest()
+
+    def create_components(self):
+        self._create(Component.__components__)
+
+    async def start(self):
+        """ Sets up the components and, when watch_interval is set in the component settings, starts watching the
+        component files for changes. """
+        await self.setup_components()
+        if self.config.watch_interval:
+            self.watch(self.config.watch_interval)
+
+    async def setup_components(self):
+        """ Runs the async setup method of every created component that has one. The setup methods run concurrently,
+        if any of them fail the first exception is raised once they have all finished. """
+        components = [
+            component
+            for component in self.components
+            if asyncio.iscoroutinefunction(getattr(component, "setup", None))
+        ]
+        results = await asyncio.gather(
+            *(self._setup(component) for component in components),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def reload(self, path: pathlib.Path) -> List[Component]:
+        """ Imports a component file again, replacing the components it created with new components created from the
+        new version of the file. The old components are only unloaded once the file has been imported. The new
+        components are created even if tearing down the old components fails, the teardown error is logged. """
+        self.logger.info("Reloading %s", path)
+        old_types = self._file_components.get(path, [])
+        self._import(path)
+        try:
+            await self._unload(old_types)
+        except Exception:
+            self.logger.error(
+                "Failed to tear down the old components of %s", path, exc_info=True
+            )
+
+        components = self._create(self._file_components[path])
+        await asyncio.gather(
+            *(
+                self._setup(component)
+                for component in components
+                if asyncio.iscoroutinefunction(getattr(component, "setup", None))
+            )
+        )
+        self._save_manifest()
+        return components
+
+    async def reload_changed(self) -> List[pathlib.Path]:
+        """ Reloads the imported component files that have changed and unloads those that have been deleted. Errors
+        raised while reloading or unloading a file are logged, a file that failed to reload is tried again when it next
+        changes. """
+        changed = []
+        for path, version in list(self._file_versions.items()):
+            try:
+                current_version = self._get_version(path)
+            except FileNotFoundError:
+                changed.append(path)
+                try:
+                    await self.unload(path)
+                except Exception:
+                    self.logger.error("Failed to unload %s", path, exc_info=True)
+                continue
+            except OSError as error:
+                self.logger.error("Failed to check %s for changes: %r", path, error)
+                continue
+
+            if current_version == version:
+                continue
+
+            changed.append(path)
+            try:
+                await self.reload(path)
+            except Exception as error:
+                self._file_versions[path] = current_version
+                self.logger.error("Failed to reload %s: %r", path, error)
+
+        return changed
+
+    async def unload(self, path: pathlib.Path):
+        """ Unloads the components created from a component file, removing their event handlers from the event hub,
+        running their async teardown methods, and removing their classes from Component.__components__. """
+        self.logger.info("Unloading %s", path)
+        self._file_versions.pop(path, None)
+        await self._unload(self._file_components.pop(path, []))
+
+    def watch(self, interval: float = 1.0) -> asyncio.Task:
+        """ Starts checking the imported component files for changes every interval seconds, reloading files whose
+        modification time or size changes and unloading files that are deleted. Must be called while the event loop is
+        running. """
+        self.stop_watching()
+        self._watcher = asyncio.get_running_loop().create_task(self._watch(interval))
+        return self._watcher
+
+    def stop_watching(self):
+        """ Stops checking the component files for changes. """
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def _create(
+        self, component_types: Sequence[type], register_handlers: bool = True
+    ) -> List[Component]:
+        created = []
+        for component in component_types:
+            logger = self.logger_factory(
+                f"{self.bot_name}.{component.__module__}.{component.__name__}"
+            )
+            logger.debug("Creating component")
+            started = time.perf_counter()
+            context = self.context.branch()
+            context.load(logger)
+            instance = context.create(component)
+            context.load(instance)
+            if register_handlers:
+                self._register_handlers(instance)
+
+            created.append(instance)
+            self._record_timing(
+                f"{component.__module__}.{component.__name__}",
+                "create",
+                time.perf_counter() - started,
+            )
+
+        self.components.extend(created)
+        return created
+
+    def _compile(self, path: pathlib.Path) -> Tuple[ModuleSpec, CodeType, float]:
+        started = time.perf_counter()
+        module_spec = importlib.util.spec_from_file_location(path.stem, path)
+        code = module_spec.loader.get_code(module_spec.name)
+        return module_spec, code, time.perf_counter() - started
+
+    def _exec(
+        self, module_spec: ModuleSpec, code: CodeType, compile_time: float
+    ) -> ModuleType:
+        started = time.perf_counter()
+        registered = len(Component.__components__)
+        module = importlib.util.module_from_spec(module_spec)
+        try:
+            exec(code, module.__dict__)
+        except BaseException:
+            del Component.__components__[registered:]
+            raise
+
+        self._record_timing(module_spec.origin, "compile", compile_time)
+        self._record_timing(module_spec.origin, "import", time.perf_counter() - started)
+        path = pathlib.Path(module_spec.origin)
+        component_types = Component.__components__[registered:]
+        self._file_components[path] = component_types
+        self._file_versions[path] = self._get_version(path)
+        if self.manifest:
+            self.manifest.record(
+                path,
+                [component.__name__ for component in component_types],
+                list(
+                    dict.fromkeys(
+                        event_name
+                        for component in component_types
+                        for event_name in component.__event_handlers__
+                    )
+                ),
+            )
+
+        return module
+
+    def _find_component_files(
+        self, app_path: pathlib.Path
+    ) -> List[Tuple[pathlib.Path, Sequence[str]]]:
+        component_files = []
         for group in self.config.groups:
             policy = self.config.policy if group.policy is None else group.policy
+            activation = (
+                self.config.activation if group.activation is None else group.activation
+            )
+            lazy = activation == ComponentActivationPolicyEnum.LAZY
             location = app_path / group.location
             components = [] if group.components is None else group.components
             if not location.exists() or not location.is_dir():
@@ -51,12 +304,13 @@ class ComponentManager:
                     f" either does not exist or is not a valid directory"
                 )
 
-            python_files = filter(
-                lambda item: item.is_file()
-                and item.suffix.casefold() == ".py"
-                and not item.name.startswith("_"),
-                location.iterdir(),
-            )
+            if self.manifest:
+                python_files = self.manifest.list_directory(
+                    location, _is_component_file
+                )
+            else:
+                python_files = filter(_is_component_file, location.iterdir())
+
             for file in python_files:
                 if (
                     file.stem in components
@@ -69,24 +323,180 @@ class ComponentManager:
                 ):
                     continue
 
-                self.logger.debug(f"Loading {file}")
-                self._import(file)
+                event_names = ()
+                if lazy:
+                    event_names = group.events.get(file.stem, ())
+                    entry = self.manifest.get(file) if self.manifest else None
+                    if not event_names and entry:
+                        event_names = entry.events
 
-    def create_components(self):
-        for component in Component.__components__:
-            logger = self.logger_factory(
-                f"{self.bot_name}.{component.__module__}.{component.__name__}"
-            )
-            logger.debug("Creating component")
-            context = self.context.branch()
-            context.load(logger)
-            context.load(context.create(component))
+                component_files.append((file, event_names))
+
+        return component_files
+
+    def _register_handlers(self, component: Component):
+        for event_name, handler in get_event_handlers(component):
+            self.event_hub.on(event_name, handler)
+
+    def _get_version(self, path: pathlib.Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
 
     def _import(self, path: pathlib.Path) -> ModuleType:
-        module_spec = importlib.util.spec_from_file_location(path.stem, path)
-        module = importlib.util.module_from_spec(module_spec)
-        module_spec.loader.exec_module(module)
-        return module
+        return self._exec(*self._compile(path))
+
+    def _save_manifest(self):
+        if not self.manifest:
+            return
+
+        try:
+            self.manifest.save()
+        except OSError as error:
+            self.logger.warning(
+                "Could not save the component manifest %s: %s",
+                self.manifest.path,
+                error,
+            )
+
+    def _record_timing(self, name: str, stage: str, seconds: float):
+        self.timings.append(ComponentTiming(name, stage, seconds))
+        self.logger.debug("%s %s took %.2fms", stage.capitalize(), name, seconds * 1000)
+
+    async def _unload(self, component_types: Sequence[type]):
+        components = [
+            component
+            for component in self.components
+            if type(component) in component_types
+        ]
+        for component in components:
+            for event_name, handler in get_event_handlers(component):
+                self.event_hub.stop(event_name, handler)
+
+        unloaded = {id(component) for component in components}
+        self.components[:] = [
+            component for component in self.components if id(component) not in unloaded
+        ]
+        Component.__components__[:] = [
+            component_type
+            for component_type in Component.__components__
+            if component_type not in component_types
+        ]
+        await asyncio.gather(
+            *(
+                component.teardown()
+                for component in components
+                if asyncio.iscoroutinefunction(getattr(component, "teardown", None))
+            )
+        )
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_changed()
+            except Exception:
+                self.logger.error(
+                    "Failed to reload the changed component files", exc_info=True
+                )
+
+    async def _setup(self, component: Component):
+        started = time.perf_counter()
+        await component.setup()
+        self._record_timing(
+            f"{type(component).__module__}.{type(component).__name__}",
+            "setup",
+            time.perf_counter() - started,
+        )
+
+
+class LazyComponents:
+    """ Stands in for the components defined in a component file until one of the events they handle is emitted.
+
+    Groups using the lazy activation policy declare the events each of their component files handles in the group's
+    events, a mapping of file names without the .py suffix to event names. A stub is registered with the event hub for
+    each of the events. The first time one of them is emitted the file is imported, its components are created and
+    set up, the stubs are replaced with the components' handlers, and the event is passed on to them. Files in lazy
+    groups that do not declare any events are loaded at startup. """
+
+    def __init__(
+        self, manager: ComponentManager, path: pathlib.Path, event_names: Sequence[str]
+    ):
+        self.manager = manager
+        self.path = path
+        self.event_names = tuple(event_names)
+        self.components: List[Component] = []
+        self._activation: Optional[asyncio.Future] = None
+        self._stubs = {
+            event_name: self._create_stub(event_name) for event_name in self.event_names
+        }
+
+    @property
+    def activated(self) -> bool:
+        return bool(self._activation and self._activation.done())
+
+    def register(self, event_hub: EventHub):
+        """ Registers a stub with the event hub for each event the components handle. """
+        for event_name, stub in self._stubs.items():
+            event_hub.on(event_name, stub)
+
+    async def activate(self):
+        """ Imports the component file, creates and sets up its components, and replaces the stubs with the
+        components' event handlers. The components are only activated once, if activating them fails the error is
+        raised every time they are activated again. """
+        if self._activation is None:
+            self._activation = asyncio.ensure_future(self._activate())
+
+        await asyncio.shield(self._activation)
+
+    def _create_stub(self, event_name: str) -> Callable:
+        async def stub(event_data: Any):
+            await self.activate()
+            for component in self.components:
+                for handler_event_name, handler in get_event_handlers(component):
+                    if handler_event_name == event_name:
+                        await handler(event_data)
+
+        return stub
+
+    async def _activate(self):
+        manager = self.manager
+        manager.logger.debug("Activating %s", self.path)
+        manager._import(self.path)
+        manager._save_manifest()
+        components = manager._create(
+            manager._file_components[self.path], register_handlers=False
+        )
+        # The stubs hold back events emitted during setup until the components are ready to handle them
+        await asyncio.gather(
+            *(
+                manager._setup(component)
+                for component in components
+                if asyncio.iscoroutinefunction(getattr(component, "setup", None))
+            )
+        )
+        for component in components:
+            manager._register_handlers(component)
+        for event_name, stub in self._stubs.items():
+            manager.event_hub.stop(event_name, stub)
+
+        self.components = components
+
+
+def _is_component_file(path: pathlib.Path) -> bool:
+    return (
+        path.is_file()
+        and path.suffix.casefold() == ".py"
+        and not path.name.startswith("_")
+    )
+
+
+def get_event_handlers(component: Component) -> List[Tuple[str, Callable]]:
+    """ Gets the event names and bound handler methods of every event handler on a component. """
+    return [
+        (event_name, getattr(component, method_name))
+        for event_name, method_names in type(component).__event_handlers__.items()
+        for method_name in method_names
+    ]
 
 
 class InvalidComponentPath(Exception):
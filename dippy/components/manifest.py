@@ -0,0 +1,151 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import pathlib
+
+
+class ManifestEntry(NamedTuple):
+    modified: int
+    size: int
+    digest: str
+    components: Tuple[str, ...]
+    events: Tuple[str, ...]
+
+
+class ComponentManifest:
+    """ Persistent record of the component directories and files the component manager has loaded.
+
+    For each directory the manifest stores its modification time and the component files found in it, so directories
+    that have not changed since the last start do not need to be scanned again. For each file it stores the file's
+    modification time, size, and a hash of its contents along with the components it defined and the events those
+    components handle, so files in lazily activated groups can be deferred without importing them. A file whose
+    modification time or size changed is hashed again and its entry is only kept if the contents are unchanged.
+
+    Paths are stored relative to the directory that holds the manifest.
+    """
+
+    version = 1
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.directories: Dict[str, Tuple[int, List[str]]] = {}
+        self.files: Dict[str, ManifestEntry] = {}
+        self._changed = False
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "ComponentManifest":
+        """ Loads a manifest, starting an empty manifest if the file is missing, unreadable, or from another version
+        of the manifest format. """
+        manifest = cls(path)
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") != cls.version:
+                return manifest
+
+            manifest.directories = {
+                name: (modified, list(files))
+                for name, (modified, files) in data["directories"].items()
+            }
+            manifest.files = {
+                name: ManifestEntry(
+                    modified, size, digest, tuple(components), tuple(events)
+                )
+                for name, (modified, size, digest, components, events) in data[
+                    "files"
+                ].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            manifest.directories.clear()
+            manifest.files.clear()
+
+        return manifest
+
+    def list_directory(
+        self, location: pathlib.Path, predicate: Callable[[pathlib.Path], bool]
+    ) -> List[pathlib.Path]:
+        """ Lists the files in a directory that match the predicate, using the files recorded for the directory if it
+        has not been modified since they were recorded. """
+        name = self._name(location)
+        modified = location.stat().st_mtime_ns
+        recorded = self.directories.get(name)
+        if recorded and recorded[0] == modified:
+            return [location / file_name for file_name in recorded[1]]
+
+        files = [item for item in location.iterdir() if predicate(item)]
+        self.directories[name] = modified, [file.name for file in files]
+        self._changed = True
+        return files
+
+    def get(self, file: pathlib.Path) -> Optional[ManifestEntry]:
+        """ Gets the entry for a file if it is still current. """
+        name = self._name(file)
+        entry = self.files.get(name)
+        if not entry:
+            return None
+
+        try:
+            stat = file.stat()
+            if (stat.st_mtime_ns, stat.st_size) == (entry.modified, entry.size):
+                return entry
+
+            digest = self._hash(file)
+        except OSError:
+            digest = None
+
+        if digest != entry.digest:
+            del self.files[name]
+            self._changed = True
+            return None
+
+        entry = self.files[name] = entry._replace(
+            modified=stat.st_mtime_ns, size=stat.st_size
+        )
+        self._changed = True
+        return entry
+
+    def record(
+        self, file: pathlib.Path, components: Sequence[str], events: Sequence[str]
+    ):
+        """ Records the components a file defined and the events they handle. The file is only hashed again when its
+        modification time or size no longer match its entry. """
+        name = self._name(file)
+        stat = file.stat()
+        entry = self.files.get(name)
+        if entry and (entry.modified, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            digest = entry.digest
+        else:
+            digest = self._hash(file)
+
+        recorded = ManifestEntry(
+            stat.st_mtime_ns, stat.st_size, digest, tuple(components), tuple(events)
+        )
+        if recorded != entry:
+            self.files[name] = recorded
+            self._changed = True
+
+    def save(self):
+        """ Writes the manifest if it has changed since it was loaded or last saved. """
+        if not self._changed:
+            return
+
+        data = {
+            "version": self.version,
+            "directories": self.directories,
+            "files": self.files,
+        }
+        temporary_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+        try:
+            temporary_path.write_text(json.dumps(data))
+            os.replace(temporary_path, self.path)
+        except OSError:
+            temporary_path.unlink(missing_ok=True)
+            raise
+
+        self._changed = False
+
+    def _hash(self, file: pathlib.Path) -> str:
+        return hashlib.blake2b(file.read_bytes()).hexdigest()
+
+    def _name(self, path: pathlib.Path) -> str:
+        return os.path.relpath(path, self.path.parent)
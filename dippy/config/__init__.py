@@ -1,5 +1,5 @@
 from dippy.config.config import ConfigFactory, EnvField
-from dippy.config.manager import ConfigManager
+from dippy.config.manager import ConfigManager, ConfigReloaded
 
 
-__all__ = ["ConfigFactory", "EnvField", "ConfigManager"]
+__all__ = ["ConfigFactory", "EnvField", "ConfigManager", "ConfigReloaded"]
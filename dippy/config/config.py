@@ -23,12 +23,15 @@ def EnvField(
 class ConfigFactory(bevy.Factory):
     """ Custom factory for creating Pydantic models from config files. """
 
-    def __call__(self, *file_names: str, key: Optional[str] = None) -> bevy.factory.T:
-        config = self.context.get(ConfigManager).load(*file_names)
-        if not config:
-            config = {}
+    def __call__(
+        self, *file_names: str, key: Optional[str] = None, subscribe: bool = False
+    ) -> bevy.factory.T:
+        """ Builds the model from the config file. Models are memoized by the config manager and shared between calls
+        until the config file changes. When subscribe is True the model is updated in place whenever the config manager
+        reloads a change to its config section. """
+        manager = self.context.get(ConfigManager)
+        model = manager.build(self.build_type, *file_names, key=key)
+        if subscribe:
+            manager.subscribe(model, *file_names, key=key, model_type=self.build_type)
 
-        if key:
-            config = config.get(key, {})
-
-        return self.build_type(**config)
+        return model
@@ -1,16 +1,26 @@
-from typing import Any, Dict
-from dippy.config.manager import ConfigLoader
+from typing import Any, Dict, Iterable, Optional, Tuple
+from dippy.config.manager import ConfigLoader, SectionNotLoadable
+import codecs
+import hashlib
+import os
 import pathlib
+import pickle
 
 
 # ###   JSON Config Loader   ### #
 
 
 def _json_loader(file_path: pathlib.Path) -> Dict[str, Any]:
-    import json
+    """ Uses orjson when it is installed, falling back to the standard library json module. """
+    try:
+        import orjson
+    except ImportError:
+        import json
 
-    with file_path.open("r") as json_file:
-        return json.load(json_file)
+        with file_path.open("r") as json_file:
+            return json.load(json_file)
+    else:
+        return orjson.loads(file_path.read_bytes())
 
 
 json_loader = ConfigLoader("json", r"\.json$", _json_loader)
@@ -20,10 +30,198 @@ json_loader = ConfigLoader("json", r"\.json$", _json_loader)
 
 
 def _yaml_loader(file_path: pathlib.Path) -> Dict[str, Any]:
+    """ Uses the libyaml backed CSafeLoader when PyYAML was built with libyaml, falling back to the pure Python
+    SafeLoader. """
     import yaml
 
-    with file_path.open("r") as yaml_file:
-        return yaml.safe_load(yaml_file)
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with file_path.open("rb") as yaml_file:
+        return yaml.load(yaml_file, Loader=loader)
 
 
-yaml_loader = ConfigLoader("yaml", r"\.ya?ml$", _yaml_loader)
+# Maps YAML file paths to the version of the file that was indexed and the index, None when the file cannot be split
+_yaml_indexes: Dict[
+    pathlib.Path, Tuple[Tuple[int, int], Optional[Dict[str, Tuple[int, int, int]]]]
+] = {}
+
+
+def _yaml_section_loader(file_path: pathlib.Path, key: str) -> Any:
+    """ Loads one top level section of a YAML file without parsing the rest of the file. The first read streams the
+    file's parse events to index where each top level entry starts and ends, later reads only read and parse the bytes
+    of the requested entry. The index is rebuilt when the file's modification time or size changes. """
+    import yaml
+
+    stat = file_path.stat()
+    version = stat.st_mtime_ns, stat.st_size
+    indexed = _yaml_indexes.get(file_path)
+    if not indexed or indexed[0] != version:
+        indexed = _yaml_indexes[file_path] = version, _index_yaml(file_path)
+
+    index = indexed[1]
+    if index is None:
+        raise SectionNotLoadable(
+            f"'{file_path}' cannot be split into sections, it must be a single block mapping with no aliases"
+        )
+
+    if key not in index:
+        return {}
+
+    start, end, column = index[key]
+    with file_path.open("rb") as yaml_file:
+        yaml_file.seek(start)
+        entry = yaml_file.read(end - start).decode("utf-8")
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(" " * column + entry, Loader=loader)[key]
+
+
+def _index_yaml(file_path: pathlib.Path) -> Optional[Dict[str, Tuple[int, int, int]]]:
+    """ Finds the byte range and column of every top level entry in a YAML file. Returns None when the entries cannot
+    be parsed on their own: when the file is not a single block mapping with string keys, uses aliases or directives,
+    or starts with a byte order mark. """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    resolver = yaml.resolver.Resolver()
+    keys = []
+    column = end = None
+    documents = depth = 0
+    expect_key = True
+    with file_path.open("rb") as yaml_file:
+        if yaml_file.read(4).startswith(
+            (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+        ):
+            return None
+
+        yaml_file.seek(0)
+        for event in yaml.parse(yaml_file, Loader=loader):
+            if isinstance(event, yaml.AliasEvent):
+                return None
+
+            if isinstance(event, yaml.DocumentStartEvent):
+                documents += 1
+                if documents > 1 or event.version or event.tags:
+                    return None
+
+            elif isinstance(event, yaml.CollectionStartEvent):
+                if depth == 0:
+                    if (
+                        not isinstance(event, yaml.MappingStartEvent)
+                        or event.flow_style
+                        or event.tag
+                    ):
+                        return None
+                    column = event.start_mark.column
+                elif depth == 1 and expect_key:
+                    return None
+                depth += 1
+
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth -= 1
+                if depth == 0:
+                    end = event.start_mark.index
+                elif depth == 1:
+                    expect_key = True
+
+            elif isinstance(event, yaml.ScalarEvent):
+                if depth == 0:
+                    return None
+
+                if depth == 1:
+                    if expect_key:
+                        if (
+                            event.tag
+                            or event.start_mark.column != column
+                            or not _is_yaml_string(event, resolver)
+                        ):
+                            return None
+                        keys.append((event.value, event.start_mark.index))
+                    expect_key = not expect_key
+
+    if end is None:
+        return None
+
+    ends = [start for _, start in keys[1:]] + [end]
+    offsets = _byte_offsets(file_path, [start for _, start in keys] + [end])
+    return {
+        key: (offsets[start], offsets[entry_end], column)
+        for (key, start), entry_end in zip(keys, ends)
+    }
+
+
+def _is_yaml_string(event: Any, resolver: Any) -> bool:
+    import yaml
+
+    if event.style in (None, ""):
+        return (
+            resolver.resolve(yaml.ScalarNode, event.value, (True, False))
+            == "tag:yaml.org,2002:str"
+        )
+
+    return event.style in ("'", '"')
+
+
+def _byte_offsets(file_path: pathlib.Path, indexes: Iterable[int]) -> Dict[int, int]:
+    """ Converts character indexes in a UTF-8 file into byte offsets, reading the file in chunks. """
+    offsets = {}
+    pending = iter(sorted(set(indexes)))
+    target = next(pending, None)
+    position = byte_position = 0
+    with file_path.open("r", encoding="utf-8", newline="") as text_file:
+        while target is not None:
+            chunk = text_file.read(65536)
+            while target is not None and target <= position + len(chunk):
+                offsets[target] = byte_position + len(
+                    chunk[: target - position].encode("utf-8")
+                )
+                target = next(pending, None)
+
+            if not chunk:
+                break
+
+            position += len(chunk)
+            byte_position += len(chunk.encode("utf-8"))
+
+    return offsets
+
+
+yaml_loader = ConfigLoader(
+    "yaml", r"\.ya?ml$", _yaml_loader, section_loader=_yaml_section_loader
+)
+
+
+# ###   Snapshot Config Loader   ### #
+
+
+def snapshot_loader(config_loader: ConfigLoader) -> ConfigLoader:
+    """ Wraps a config loader so that parsed configs are saved as a pickle snapshot next to the config file. The
+    snapshot is keyed on a hash of the config file's contents, so it is used until the file changes and then
+    replaced. Snapshots are saved as ".<file name>.snapshot" and are trusted in the same way as the config files, so
+    the config directory should not be writable by anyone who should not be able to change the config. """
+
+    def load(file_path: pathlib.Path) -> Any:
+        digest = hashlib.blake2b(file_path.read_bytes()).digest()
+        snapshot_path = file_path.with_name(f".{file_path.name}.snapshot")
+        try:
+            with snapshot_path.open("rb") as snapshot_file:
+                snapshot_digest, config = pickle.load(snapshot_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+        else:
+            if snapshot_digest == digest:
+                return config
+
+        config = config_loader.load(file_path)
+        temporary_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}")
+        try:
+            with temporary_path.open("wb") as snapshot_file:
+                pickle.dump((digest, config), snapshot_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, snapshot_path)
+        except (OSError, pickle.PicklingError):
+            temporary_path.unlink(missing_ok=True)
+
+        return config
+
+    return ConfigLoader(
+        config_loader.name, config_loader.pattern, load, config_loader.section_loader
+    )
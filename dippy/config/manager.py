@@ -1,8 +1,25 @@
 from __future__ import annotations
-from typing import Any, Callable, Dict, Sequence, Union
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import asyncio
 import functools
+import logging
 import pathlib
 import re
+import time
+
+
+logger = logging.getLogger("dippy.config")
 
 
 class ConfigLoader:
@@ -11,8 +28,10 @@ class ConfigLoader:
         name: str,
         regex: Union[re.Pattern, str],
         loader: Callable[[pathlib.Path], Any],
+        section_loader: Optional[Callable[[pathlib.Path, str], Any]] = None,
     ):
         self.loader = loader
+        self.section_loader = section_loader
         self.name = name
         self.pattern: re.Pattern = regex if isinstance(
             regex, re.Pattern
@@ -22,11 +41,73 @@ class ConfigLoader:
         """ Call the loader with the given file path. """
         return self.loader(file_path)
 
+    def load_section(self, file_path: pathlib.Path, key: str) -> Any:
+        """ Call the section loader to load only the top level section of the file stored under the key. Raises
+        SectionNotLoadable when there is no section loader or it cannot load the section without the whole file. """
+        if not self.section_loader:
+            raise SectionNotLoadable(
+                f"The {self.name} config loader cannot load sections of config files"
+            )
+
+        return self.section_loader(file_path, key)
+
     def matches(self, file_name: str) -> bool:
         """ Determine if the loader's pattern matches the given file name. """
         return self.pattern.search(file_name) is not None
 
 
+class CachedConfig(NamedTuple):
+    modified: int
+    size: int
+    config: Any
+
+
+class ConfigReloaded(NamedTuple):
+    """ The data emitted with the config_reloaded event. Config is None when the file could not be parsed, errors holds
+    the exceptions raised while parsing the file or validating the models subscribed to it. """
+
+    file_name: str
+    config: Any
+    errors: Sequence[Exception]
+
+
+class ConfigLoadProfile(NamedTuple):
+    """ Reported to the config manager's profiler each time a config or config section is loaded. Resolution time is
+    spent finding the config file and its loader and checking the cache, parse time is spent in the loader and is zero
+    when the config was served from the cache. """
+
+    file_name: str
+    key: Optional[str]
+    resolution_time: float
+    parse_time: float
+    cached: bool
+
+
+class ConfigSubscription:
+    """ A model that is updated in place when the section of the config file it was built from changes. """
+
+    __slots__ = ("model", "model_type", "key", "section")
+
+    def __init__(
+        self, model: Any, model_type: Callable, key: Optional[str], section: Any
+    ):
+        self.model = model
+        self.model_type = model_type
+        self.key = key
+        self.section = section
+
+
+def get_config_section(config: Any, key: Optional[str]) -> Dict[str, Any]:
+    """ Gets the section of a loaded config that is stored under a key, or the whole config if there is no key. """
+    if not config:
+        config = {}
+
+    if key:
+        config = config.get(key, {})
+
+    return config
+
+
 class ConfigManager:
     """ Configuration File Management
 
@@ -45,34 +126,154 @@ class ConfigManager:
         relative_config_path: str = "",
         config_files: Sequence[str] = tuple(),
         config_loaders: Sequence[ConfigLoader] = tuple(),
+        cache_size: Optional[int] = None,
+        lazy: bool = False,
+        profiler: Optional[Callable[[ConfigLoadProfile], Any]] = None,
     ):
-        self.cache: Dict[str:Any] = {}
+        self.cache: OrderedDict[
+            Union[pathlib.Path, Tuple[pathlib.Path, str]], CachedConfig
+        ] = OrderedDict()
+        self.cache_size = cache_size
+        self.lazy = lazy
+        self.profiler = profiler
+        self.models: Dict[Tuple, Tuple[Tuple[pathlib.Path, Tuple[int, int]], Any]] = {}
+        self.subscriptions: Dict[pathlib.Path, List[ConfigSubscription]] = {}
+        # The version of each loaded file that the subscribed models and the watcher last saw, only reload advances it
+        self._watched_versions: Dict[pathlib.Path, Tuple[int, int]] = {}
+        self._watcher: Optional[asyncio.Task] = None
         self.config_path = self.get_validated_path(app_path, relative_config_path)
         self.loaders: Dict[str, ConfigLoader] = {}
         self.default_config_files = config_files
+        self._file_loaders: Dict[str, ConfigLoader] = {}
+        self._loader_pattern: Optional[re.Pattern] = None
+        self._resolved_files: Dict[Tuple[str, ...], Tuple[int, str]] = {}
 
         for loader in config_loaders:
             self.register_loader(loader)
 
-    def load(self, *config_file_names: str) -> Any:
-        """ Loads a config file using the appropriate config file loader. """
-        config_file_name = self.resolve_config_file(
-            config_file_names if config_file_names else self.default_config_files
+    def load(self, *config_file_names: str, key: Optional[str] = None) -> Any:
+        """ Loads a config file using the appropriate config file loader. When a key is given only the section of the
+        config stored under the key is returned, a lazy config manager only parses that section when the file's loader
+        has a section loader. Configs are cached until their file's modification time or size changes, keeping the
+        cache_size most recently used. Cached configs are shared and should not be modified. """
+        if key:
+            return self._load_section(config_file_names, key)[2]
+
+        return self._load(config_file_names)[2]
+
+    def build(
+        self, model_type: Callable, *config_file_names: str, key: Optional[str] = None
+    ) -> Any:
+        """ Builds a model from a section of a config file. Models are memoized by model type, file names, and key, and
+        are reused until the config file changes, so the returned model is shared and should not be modified. Models
+        are not memoized when caching is disabled. """
+        file_path, version, section = self._load_section(config_file_names, key)
+        memo_key = model_type, config_file_names, key
+        memoized = self.models.get(memo_key)
+        if memoized and memoized[0] == (file_path, version):
+            return memoized[1]
+
+        model = model_type(**section)
+        if self.cache_size != 0:
+            self.models[memo_key] = (file_path, version), model
+
+        return model
+
+    def clear_cache(self):
+        """ Removes all loaded configs and memoized models from the cache. """
+        self.cache.clear()
+        self.models.clear()
+
+    def subscribe(
+        self,
+        model: Any,
+        *config_file_names: str,
+        key: Optional[str] = None,
+        model_type: Optional[Callable] = None,
+    ):
+        """ Subscribes a model to be updated in place when the config section it was built from changes. The model is
+        rebuilt by passing the section to the model type, which defaults to the model's type, and the new field values
+        are copied onto the model. The config manager holds a reference to the model until it is unsubscribed. """
+        file_path, _, section = self._load_section(config_file_names, key)
+        subscriptions = self.subscriptions.setdefault(file_path, [])
+        if any(subscription.model is model for subscription in subscriptions):
+            return
+
+        subscriptions.append(
+            ConfigSubscription(model, model_type or type(model), key, section)
         )
-        file_path = self.get_validated_config_path(config_file_name)
-        loader = self.get_loader(config_file_name)
-        return loader.load(file_path)
+
+    def unsubscribe(self, model: Any):
+        """ Stops a model from being updated when its config changes. """
+        for file_path, subscriptions in list(self.subscriptions.items()):
+            subscriptions[:] = [s for s in subscriptions if s.model is not model]
+            if not subscriptions:
+                del self.subscriptions[file_path]
+
+    def watch(self, event_hub: Any, interval: float = 1.0) -> asyncio.Task:
+        """ Starts polling the loaded config files for changes every interval seconds, reloading the files that change.
+        Must be called while the event loop is running. """
+        self.stop_watching()
+        self._watcher = asyncio.get_running_loop().create_task(
+            self._watch(event_hub, interval)
+        )
+        return self._watcher
+
+    def stop_watching(self):
+        """ Stops polling the config files for changes. """
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def reload(self, event_hub: Optional[Any] = None) -> List[ConfigReloaded]:
+        """ Parses the loaded config files that have changed since the last reload, updates the subscribed models, and
+        emits a config_reloaded event for each changed file if an event hub is given. Files that were loaded again since
+        they changed are taken from the cache. Files are checked and parsed on a worker thread so the event loop is not
+        blocked. """
+        changes = await asyncio.get_running_loop().run_in_executor(
+            None, self._parse_changed_files, list(self._watched_versions.items())
+        )
+        reloaded = []
+        for file_path, version, config, error in changes:
+            self._watched_versions[file_path] = version
+            errors = [error] if error else []
+            if not error:
+                self._cache(file_path, version, config)
+                errors.extend(self._update_subscriptions(file_path, version, config))
+
+            reloaded.append(ConfigReloaded(file_path.name, config, errors))
+
+        if event_hub:
+            for change in reloaded:
+                await event_hub.emit("config_reloaded", change)
+
+        return reloaded
 
     def get_loader(self, file_name: str) -> ConfigLoader:
-        """ Finds a loader that can handle the requested config file. """
-        for loader in self.loaders.values():
-            if loader.matches(file_name):
-                return loader
+        """ Finds a loader that can handle the requested config file. The first registered loader that matches is used,
+        found with a single pattern combining the loaders' patterns, and is remembered for the file name until another
+        loader is registered. """
+        loader = self._file_loaders.get(file_name)
+        if loader:
+            return loader
+
+        loaders = list(self.loaders.values())
+        if self._loader_pattern:
+            match = self._loader_pattern.match(file_name)
+            loader = loaders[int(match.lastgroup[1:])] if match else None
         else:
+            loader = next(
+                (loader for loader in loaders if loader.matches(file_name)), None
+            )
+
+        if not loader:
             raise NoConfigLoaderFound(
                 f"No registered config loader matched the requested file: '{file_name}'"
             )
 
+        self._file_loaders[file_name] = loader
+        return loader
+
     def get_validated_config_path(self, file_name: str) -> pathlib.Path:
         """ Builds a config file path and ensures it exists and is a file. """
         path = self.config_path / file_name
@@ -106,27 +307,236 @@ class ConfigManager:
         self, name: str, regex: Union[str, re.Pattern], loader: Callable
     ):
         """ Creates and registers a config loader with the config manager. """
-        self.loaders[name] = ConfigLoader(name, regex, loader)
+        self.register_loader(ConfigLoader(name, regex, loader))
 
     @register_loader.register
     def _(self, config_loader: ConfigLoader):
         """ Registers a config loader with the config manager. """
         self.loaders[config_loader.name] = config_loader
+        self._file_loaders.clear()
+        self._loader_pattern = combine_patterns(
+            [loader.pattern for loader in self.loaders.values()]
+        )
 
     def resolve_config_file(self, config_files: Sequence[str]) -> str:
-        """ Finds the first config file that exists. """
+        """ Finds the first config file that exists. The result is reused until the config directory's modification
+        time changes, which happens when files in it are created, deleted, or renamed. """
+        config_files = tuple(config_files)
+        directory_modified = self.config_path.stat().st_mtime_ns
+        resolved = self._resolved_files.get(config_files)
+        if resolved and resolved[0] == directory_modified:
+            return resolved[1]
+
         for config_file in config_files:
             try:
                 self.get_validated_config_path(config_file)
             except InvalidConfigPath:
                 pass
             else:
+                self._resolved_files[config_files] = directory_modified, config_file
                 return config_file
         raise InvalidConfigPath(
             f"Cannot find any of the requested config files, they either do not exist or are not valid files\n"
             f"--- Looked in {str(self.config_path)!r} for {', '.join(map(repr, config_files))}"
         )
 
+    def _cache(
+        self,
+        cache_key: Union[pathlib.Path, Tuple[pathlib.Path, str]],
+        version: Tuple[int, int],
+        config: Any,
+    ):
+        if self.cache_size == 0:
+            return
+
+        self.cache[cache_key] = CachedConfig(*version, config)
+        self.cache.move_to_end(cache_key)
+        if self.cache_size is not None and len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _get_version(self, file_path: pathlib.Path) -> Tuple[int, int]:
+        stat = file_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(
+        self, config_file_names: Sequence[str]
+    ) -> Tuple[pathlib.Path, Tuple[int, int], Any]:
+        started = time.perf_counter()
+        config_file_name, file_path = self._resolve(config_file_names)
+        version = self._get_version(file_path)
+        cached = self.cache.get(file_path)
+        if cached and (cached.modified, cached.size) == version:
+            self.cache.move_to_end(file_path)
+            self._profile(config_file_name, None, started)
+            return file_path, version, cached.config
+
+        loader = self.get_loader(config_file_name)
+        parse_started = time.perf_counter()
+        config = loader.load(file_path)
+        self._watched_versions.setdefault(file_path, version)
+        self._cache(file_path, version, config)
+        self._profile(config_file_name, None, started, parse_started)
+        return file_path, version, config
+
+    def _load_section(
+        self, config_file_names: Sequence[str], key: Optional[str]
+    ) -> Tuple[pathlib.Path, Tuple[int, int], Any]:
+        if key and self.lazy:
+            started = time.perf_counter()
+            config_file_name, file_path = self._resolve(config_file_names)
+            version = self._get_version(file_path)
+            cached = self.cache.get((file_path, key))
+            if cached and (cached.modified, cached.size) == version:
+                self.cache.move_to_end((file_path, key))
+                self._profile(config_file_name, key, started)
+                return file_path, version, cached.config
+
+            loader = self.get_loader(config_file_name)
+            parse_started = time.perf_counter()
+            try:
+                section = loader.load_section(file_path, key)
+            except SectionNotLoadable:
+                pass
+            else:
+                self._watched_versions.setdefault(file_path, version)
+                self._cache((file_path, key), version, section)
+                self._profile(config_file_name, key, started, parse_started)
+                return file_path, version, section
+
+        file_path, version, config = self._load(config_file_names)
+        return file_path, version, get_config_section(config, key)
+
+    def _parse_changed_files(
+        self, file_versions: List[Tuple[pathlib.Path, Tuple[int, int]]]
+    ) -> List[Tuple[pathlib.Path, Tuple[int, int], Any, Optional[Exception]]]:
+        changes = []
+        for file_path, version in file_versions:
+            try:
+                current_version = self._get_version(file_path)
+            except OSError:
+                continue
+
+            if current_version == version:
+                continue
+
+            cached = self.cache.get(file_path)
+            if cached and (cached.modified, cached.size) == current_version:
+                changes.append((file_path, current_version, cached.config, None))
+                continue
+
+            try:
+                config = self.get_loader(file_path.name).load(file_path)
+            except Exception as error:
+                changes.append((file_path, current_version, None, error))
+            else:
+                changes.append((file_path, current_version, config, None))
+
+        return changes
+
+    def _profile(
+        self,
+        file_name: str,
+        key: Optional[str],
+        started: float,
+        parse_started: Optional[float] = None,
+    ):
+        if not self.profiler:
+            return
+
+        finished = time.perf_counter()
+        if parse_started is None:
+            profile = ConfigLoadProfile(file_name, key, finished - started, 0.0, True)
+        else:
+            profile = ConfigLoadProfile(
+                file_name,
+                key,
+                parse_started - started,
+                finished - parse_started,
+                False,
+            )
+        self.profiler(profile)
+
+    def _resolve(self, config_file_names: Sequence[str]) -> Tuple[str, pathlib.Path]:
+        config_file_name = self.resolve_config_file(
+            config_file_names if config_file_names else self.default_config_files
+        )
+        return config_file_name, self.config_path / config_file_name
+
+    def _update_subscriptions(
+        self, file_path: pathlib.Path, version: Tuple[int, int], config: Any
+    ) -> List[Exception]:
+        errors = []
+        current = []
+        for subscription in self.subscriptions.get(file_path, ()):
+            section = get_config_section(config, subscription.key)
+            if section != subscription.section:
+                try:
+                    model = subscription.model_type(**section)
+                except Exception as error:
+                    errors.append(error)
+                    continue
+
+                subscription.model.__dict__.update(model.__dict__)
+                subscription.section = section
+
+            current.append(subscription.model)
+
+        # Subscribed models are now current, memoized models that were not subscribed will be rebuilt when next used
+        for memo_key, (_, model) in self.models.items():
+            if any(model is current_model for current_model in current):
+                self.models[memo_key] = (file_path, version), model
+
+        return errors
+
+    async def _watch(self, event_hub: Any, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload(event_hub)
+            except Exception:
+                logger.exception("Failed to reload the changed config files")
+
+
+def combine_patterns(patterns: Sequence[re.Pattern]) -> Optional[re.Pattern]:
+    """ Combines patterns into one pattern that is matched against the start of a string. Every pattern is tried at each
+    position in the string before the next pattern is tried, so the group that matches, named "_" followed by the
+    pattern's index, is the first pattern in the sequence that would find a match when searching the string. Returns
+    None when the patterns cannot be combined because they are bytes patterns, use groups, are verbose, or use inline
+    global flags, which would apply to every pattern in the combined pattern. """
+    alternatives = []
+    for index, pattern in enumerate(patterns):
+        if (
+            not isinstance(pattern.pattern, str)
+            or pattern.groups
+            or pattern.flags & re.VERBOSE
+            or _GLOBAL_FLAGS.search(pattern.pattern)
+        ):
+            return None
+
+        flags = "".join(
+            letter for flag, letter in _INLINE_FLAGS if pattern.flags & flag
+        )
+        alternatives.append(f"(?P<_{index}>(?s:.*?)(?{flags}:{pattern.pattern}))")
+
+    if not alternatives:
+        return None
+
+    try:
+        return re.compile("|".join(alternatives))
+    except re.error:
+        return None
+
+
+# Matches inline global flags such as (?i), but not scoped flags such as (?i:...)
+_GLOBAL_FLAGS = re.compile(r"(?<!\\)\(\?[aiLmsux]+\)")
+
+_INLINE_FLAGS = (
+    (re.ASCII, "a"),
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+)
+
 
 class InvalidConfigPath(Exception):
     ...
@@ -134,3 +544,7 @@ class InvalidConfigPath(Exception):
 
 class NoConfigLoaderFound(Exception):
     ...
+
+
+class SectionNotLoadable(Exception):
+    ...
@@ -1,4 +1,17 @@
-from dippy.events.hub import EventHub
+from dippy.events.hub import EventHub, HandlerErrors
+from dippy.events.instrumentation import (
+    CallStats,
+    EventHubInstrumentation,
+    HubStats,
+    LatencySnapshot,
+)
 
 
-__all__ = ["EventHub"]
+__all__ = [
+    "CallStats",
+    "EventHub",
+    "EventHubInstrumentation",
+    "HandlerErrors",
+    "HubStats",
+    "LatencySnapshot",
+]
@@ -1,20 +1,106 @@
 from __future__ import annotations
-from asyncio import iscoroutine, iscoroutinefunction
+from asyncio import Semaphore, gather, iscoroutine, iscoroutinefunction, wait_for
 from collections import defaultdict
-from typing import Any, Coroutine
+from dippy.events.instrumentation import (
+    EventHubInstrumentation,
+    HubStats,
+    handler_name,
+)
+from dippy.events.router import FilterRouter
+from dippy.filters.event import Event
+from dippy.filters.filters import BaseFilter
+from functools import partial
+from inspect import ismethod
+from time import perf_counter
+from types import MethodType
+from typing import Any, Callable, Coroutine, Iterable, Optional
+import weakref
 
 
 class EventHub:
-    def __init__(self):
-        self._handlers: dict[str, set] = defaultdict(set)
+    """Routes events to the coroutines that have registered to listen for them. Handlers are awaited one after
+    another unless concurrent is set, max_concurrency bounds how many run together and handler_timeout cancels any
+    handler that runs longer than the given number of seconds."""
 
-    async def emit(self, event_name: str, event_data: Any):
-        """Emits an event calling all coroutines that have been registered."""
-        for handler in self._handlers.get(event_name, []):
-            await handler(event_data)
+    def __init__(
+        self,
+        *,
+        concurrent: bool = False,
+        max_concurrency: Optional[int] = None,
+        handler_timeout: Optional[float] = None,
+        instrumentation: Optional[EventHubInstrumentation] = None,
+        weak_handlers: bool = False,
+    ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, received {max_concurrency}"
+            )
+
+        self._handlers: dict[str, tuple] = {}
+        self._routers: dict[str, FilterRouter] = defaultdict(FilterRouter)
+        self.concurrent = concurrent
+        self.max_concurrency = max_concurrency
+        self.handler_timeout = handler_timeout
+        self.instrumentation = instrumentation
+        self.weak_handlers = weak_handlers
+
+    async def emit(
+        self, event_name: str, event_data: Any, event: Optional[Event] = None
+    ):
+        """Emits an event calling all coroutines that have been registered.
+
+        Handlers without a filter are called first, in the order they were registered, followed by the filtered
+        handlers that match the event, also in the order they were registered. The event used for filtering is the
+        event argument or, when that is not given, the event data if it is an Event. Filtered handlers are not called
+        when neither is available. Handlers that start or stop listening while the event is being emitted are
+        affected from the next emit.
+
+        In concurrent mode a failing handler does not stop the other handlers, all failures are raised together as a
+        HandlerErrors exception once every handler has finished."""
+        handlers = self._handlers.get(event_name, ())
+        router = self._routers.get(event_name)
+        if router:
+            if event is None and isinstance(event_data, Event):
+                event = event_data
+            if event is not None:
+                handlers = [*handlers, *router.route(event)]
+
+        if not handlers:
+            return
+
+        if self.instrumentation is None:
+            await self._dispatch(self._call_handler, handlers, event_data)
+            return
+
+        started = perf_counter()
+        failed = True
+        try:
+            await self._dispatch(
+                partial(self._call_instrumented, event_name), handlers, event_data
+            )
+            failed = False
+        finally:
+            self.instrumentation.record_event(
+                event_name, perf_counter() - started, failed
+            )
+
+    def on(
+        self,
+        event_name: str,
+        callback: Coroutine,
+        filter_: Optional[BaseFilter] = None,
+        *,
+        weak: Optional[bool] = None,
+    ):
+        """Registers a coroutine to listen for an event. When a filter is given the coroutine will only be called for
+        events that match the filter. The filter is compiled when it is registered and again whenever the IDs of a
+        guild, channel, or user filter in it are changed using add or discard, other changes to it will not change
+        which events the coroutine receives.
 
-    def on(self, event_name: str, callback: Coroutine):
-        """Registers a coroutine to listen for an event.
+        Weakly registered callbacks, by default when the hub was created with weak_handlers, are held through a weak
+        reference and stop listening once nothing else references them. Bound methods die with the object they are
+        bound to. Only register weakly when something else, such as the component manager, keeps the callback alive
+        for as long as it should listen.
 
         Raises ValueError if the callback is not a coroutine."""
         if not iscoroutine(callback) and not iscoroutinefunction(callback):
@@ -22,8 +108,163 @@ class EventHub:
                 f"Event handlers must be coroutines, received a callback of type {type(callback)}"
             )
 
-        self._handlers[event_name].add(callback)
+        if self.weak_handlers if weak is None else weak:
+            callback = WeakHandler(callback, partial(self._remove, event_name))
+
+        if filter_ is None:
+            handlers = self._handlers.get(event_name, ())
+            if callback not in handlers:
+                self._handlers[event_name] = (*handlers, callback)
+        else:
+            self._routers[event_name].add(callback, filter_)
 
     def stop(self, event_name: str, callback: Coroutine):
-        """Removes a callback from listening for an event."""
-        self._handlers[event_name].remove(callback)
+        """Removes a callback from listening for an event, including every filter it was registered with.
+
+        Raises KeyError if the callback was not listening for the event."""
+        if not self._remove(event_name, callback):
+            raise KeyError(callback)
+
+    def stats(self) -> Optional[HubStats]:
+        """Snapshot of the call counts, errors, and latencies the instrumentation has recorded for every emit and
+        handler, None when the hub was created without an EventHubInstrumentation."""
+        if self.instrumentation is None:
+            return None
+        return self.instrumentation.stats()
+
+    def _remove(self, event_name: str, callback: Any) -> bool:
+        router = self._routers.get(event_name)
+        removed = router.remove(callback) if router else False
+
+        handlers = self._handlers.get(event_name, ())
+        if callback in handlers:
+            remaining = tuple(handler for handler in handlers if handler != callback)
+            if remaining:
+                self._handlers[event_name] = remaining
+            else:
+                del self._handlers[event_name]
+            removed = True
+
+        if removed and self.instrumentation is not None:
+            self.instrumentation.forget_handler(event_name, callback)
+        return removed
+
+    async def _dispatch(self, call: Callable, handlers: Iterable, event_data: Any):
+        if self.concurrent:
+            await self._emit_concurrent(call, handlers, event_data)
+        else:
+            for handler in handlers:
+                await call(handler, event_data)
+
+    async def _call_handler(self, handler: Coroutine, event_data: Any):
+        if self.handler_timeout is None:
+            await handler(event_data)
+        else:
+            await wait_for(handler(event_data), self.handler_timeout)
+
+    async def _call_instrumented(
+        self, event_name: str, handler: Coroutine, event_data: Any
+    ):
+        started = perf_counter()
+        failed = True
+        try:
+            if self.handler_timeout is None:
+                await handler(event_data)
+            else:
+                await wait_for(handler(event_data), self.handler_timeout)
+            failed = False
+        finally:
+            self.instrumentation.record_handler(
+                event_name, handler, perf_counter() - started, failed
+            )
+
+    async def _emit_concurrent(
+        self, call_handler: Callable, handlers: Iterable, event_data: Any
+    ):
+        if self.max_concurrency is None:
+            call = call_handler
+        else:
+            semaphore = Semaphore(self.max_concurrency)
+
+            async def call(handler: Coroutine, data: Any):
+                async with semaphore:
+                    await call_handler(handler, data)
+
+        results = await gather(
+            *(call(handler, event_data) for handler in handlers),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise HandlerErrors(errors)
+
+
+class WeakHandler:
+    """Calls an event handler through a weak reference, doing nothing once the handler has been garbage collected.
+    on_dead is called with the weak handler when that happens. A weak handler compares equal to, and hashes the same
+    as, the handler it references so it can be found and stopped using the handler.
+
+    Bound methods are held as a weak reference to the object they are bound to and the method's function, the same
+    parts a WeakMethod holds, so calling them does not create a bound method on every call."""
+
+    __slots__ = ("ref", "function", "name", "_hash")
+
+    def __init__(self, callback: Callable, on_dead: Callable[[WeakHandler], Any]):
+        def dead(_):
+            on_dead(self)
+
+        if ismethod(callback):
+            self.ref = weakref.ref(callback.__self__, dead)
+            self.function = callback.__func__
+        else:
+            self.ref = weakref.ref(callback, dead)
+            self.function = None
+        self.name = handler_name(callback)
+        self._hash = hash(callback)
+
+    def __call__(self, event_data: Any) -> Coroutine:
+        # Returns the handler's coroutine rather than awaiting it, so calling through the weak reference does not add
+        # a coroutine of its own
+        referent = self.ref()
+        if referent is None:
+            return _skip(event_data)
+        if self.function is None:
+            return referent(event_data)
+        return self.function(referent, event_data)
+
+    def __eq__(self, other: Any) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, WeakHandler):
+            other = other.callback()
+        callback = self.callback()
+        return callback is not None and callback == other
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return self.name
+
+    def callback(self) -> Optional[Callable]:
+        """The handler, None if it has been garbage collected."""
+        referent = self.ref()
+        if referent is None or self.function is None:
+            return referent
+        return MethodType(self.function, referent)
+
+
+async def _skip(event_data: Any):
+    pass
+
+
+class HandlerErrors(Exception):
+    """Raised after a concurrent emit when one or more handlers failed. The exceptions attribute holds every
+    exception that was raised, in the order the handlers were started."""
+
+    def __init__(self, exceptions: list[BaseException]):
+        super().__init__(
+            f"{len(exceptions)} event handler(s) failed: "
+            + ", ".join(repr(exception) for exception in exceptions)
+        )
+        self.exceptions = exceptions
@@ -0,0 +1,267 @@
+from __future__ import annotations
+from asyncio import CancelledError, Task, ensure_future, get_event_loop, sleep
+from bisect import bisect_left
+from typing import Any, Callable, NamedTuple, Optional
+import logging
+
+
+# Upper bounds in seconds of the latency histogram buckets, anything slower is counted in a final overflow bucket
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+logger = logging.getLogger("dippy.events")
+
+
+class LatencySnapshot(NamedTuple):
+    """Copy of a latency histogram. Buckets pairs each bucket's upper bound in seconds with the number of
+    observations that fell in it, the last bucket's bound is infinity."""
+
+    count: int
+    total: float
+    max: float
+    buckets: tuple[tuple[float, int], ...]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, quantile: float) -> float:
+        """Estimates a quantile as the upper bound of the bucket it falls in, capped at the largest observation."""
+        if not self.count:
+            return 0.0
+
+        target = quantile * self.count
+        seen = 0
+        for bound, count in self.buckets:
+            seen += count
+            if seen >= target and seen:
+                return min(bound, self.max)
+        return self.max
+
+
+class CallStats(NamedTuple):
+    """Call counts and latencies for an event or a handler. Errors include handlers that timed out or were
+    cancelled, slow counts the calls that took longer than the slow handler threshold."""
+
+    calls: int
+    errors: int
+    slow: int
+    latency: LatencySnapshot
+
+
+class HubStats(NamedTuple):
+    """Snapshot of an instrumented event hub. Events maps event names to the stats for whole emits, handlers maps
+    (event name, handler name) pairs to the stats for each handler, and loop_lag holds how late the loop lag monitor's
+    ticks ran."""
+
+    events: dict[str, CallStats]
+    handlers: dict[tuple[str, str], CallStats]
+    loop_lag: LatencySnapshot
+
+    def slowest_handlers(
+        self, quantile: float = 0.99, limit: int = 10
+    ) -> list[tuple[tuple[str, str], float]]:
+        """Lists the handlers with the highest latency at the given quantile along with that latency."""
+        latencies = (
+            (key, stats.latency.quantile(quantile))
+            for key, stats in self.handlers.items()
+        )
+        return sorted(latencies, key=lambda item: item[1], reverse=True)[:limit]
+
+
+class LatencyHistogram:
+    """Counts observations in fixed buckets, recording an observation is a binary search and two additions."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.clear()
+
+    def clear(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> LatencySnapshot:
+        return LatencySnapshot(
+            self.count,
+            self.total,
+            self.max,
+            tuple(zip((*self.bounds, float("inf")), self.counts)),
+        )
+
+
+class CallRecord:
+    """Live counts and latency histogram for an event or handler."""
+
+    __slots__ = ("calls", "errors", "slow", "latency")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.calls = self.errors = self.slow = 0
+        self.latency = LatencyHistogram(bounds)
+
+    def observe(self, seconds: float, failed: bool):
+        # Inlines LatencyHistogram.observe, this runs for every handler call
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        latency = self.latency
+        latency.counts[bisect_left(latency.bounds, seconds)] += 1
+        latency.count += 1
+        latency.total += seconds
+        if seconds > latency.max:
+            latency.max = seconds
+
+    def snapshot(self) -> CallStats:
+        return CallStats(self.calls, self.errors, self.slow, self.latency.snapshot())
+
+
+class EventHubInstrumentation:
+    """Records call counts, errors, and latency histograms for the events an EventHub emits and for each of their
+    handlers. Pass an instance to the EventHub's instrumentation argument to enable it, hubs without instrumentation
+    do not pay for it.
+
+    Handlers that take longer than slow_handler_threshold seconds are counted as slow and logged as a warning on the
+    dippy.events logger. start_loop_lag_monitor runs a task that measures how late the event loop wakes it, showing
+    when handlers block the loop. stats returns a snapshot of everything that has been recorded.
+
+    revision is increased whenever an event or handler is recorded for the first time or the records are reset, so
+    exporters can tell when there are new records to pick up without comparing them.
+    """
+
+    def __init__(
+        self,
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        slow_handler_threshold: Optional[float] = None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.slow_handler_threshold = slow_handler_threshold
+        self.loop_lag = LatencyHistogram(self.buckets)
+        self._events: dict[str, CallRecord] = {}
+        self._handlers: dict[tuple[str, str], CallRecord] = {}
+        # Finds the record for a registered handler without building its name on every call
+        self._handler_records: dict[tuple[str, Callable], CallRecord] = {}
+        self._loop_lag_monitor: Optional[Task] = None
+        self.revision = 0
+
+    def record_event(self, event_name: str, seconds: float, failed: bool):
+        """Records an emit of an event that took the given number of seconds to run all of its handlers."""
+        record = self._events.get(event_name)
+        if record is None:
+            record = self._events[event_name] = CallRecord(self.buckets)
+            self.revision += 1
+        record.observe(seconds, failed)
+
+    def record_handler(
+        self, event_name: str, handler: Callable, seconds: float, failed: bool
+    ):
+        """Records a call to an event handler that took the given number of seconds."""
+        record = self._handler_records.get((event_name, handler))
+        if record is None:
+            record = self._add_handler(event_name, handler)
+        record.observe(seconds, failed)
+
+        threshold = self.slow_handler_threshold
+        if threshold is not None and seconds > threshold:
+            record.slow += 1
+            logger.warning(
+                "Handler %s took %.3fs to handle %r, the slow handler threshold is %.3fs",
+                handler_name(handler),
+                seconds,
+                event_name,
+                threshold,
+            )
+
+    def forget_handler(self, event_name: str, handler: Callable):
+        """Drops the instrumentation's reference to a handler that has stopped listening for an event, the stats it
+        recorded are kept."""
+        self._handler_records.pop((event_name, handler), None)
+
+    def records(
+        self,
+    ) -> tuple[dict[str, CallRecord], dict[tuple[str, str], CallRecord]]:
+        """The live records for each event and handler, exporters read their calls, errors, slow, and latency
+        attributes directly instead of taking a snapshot."""
+        return self._events, self._handlers
+
+    def stats(self) -> HubStats:
+        return HubStats(
+            {name: record.snapshot() for name, record in self._events.items()},
+            {key: record.snapshot() for key, record in self._handlers.items()},
+            self.loop_lag.snapshot(),
+        )
+
+    def reset(self):
+        """Clears everything that has been recorded."""
+        self._events.clear()
+        self._handlers.clear()
+        self._handler_records.clear()
+        self.loop_lag.clear()
+        self.revision += 1
+
+    def start_loop_lag_monitor(self, interval: float = 0.1):
+        """Starts a task on the running loop that sleeps for the interval and records how much later than the interval
+        it woke up. Does nothing if the monitor is already running."""
+        if self._loop_lag_monitor and not self._loop_lag_monitor.done():
+            return
+
+        self._loop_lag_monitor = ensure_future(self._monitor_loop_lag(interval))
+
+    def stop_loop_lag_monitor(self):
+        if self._loop_lag_monitor:
+            self._loop_lag_monitor.cancel()
+            self._loop_lag_monitor = None
+
+    async def _monitor_loop_lag(self, interval: float):
+        loop = get_event_loop()
+        try:
+            while True:
+                expected = loop.time() + interval
+                await sleep(interval)
+                self.loop_lag.observe(max(0.0, loop.time() - expected))
+        except CancelledError:
+            pass
+
+    def _add_handler(self, event_name: str, handler: Callable) -> CallRecord:
+        key = event_name, handler_name(handler)
+        record = self._handlers.get(key)
+        if record is None:
+            record = self._handlers[key] = CallRecord(self.buckets)
+            self.revision += 1
+        self._handler_records[event_name, handler] = record
+        return record
+
+
+def handler_name(handler: Any) -> str:
+    """Names a handler by its module and qualified name, falling back to its repr."""
+    name = getattr(handler, "__qualname__", None)
+    if name is None:
+        return repr(handler)
+    module = getattr(handler, "__module__", None)
+    return f"{module}.{name}" if module else name
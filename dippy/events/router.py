@@ -0,0 +1,163 @@
+from __future__ import annotations
+from dippy.filters.event import Event
+from dippy.filters.filters import (
+    AggregateFilter,
+    BaseFilter,
+    ChannelFilter,
+    GuildFilter,
+    InverseFilter,
+    LabelFilter,
+    RoleFilter,
+    UserFilter,
+)
+from functools import partial
+from itertools import count
+from operator import attrgetter
+from typing import Callable, Coroutine, Hashable, Iterator, Optional, Set, Tuple
+
+
+IndexKey = Tuple[str, Hashable]
+
+# Maps the filters that can be indexed to the event attribute they check and the filter attribute holding the values
+# they check for
+_INDEXED_FILTERS = {
+    GuildFilter: ("guild_id", "guild_ids"),
+    ChannelFilter: ("channel_id", "channel_ids"),
+    UserFilter: ("member_id", "user_ids"),
+    LabelFilter: ("labels", "labels"),
+    RoleFilter: ("role_ids", "role_ids"),
+}
+
+
+class FilteredHandler:
+    """A handler registered with a filter. The filter is compiled when the handler is registered and again whenever
+    the IDs of a filter in its tree are changed using add or discard, other changes made to the filter after it is
+    registered will not change which events the handler receives."""
+
+    __slots__ = ("callback", "filter", "position", "predicate", "keys", "watcher")
+
+    def __init__(self, callback: Coroutine, filter_: BaseFilter, position: int):
+        self.callback = callback
+        self.filter = filter_
+        self.position = position
+        self.predicate: Callable[[Event], bool] = filter_.compile()
+        self.keys = index_keys(filter_)
+        self.watcher: Optional[Callable[[BaseFilter], None]] = None
+
+
+class FilterRouter:
+    """Indexes filtered handlers by the guild, channel, member, label, and role values their filters require so that
+    routing an event only evaluates the filters of handlers that could match it.
+
+    Handlers whose filters cannot be indexed, such as inverse filters, are evaluated for every event. The handlers
+    that match an event are returned in the order they were registered. The router watches every filter in a
+    handler's filter tree and compiles and indexes the handler again when one changes."""
+
+    def __init__(self):
+        self._index: dict[IndexKey, Set[FilteredHandler]] = {}
+        self._unindexed: Set[FilteredHandler] = set()
+        self._handlers: dict[Tuple[Coroutine, BaseFilter], FilteredHandler] = {}
+        self._positions = count()
+
+    def __bool__(self) -> bool:
+        return bool(self._handlers)
+
+    def add(self, callback: Coroutine, filter_: BaseFilter):
+        """Registers a callback to receive events that match the filter."""
+        if (callback, filter_) in self._handlers:
+            return
+
+        handler = FilteredHandler(callback, filter_, next(self._positions))
+        self._handlers[callback, filter_] = handler
+        self._index_handler(handler)
+        handler.watcher = partial(self._refresh, handler)
+        for child in walk_filters(filter_):
+            child.watch(handler.watcher)
+
+    def remove(self, callback: Coroutine) -> bool:
+        """Removes every registration of the callback, returning False if it was not registered."""
+        handlers = [
+            handler
+            for handler in self._handlers.values()
+            if handler.callback == callback
+        ]
+        for handler in handlers:
+            del self._handlers[handler.callback, handler.filter]
+            self._unindex_handler(handler)
+            for child in walk_filters(handler.filter):
+                child.unwatch(handler.watcher)
+
+        return bool(handlers)
+
+    def route(self, event: Event) -> list:
+        """Gets the callbacks of all handlers whose filters match the event."""
+        candidates = set(self._unindexed)
+        index = self._index
+        for attribute in ("guild_id", "channel_id", "member_id"):
+            value = getattr(event, attribute)
+            if value is not None and (attribute, value) in index:
+                candidates.update(index[attribute, value])
+
+        for attribute in ("labels", "role_ids"):
+            for value in getattr(event, attribute):
+                if (attribute, value) in index:
+                    candidates.update(index[attribute, value])
+
+        matched = [handler for handler in candidates if handler.predicate(event)]
+        if len(matched) > 1:
+            matched.sort(key=attrgetter("position"))
+        return [handler.callback for handler in matched]
+
+    def _refresh(self, handler: FilteredHandler, _: BaseFilter):
+        self._unindex_handler(handler)
+        handler.predicate = handler.filter.compile()
+        handler.keys = index_keys(handler.filter)
+        self._index_handler(handler)
+
+    def _index_handler(self, handler: FilteredHandler):
+        if handler.keys is None:
+            self._unindexed.add(handler)
+        else:
+            for key in handler.keys:
+                self._index.setdefault(key, set()).add(handler)
+
+    def _unindex_handler(self, handler: FilteredHandler):
+        if handler.keys is None:
+            self._unindexed.discard(handler)
+            return
+
+        for key in handler.keys:
+            indexed = self._index[key]
+            indexed.discard(handler)
+            if not indexed:
+                del self._index[key]
+
+
+def index_keys(filter_: BaseFilter) -> Optional[Set[IndexKey]]:
+    """Finds the index keys an event must have at least one of to match the filter. Returns None when the filter can
+    match events that have none of the keys the index knows about."""
+    filter_type = type(filter_)
+    if filter_type in _INDEXED_FILTERS:
+        attribute, values = _INDEXED_FILTERS[filter_type]
+        return {(attribute, value) for value in getattr(filter_, values)}
+
+    if filter_type is AggregateFilter and filter_.method in {all, any}:
+        keys = [index_keys(child) for child in filter_.filters]
+        if filter_.method is all:
+            keys = [child_keys for child_keys in keys if child_keys is not None]
+            return min(keys, key=len) if keys else None
+
+        if keys and all(child_keys is not None for child_keys in keys):
+            return set().union(*keys)
+
+    return None
+
+
+def walk_filters(filter_: BaseFilter) -> Iterator[BaseFilter]:
+    """Yields the filter and every filter nested inside it."""
+    yield filter_
+    if isinstance(filter_, AggregateFilter):
+        for child in filter_.filters:
+            yield from walk_filters(child)
+    elif isinstance(filter_, InverseFilter):
+        yield from walk_filters(filter_.filter)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+from dippy.filters.event import Event
+from dippy.filters.filters import (
+    AggregateFilter,
+    AggregationType,
+    BaseFilter,
+    ChannelFilter,
+    GlobalFilter,
+    GuildFilter,
+    InverseFilter,
+    LabelFilter,
+    RoleFilter,
+    UserFilter,
+)
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+
+Predicate = Callable[[Event], bool]
+
+# Maps the filters that match an event attribute against a collection of values to the filter attribute that holds
+# those values and the event attribute they are checked against
+_ID_FILTERS: Dict[Type[BaseFilter], Tuple[str, str]] = {
+    GuildFilter: ("guild_ids", "guild_id"),
+    ChannelFilter: ("channel_ids", "channel_id"),
+    UserFilter: ("user_ids", "member_id"),
+}
+_SET_FILTERS: Dict[Type[BaseFilter], Tuple[str, str]] = {
+    LabelFilter: ("labels", "labels"),
+    RoleFilter: ("role_ids", "role_ids"),
+}
+
+
+def compile_filter(filter_: BaseFilter) -> Predicate:
+    """ Compiles a filter tree into a single predicate function that takes an event and returns a bool.
+
+    The tree is simplified before it is compiled: nested aggregates of the same type are flattened, sibling guild,
+    channel, and user filters are merged into a single lookup, double negations are removed, and the cheapest checks
+    are ordered first. The predicate is a snapshot of the filter tree, changes made to the filters after compiling
+    will not be reflected by the predicate.
+    """
+    compiler = _Compiler()
+    expression = compiler.expression(simplify(filter_))
+    source = f"def predicate(event):\n    return {expression}\n"
+    exec(source, compiler.namespace)
+    return compiler.namespace["predicate"]
+
+
+def simplify(filter_: BaseFilter) -> BaseFilter:
+    """ Creates an equivalent filter tree that has been flattened, merged, and reordered. The original filters are not
+    modified. """
+    if type(filter_) is InverseFilter:
+        inner = simplify(filter_.filter)
+        if type(inner) is InverseFilter:
+            return inner.filter
+        return InverseFilter(inner)
+
+    aggregation_type = _aggregation_type(filter_)
+    if aggregation_type is None:
+        return filter_
+
+    filters = _merge(
+        _flatten(map(simplify, filter_.filters), aggregation_type), aggregation_type
+    )
+    if aggregation_type == AggregationType.AND:
+        filters = [f for f in filters if type(f) is not GlobalFilter]
+        if not filters:
+            return GlobalFilter()
+    elif any(type(f) is GlobalFilter for f in filters):
+        return GlobalFilter()
+
+    if len(filters) == 1:
+        return filters[0]
+
+    filters.sort(key=_cost)
+    method = all if aggregation_type == AggregationType.AND else any
+    return AggregateFilter(*filters, method=method, aggregation_type=aggregation_type)
+
+
+def _aggregation_type(filter_: BaseFilter) -> Optional[AggregationType]:
+    """ Gets the aggregation type an aggregate filter behaves as, or None for filters that cannot be simplified. """
+    if type(filter_) is not AggregateFilter:
+        return None
+    if filter_.method is all:
+        return AggregationType.AND
+    if filter_.method is any:
+        return AggregationType.OR
+    return None
+
+
+def _cost(filter_: BaseFilter) -> int:
+    if type(filter_) is GlobalFilter:
+        return 0
+    if type(filter_) in _ID_FILTERS:
+        return 1
+    if type(filter_) in _SET_FILTERS:
+        return 2
+    if type(filter_) is InverseFilter:
+        return _cost(filter_.filter)
+    if _aggregation_type(filter_) is not None:
+        return 1 + sum(map(_cost, filter_.filters))
+    return 10
+
+
+def _flatten(filters, aggregation_type: AggregationType) -> List[BaseFilter]:
+    flattened = []
+    for filter_ in filters:
+        if _aggregation_type(filter_) == aggregation_type:
+            flattened.extend(filter_.filters)
+        else:
+            flattened.append(filter_)
+    return flattened
+
+
+def _merge(
+    filters: List[BaseFilter], aggregation_type: AggregationType
+) -> List[BaseFilter]:
+    """ Merges sibling filters that check the same event attribute. Any of several ID sets matching is the union of the
+    sets, all of them matching is the intersection. Label and role filters match when any value is shared so they
+    can only be merged when any of them need to match. """
+    mergeable = dict(_ID_FILTERS)
+    if aggregation_type == AggregationType.OR:
+        mergeable.update(_SET_FILTERS)
+
+    merged: Dict[Type[BaseFilter], set] = {}
+    positions: Dict[Type[BaseFilter], int] = {}
+    results: List[Any] = []
+    for filter_ in filters:
+        filter_type = type(filter_)
+        if filter_type not in mergeable:
+            results.append(filter_)
+            continue
+
+        values = set(getattr(filter_, mergeable[filter_type][0]))
+        if filter_type not in merged:
+            merged[filter_type] = values
+            positions[filter_type] = len(results)
+            results.append(filter_type)
+        elif aggregation_type == AggregationType.AND:
+            merged[filter_type] &= values
+        else:
+            merged[filter_type] |= values
+
+    for filter_type, position in positions.items():
+        results[position] = filter_type(*merged[filter_type])
+
+    return results
+
+
+class _Compiler:
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {}
+
+    def constant(self, value: Any) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def expression(self, filter_: BaseFilter) -> str:
+        filter_type = type(filter_)
+        if filter_type is GlobalFilter:
+            return "True"
+
+        if filter_type in _ID_FILTERS:
+            values_attribute, event_attribute = _ID_FILTERS[filter_type]
+            values = frozenset(getattr(filter_, values_attribute))
+            if not values:
+                return "False"
+            return f"(event.{event_attribute} in {self.constant(values)})"
+
+        if filter_type in _SET_FILTERS:
+            values_attribute, event_attribute = _SET_FILTERS[filter_type]
+            values = frozenset(getattr(filter_, values_attribute))
+            if not values:
+                return "False"
+            return f"(not {self.constant(values)}.isdisjoint(event.{event_attribute}))"
+
+        if filter_type is InverseFilter:
+            return f"(not {self.expression(filter_.filter)})"
+
+        aggregation_type = _aggregation_type(filter_)
+        if aggregation_type == AggregationType.AND:
+            return f"({' and '.join(map(self.expression, filter_.filters)) or 'True'})"
+        if aggregation_type == AggregationType.OR:
+            return f"({' or '.join(map(self.expression, filter_.filters)) or 'False'})"
+
+        return f"{self.constant(filter_.matches)}(event)"
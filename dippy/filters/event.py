@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
-from typing import Optional, Set
+from __future__ import annotations
+from dataclasses import FrozenInstanceError
+from typing import AbstractSet, Any, Optional, Tuple
 
 
 GuildID = int
@@ -8,11 +9,115 @@ RoleID = int
 UserID = int
 Label = str
 
+NO_ROLES: AbstractSet[RoleID] = frozenset()
+NO_LABELS: AbstractSet[Label] = frozenset()
+
 
-@dataclass
 class Event:
-    guild_id: Optional[GuildID] = None
-    channel_id: Optional[ChannelID] = None
-    role_ids: Set[RoleID] = field(default_factory=set)
-    member_id: Optional[UserID] = None
-    labels: Set[Label] = field(default_factory=set)
+    """ The details of a Discord event that filters match against.
+
+    Events use slots and share a single empty frozenset for events that have no roles or labels, so creating an event
+    for every gateway event only allocates the event itself. Use FrozenEvent for an immutable, hashable event.
+    """
+
+    __slots__ = ("guild_id", "channel_id", "role_ids", "member_id", "labels")
+
+    def __init__(
+        self,
+        guild_id: Optional[GuildID] = None,
+        channel_id: Optional[ChannelID] = None,
+        role_ids: AbstractSet[RoleID] = NO_ROLES,
+        member_id: Optional[UserID] = None,
+        labels: AbstractSet[Label] = NO_LABELS,
+    ):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.role_ids = role_ids
+        self.member_id = member_id
+        self.labels = labels
+
+    @classmethod
+    def from_member(cls, member: Any, labels: AbstractSet[Label] = NO_LABELS) -> Event:
+        """ Creates an event from a discord.py member. """
+        roles = getattr(member, "roles", None)
+        return cls(
+            guild_id=member.guild.id,
+            role_ids=frozenset(role.id for role in roles) if roles else NO_ROLES,
+            member_id=member.id,
+            labels=labels,
+        )
+
+    @classmethod
+    def from_message(
+        cls, message: Any, labels: AbstractSet[Label] = NO_LABELS
+    ) -> Event:
+        """ Creates an event from a discord.py message. Direct messages have no guild and their authors have no
+        roles. """
+        guild = message.guild
+        author = message.author
+        roles = getattr(author, "roles", None)
+        return cls(
+            guild_id=None if guild is None else guild.id,
+            channel_id=message.channel.id,
+            role_ids=frozenset(role.id for role in roles) if roles else NO_ROLES,
+            member_id=author.id,
+            labels=labels,
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def _values(self) -> Tuple:
+        return (
+            self.guild_id,
+            self.channel_id,
+            self.role_ids,
+            self.member_id,
+            self.labels,
+        )
+
+
+class FrozenEvent(Event):
+    """ Immutable event that can be hashed. Role IDs and labels are stored as frozensets. """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        guild_id: Optional[GuildID] = None,
+        channel_id: Optional[ChannelID] = None,
+        role_ids: AbstractSet[RoleID] = NO_ROLES,
+        member_id: Optional[UserID] = None,
+        labels: AbstractSet[Label] = NO_LABELS,
+    ):
+        set_attribute = object.__setattr__
+        set_attribute(self, "guild_id", guild_id)
+        set_attribute(self, "channel_id", channel_id)
+        set_attribute(
+            self,
+            "role_ids",
+            role_ids if type(role_ids) is frozenset else frozenset(role_ids),
+        )
+        set_attribute(self, "member_id", member_id)
+        set_attribute(
+            self, "labels", labels if type(labels) is frozenset else frozenset(labels)
+        )
+
+    def __setattr__(self, name: str, value: Any):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __hash__(self) -> int:
+        return hash(self._values())
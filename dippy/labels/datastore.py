@@ -1,9 +1,11 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Mapping, Sequence, Set
+from typing import Any, Iterable, Mapping, Sequence, Set, Tuple
 
 
 Labels = Mapping[str, Any]
+ObjectIdentifier = Tuple[str, int]
+LabelAssignment = Tuple[str, int, str, Any]
 
 
 class NoLabelsProvided(Exception):
@@ -14,7 +16,8 @@ class Datastore(ABC):
     """Abstract base class for datastore providers.
 
     All datastore providers should implement this interface so that Bevy can locate the
-    the appropriate instance."""
+    the appropriate instance. The bulk operations call the single object operations for each object, datastores should
+    override them when they can do the work more efficiently."""
 
     @property
     @abstractmethod
@@ -57,3 +60,92 @@ class Datastore(ABC):
         """Updates the named label for all objects that match the given labels. If an object matches but doesn't
         already have the named label, the label should be created."""
         ...
+
+    def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects."""
+        for object_type, object_id in objects:
+            self.clear_labels(object_type, object_id)
+
+    def get_object_labels_many(
+        self, objects: Iterable[ObjectIdentifier]
+    ) -> Sequence[Labels]:
+        """Gets the labels for each of the (object_type, object_id) objects, in the order they were given."""
+        return tuple(
+            self.get_object_labels(object_type, object_id)
+            for object_type, object_id in objects
+        )
+
+    def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels."""
+        for object_type, object_id, label_name, label_value in labels:
+            self.set_label(object_type, object_id, label_name, label_value)
+
+
+class AsyncDatastore(ABC):
+    """Abstract base class for datastore providers that can be awaited from the event loop.
+
+    This mirrors the Datastore interface with every operation being a coroutine, so stores backed by a disk or the
+    network do not block the event loop while they work."""
+
+    @property
+    @abstractmethod
+    def supported_object_types(self) -> Set[str]:
+        """All object types that the datastore supports. These should all be in casefold form."""
+        ...
+
+    @abstractmethod
+    async def clear_label(self, label_name: str, **labels):
+        """Clears a named label from all objects that match the provided labels. Providing no labels will raise an
+        NoLabelsProvided exception."""
+        ...
+
+    @abstractmethod
+    async def clear_labels(self, object_type: str, object_id: int):
+        """Clears all labels from an object."""
+        ...
+
+    @abstractmethod
+    async def get_labels(self, **labels) -> Sequence[Labels]:
+        """Gets all objects that match the given labels. This should respect the object_type and object_id labels. If
+        no objects match the labels this will return an empty sequence."""
+        ...
+
+    @abstractmethod
+    async def get_object_labels(self, object_type: str, object_id: int) -> Labels:
+        """Gets the labels for a given object. If the object does not exist this should return a mapping containing
+        only the object_type and object_id keys and their provided values."""
+        ...
+
+    @abstractmethod
+    async def set_label(
+        self, object_type: str, object_id: int, label_name: str, label_value: Any
+    ):
+        """Sets the named label for the requested object."""
+        ...
+
+    @abstractmethod
+    async def update_label(self, label_name: str, label_value: Any, **labels):
+        """Updates the named label for all objects that match the given labels. If an object matches but doesn't
+        already have the named label, the label should be created."""
+        ...
+
+    async def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects."""
+        for object_type, object_id in objects:
+            await self.clear_labels(object_type, object_id)
+
+    async def get_object_labels_many(
+        self, objects: Iterable[ObjectIdentifier]
+    ) -> Sequence[Labels]:
+        """Gets the labels for each of the (object_type, object_id) objects, in the order they were given."""
+        return tuple(
+            [
+                await self.get_object_labels(object_type, object_id)
+                for object_type, object_id in objects
+            ]
+        )
+
+    async def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels."""
+        for object_type, object_id, label_name, label_value in labels:
+            await self.set_label(object_type, object_id, label_name, label_value)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dippy.labels.datastore import (
+    AsyncDatastore,
+    Datastore,
+    LabelAssignment,
+    Labels,
+    ObjectIdentifier,
+)
+from typing import Any, Callable, Iterable, Optional, Sequence, Set
+import asyncio
+import functools
+
+
+class ExecutorStore(AsyncDatastore):
+    """Async datastore that runs the operations of a synchronous datastore on an executor so they can be awaited from
+    event handlers without blocking the event loop.
+
+    By default a thread pool with a single worker is created, which runs operations one at a time so datastores that
+    are not thread safe, such as MemoryStore, can be used. A larger max_workers or a custom executor should only be
+    used with a datastore that is safe to call from multiple threads.
+
+    Labels that are read are copied into dicts on the executor, as datastores such as MemoryStore return views over
+    their stored labels which would otherwise be read on the event loop while other operations change them."""
+
+    def __init__(
+        self,
+        datastore: Datastore,
+        *,
+        max_workers: int = 1,
+        executor: Optional[Executor] = None,
+    ):
+        self.datastore = datastore
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dippy-datastore"
+        )
+
+    @property
+    def supported_object_types(self) -> Set[str]:
+        """All object types that the wrapped datastore supports."""
+        return self.datastore.supported_object_types
+
+    async def clear_label(self, label_name: str, **labels):
+        """Clears a named label from all objects that match the provided labels. Providing no labels will raise an
+        NoLabelsProvided exception."""
+        await self._run(self.datastore.clear_label, label_name, **labels)
+
+    async def clear_labels(self, object_type: str, object_id: int):
+        """Clears all labels from an object."""
+        await self._run(self.datastore.clear_labels, object_type, object_id)
+
+    async def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects."""
+        await self._run(self.datastore.clear_labels_many, list(objects))
+
+    async def get_labels(self, **labels) -> Sequence[Labels]:
+        """Gets all objects that match the given labels. This should respect the object_type and object_id labels. If
+        no objects match the labels this will return an empty sequence."""
+        return await self._run(_copy_many, self.datastore.get_labels, **labels)
+
+    async def get_object_labels(self, object_type: str, object_id: int) -> Labels:
+        """Gets the labels for a given object. If the object does not exist this should return a mapping containing
+        only the object_type and object_id keys and their provided values."""
+        return await self._run(
+            _copy, self.datastore.get_object_labels, object_type, object_id
+        )
+
+    async def get_object_labels_many(
+        self, objects: Iterable[ObjectIdentifier]
+    ) -> Sequence[Labels]:
+        """Gets the labels for each of the (object_type, object_id) objects, in the order they were given."""
+        return await self._run(
+            _copy_many, self.datastore.get_object_labels_many, list(objects)
+        )
+
+    async def set_label(
+        self, object_type: str, object_id: int, label_name: str, label_value: Any
+    ):
+        """Sets the named label for the requested object."""
+        await self._run(
+            self.datastore.set_label, object_type, object_id, label_name, label_value
+        )
+
+    async def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels."""
+        await self._run(self.datastore.set_labels_many, list(labels))
+
+    async def update_label(self, label_name: str, label_value: Any, **labels):
+        """Updates the named label for all objects that match the given labels. If an object matches but doesn't
+        already have the named label, the label should be created."""
+        await self._run(self.datastore.update_label, label_name, label_value, **labels)
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the executor if it was created by the store."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def _run(self, method: Callable, /, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(method, *args, **kwargs)
+        )
+
+
+def _copy(method: Callable, /, *args, **kwargs) -> Labels:
+    return dict(method(*args, **kwargs))
+
+
+def _copy_many(method: Callable, /, *args, **kwargs) -> Sequence[Labels]:
+    return tuple(dict(labels) for labels in method(*args, **kwargs))
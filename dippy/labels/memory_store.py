@@ -1,13 +1,86 @@
 from collections import defaultdict
-from dippy.labels.datastore import Datastore, Labels, NoLabelsProvided
-from typing import Set, Sequence, Any
+from dippy.labels.datastore import (
+    Datastore,
+    LabelAssignment,
+    Labels,
+    NoLabelsProvided,
+    ObjectIdentifier,
+)
+from itertools import count
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Set,
+    Sequence,
+    Tuple,
+)
+
+
+ObjectKey = Tuple[str, int]
+
+_NO_LABELS: Mapping[str, Any] = MappingProxyType({})
+
+
+class LabelsView(Mapping):
+    """Read only view of an object's labels that includes the object_type and object_id keys without copying the
+    underlying labels. The view reflects the labels the object has at the time it is read."""
+
+    __slots__ = ("_labels", "object_type", "object_id")
+
+    def __init__(self, labels: Mapping[str, Any], object_type: str, object_id: int):
+        self._labels = labels
+        self.object_type = object_type
+        self.object_id = object_id
+
+    def __contains__(self, key: Any) -> bool:
+        return key == "object_type" or key == "object_id" or key in self._labels
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "object_type":
+            return self.object_type
+        if key == "object_id":
+            return self.object_id
+        return self._labels[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._labels:
+            if key != "object_type" and key != "object_id":
+                yield key
+        yield "object_type"
+        yield "object_id"
+
+    def __len__(self) -> int:
+        hidden = ("object_type" in self._labels) + ("object_id" in self._labels)
+        return len(self._labels) - hidden + 2
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
 
 
 class MemoryStore(Datastore):
-    """Simple datastore that keeps all labels in memory for the duration of the application's runtime."""
+    """Simple datastore that keeps all labels in memory for the duration of the application's runtime.
+
+    Alongside the labels the store maintains inverted indexes from (label name, label value), object type, and object
+    ID to the matching objects. Queries intersect those indexes rather than scanning every object, the matched
+    objects are then checked against the query so the results are the same as a full scan would give.
+
+    Labels are returned as read only LabelsView mappings over the stored labels so reads do not allocate a copy of
+    each object's labels."""
 
     def __init__(self):
-        self.store = defaultdict(dict)
+        self.store: Dict[ObjectKey, Dict[str, Any]] = {}
+        self._label_index: Dict[Tuple[str, Hashable], Set[ObjectKey]] = {}
+        self._unhashable_labels: Dict[str, Set[ObjectKey]] = defaultdict(set)
+        self._type_index: Dict[str, Set[ObjectKey]] = defaultdict(set)
+        self._id_index: Dict[int, Set[ObjectKey]] = defaultdict(set)
+        self._positions: Dict[ObjectKey, int] = {}
+        self._counter = count()
 
     @property
     def supported_object_types(self) -> Set[str]:
@@ -20,26 +93,61 @@ class MemoryStore(Datastore):
         if not labels:
             raise NoLabelsProvided()
 
-        for object_labels in self._get_object_labels():
-            if label_name in object_labels and self._labels_match(
-                object_labels, labels
-            ):
-                del self.store[
-                    object_labels["object_type"], object_labels["object_id"]
-                ][label_name]
+        for key in self._find(labels):
+            object_labels = self.store[key]
+            if label_name in object_labels:
+                self._unindex_label(key, label_name, object_labels.pop(label_name))
 
     def clear_labels(self, object_type: str, object_id: int):
         """Clears all labels from an object."""
-        del self.store[object_type, object_id]
+        key = object_type, object_id
+        object_labels = self.store.pop(key)
+        for label_name, label_value in object_labels.items():
+            self._unindex_label(key, label_name, label_value)
+
+        self._discard(self._type_index, object_type, key)
+        self._discard(self._id_index, object_id, key)
+        del self._positions[key]
+
+    def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects."""
+        store = self.store
+        label_index = self._label_index
+        type_index = self._type_index
+        id_index = self._id_index
+        positions = self._positions
+        unindex_label = self._unindex_label
+        for object_type, object_id in objects:
+            key = object_type, object_id
+            object_labels = store.pop(key)
+            del positions[key]
+            for label in object_labels.items():
+                try:
+                    keys = label_index[label]
+                except KeyError:
+                    continue
+                except TypeError:
+                    unindex_label(key, *label)
+                    continue
+
+                keys.discard(key)
+                if not keys:
+                    del label_index[label]
+
+            keys = type_index[object_type]
+            keys.discard(key)
+            if not keys:
+                del type_index[object_type]
+
+            keys = id_index[object_id]
+            keys.discard(key)
+            if not keys:
+                del id_index[object_id]
 
     def get_labels(self, **labels) -> Sequence[Labels]:
         """Gets all objects that match the given labels. This should respect the object_type and object_id labels. If
         no objects match the labels this will return an empty sequence."""
-        return tuple(
-            item
-            for item in self._get_object_labels()
-            if self._labels_match(item, labels)
-        )
+        return tuple(self._get_labels_for_object(*key) for key in self._find(labels))
 
     def get_object_labels(self, object_type: str, object_id: int) -> Labels:
         """Gets the labels for a given object. If the object does not exist this should return a mapping containing
@@ -50,26 +158,120 @@ class MemoryStore(Datastore):
         self, object_type: str, object_id: int, label_name: str, label_value: Any
     ):
         """Sets the named label for the requested object."""
-        self.store[object_type, object_id][label_name] = label_value
+        key = object_type, object_id
+        object_labels = self.store.get(key)
+        if object_labels is None:
+            object_labels = self._add_object(key)
+        elif label_name in object_labels:
+            self._unindex_label(key, label_name, object_labels[label_name])
+
+        object_labels[label_name] = label_value
+        self._index_label(key, label_name, label_value)
+
+    def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels."""
+        store = self.store
+        label_index = self._label_index
+        type_index = self._type_index
+        id_index = self._id_index
+        positions = self._positions
+        next_position = self._counter.__next__
+        index_label = self._index_label
+        unindex_label = self._unindex_label
+        for object_type, object_id, label_name, label_value in labels:
+            key = object_type, object_id
+            object_labels = store.get(key)
+            if object_labels is None:
+                object_labels = store[key] = {}
+                type_index[object_type].add(key)
+                id_index[object_id].add(key)
+                positions[key] = next_position()
+            elif label_name in object_labels:
+                unindex_label(key, label_name, object_labels[label_name])
+
+            object_labels[label_name] = label_value
+            try:
+                label_index[label_name, label_value].add(key)
+            except (KeyError, TypeError):
+                index_label(key, label_name, label_value)
 
     def update_label(self, label_name: str, label_value: Any, **labels):
         """Updates the named label for all objects that match the given labels. If an object matches but doesn't
         already have the named label, the label should be created."""
-        for item in self._get_object_labels():
-            if self._labels_match(item, labels):
-                self.set_label(
-                    item["object_type"], item["object_id"], label_name, label_value
-                )
+        for object_type, object_id in self._find(labels):
+            self.set_label(object_type, object_id, label_name, label_value)
 
-    def _get_labels_for_object(self, object_type: str, object_id: int) -> Labels:
-        object_labels = self.store.get((object_type, object_id), {}).copy()
-        object_labels["object_type"] = object_type
-        object_labels["object_id"] = object_id
+    def _add_object(self, key: ObjectKey) -> Dict[str, Any]:
+        object_labels = self.store[key] = {}
+        self._type_index[key[0]].add(key)
+        self._id_index[key[1]].add(key)
+        self._positions[key] = next(self._counter)
         return object_labels
 
-    def _get_object_labels(self) -> Sequence[Labels]:
-        for object_identifier in self.store:
-            yield self._get_labels_for_object(*object_identifier)
+    def _get_labels_for_object(self, object_type: str, object_id: int) -> Labels:
+        return LabelsView(
+            self.store.get((object_type, object_id), _NO_LABELS), object_type, object_id
+        )
+
+    def _find(self, labels: Labels) -> List[ObjectKey]:
+        """Finds the keys of all objects matching the labels, in the order the objects were added to the store."""
+        if not labels:
+            return list(self.store)
+
+        candidates = []
+        for label_name, label_value in labels.items():
+            matches = self._candidates(label_name, label_value)
+            if not matches:
+                return []
+            candidates.append(matches)
+
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        keys = [
+            key
+            for key in smallest
+            if all(key in other for other in others)
+            and self._labels_match(self._get_labels_for_object(*key), labels)
+        ]
+        keys.sort(key=self._positions.__getitem__)
+        return keys
+
+    def _candidates(self, label_name: str, label_value: Any) -> Set[ObjectKey]:
+        """Gets a superset of the objects that have the given label value."""
+        if label_name == "object_type":
+            return self._lookup(self._type_index, label_value)
+
+        if label_name == "object_id":
+            return self._lookup(self._id_index, label_value)
+
+        unhashable = self._unhashable_labels.get(label_name)
+        try:
+            matches = self._label_index.get((label_name, label_value), set())
+        except TypeError:
+            matches = {key for key in self.store if label_name in self.store[key]}
+        else:
+            if unhashable:
+                matches = matches | unhashable
+
+        return matches
+
+    def _index_label(self, key: ObjectKey, label_name: str, label_value: Any):
+        if label_name in {"object_type", "object_id"}:
+            return
+
+        try:
+            self._label_index.setdefault((label_name, label_value), set()).add(key)
+        except TypeError:
+            self._unhashable_labels[label_name].add(key)
+
+    def _unindex_label(self, key: ObjectKey, label_name: str, label_value: Any):
+        if label_name in {"object_type", "object_id"}:
+            return
+
+        try:
+            self._discard(self._label_index, (label_name, label_value), key)
+        except TypeError:
+            self._discard(self._unhashable_labels, label_name, key)
 
     def _labels_match(self, object_labels: Labels, labels: Labels) -> bool:
         for key, value in labels.items():
@@ -77,3 +279,18 @@ class MemoryStore(Datastore):
                 return False
 
         return True
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[ObjectKey]], index_key: Any, key: ObjectKey):
+        keys = index.get(index_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    @staticmethod
+    def _lookup(index: Dict[Any, Set[ObjectKey]], index_key: Any) -> Set[ObjectKey]:
+        try:
+            return index.get(index_key, set())
+        except TypeError:
+            return set()
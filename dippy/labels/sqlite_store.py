@@ -0,0 +1,266 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from dippy.labels.datastore import (
+    Datastore,
+    LabelAssignment,
+    Labels,
+    NoLabelsProvided,
+    ObjectIdentifier,
+)
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, List, Sequence, Set, Tuple, Union
+import json
+import pathlib
+import sqlite3
+import threading
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    object_type TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    UNIQUE (object_type, object_id)
+);
+CREATE INDEX IF NOT EXISTS objects_object_id ON objects (object_id);
+CREATE TABLE IF NOT EXISTS labels (
+    object INTEGER NOT NULL REFERENCES objects (id),
+    label_name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (object, label_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS labels_label_value ON labels (label_name, value);
+CREATE TEMP TABLE IF NOT EXISTS requested_objects (
+    position INTEGER PRIMARY KEY,
+    object_type TEXT NOT NULL,
+    object_id INTEGER NOT NULL
+);
+"""
+
+
+class SqliteStore(Datastore):
+    """Datastore that persists labels to a SQLite database so they survive restarts and can be shared between shard
+    processes.
+
+    The database runs in WAL mode so readers in other processes are not blocked by writes. Label values are stored as
+    JSON, so they must be JSON serializable and are compared using their JSON form. Every write runs in a transaction,
+    use batch to group many writes into a single transaction."""
+
+    def __init__(self, database: Union[str, pathlib.Path] = ":memory:"):
+        self.connection = sqlite3.connect(
+            str(database), isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    @property
+    def supported_object_types(self) -> Set[str]:
+        """All object types that the SQLite store supports."""
+        return {"server", "channel", "message", "user", "role"}
+
+    @contextmanager
+    def batch(self) -> Iterator[SqliteStore]:
+        """Runs all writes made inside the with block in a single transaction. The transaction is committed when the
+        outermost batch exits and rolled back if it exits with an exception."""
+        with self._lock:
+            if not self._batch_depth:
+                self.connection.execute("BEGIN")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.connection.execute("COMMIT")
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self.connection.close()
+
+    def clear_label(self, label_name: str, **labels):
+        """Clears a named label from all objects that match the provided labels. Providing no labels will raise an
+        NoLabelsProvided exception."""
+        if not labels:
+            raise NoLabelsProvided()
+
+        where, params = self._match(labels)
+        with self.batch():
+            self.connection.execute(
+                f"DELETE FROM labels WHERE label_name = ? AND object IN "
+                f"(SELECT o.id FROM objects o WHERE {where})",
+                (label_name, *params),
+            )
+
+    def clear_labels(self, object_type: str, object_id: int):
+        """Clears all labels from an object."""
+        with self.batch():
+            self.connection.execute(
+                "DELETE FROM labels WHERE object = "
+                "(SELECT id FROM objects WHERE object_type = ? AND object_id = ?)",
+                (object_type, object_id),
+            )
+            self.connection.execute(
+                "DELETE FROM objects WHERE object_type = ? AND object_id = ?",
+                (object_type, object_id),
+            )
+
+    def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects in a single transaction."""
+        objects = list(objects)
+        with self.batch():
+            self.connection.executemany(
+                "DELETE FROM labels WHERE object = "
+                "(SELECT id FROM objects WHERE object_type = ? AND object_id = ?)",
+                objects,
+            )
+            self.connection.executemany(
+                "DELETE FROM objects WHERE object_type = ? AND object_id = ?",
+                objects,
+            )
+
+    def get_labels(self, **labels) -> Sequence[Labels]:
+        """Gets all objects that match the given labels. This should respect the object_type and object_id labels. If
+        no objects match the labels this will return an empty sequence."""
+        where, params = self._match(labels)
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT o.id, o.object_type, o.object_id, l.label_name, l.value "
+                f"FROM objects o LEFT JOIN labels l ON l.object = o.id "
+                f"WHERE {where} ORDER BY o.id",
+                params,
+            ).fetchall()
+
+        return tuple(
+            self._build_labels(object_type, object_id, (row[3:] for row in group))
+            for (_, object_type, object_id), group in groupby(rows, itemgetter(0, 1, 2))
+        )
+
+    def get_object_labels(self, object_type: str, object_id: int) -> Labels:
+        """Gets the labels for a given object. If the object does not exist this should return a mapping containing
+        only the object_type and object_id keys and their provided values."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT l.label_name, l.value FROM objects o JOIN labels l ON l.object = o.id "
+                "WHERE o.object_type = ? AND o.object_id = ?",
+                (object_type, object_id),
+            ).fetchall()
+
+        return self._build_labels(object_type, object_id, rows)
+
+    def get_object_labels_many(
+        self, objects: Iterable[ObjectIdentifier]
+    ) -> Sequence[Labels]:
+        """Gets the labels for each of the (object_type, object_id) objects, in the order they were given. The objects
+        are written to a temporary table so their labels are found with a single join."""
+        objects = list(objects)
+        with self.batch():
+            self.connection.executemany(
+                "INSERT INTO requested_objects (position, object_type, object_id) VALUES (?, ?, ?)",
+                (
+                    (position, object_type, object_id)
+                    for position, (object_type, object_id) in enumerate(objects)
+                ),
+            )
+            rows = self.connection.execute(
+                "SELECT r.position, l.label_name, l.value FROM requested_objects r "
+                "JOIN objects o ON o.object_type = r.object_type AND o.object_id = r.object_id "
+                "JOIN labels l ON l.object = o.id ORDER BY r.position"
+            ).fetchall()
+            self.connection.execute("DELETE FROM requested_objects")
+
+        found = {
+            position: [row[1:] for row in group]
+            for position, group in groupby(rows, itemgetter(0))
+        }
+        return tuple(
+            self._build_labels(object_type, object_id, found.get(position, ()))
+            for position, (object_type, object_id) in enumerate(objects)
+        )
+
+    def set_label(
+        self, object_type: str, object_id: int, label_name: str, label_value: Any
+    ):
+        """Sets the named label for the requested object."""
+        value = self._encode(label_value)
+        with self.batch():
+            self.connection.execute(
+                "INSERT OR IGNORE INTO objects (object_type, object_id) VALUES (?, ?)",
+                (object_type, object_id),
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO labels (object, label_name, value) VALUES "
+                "((SELECT id FROM objects WHERE object_type = ? AND object_id = ?), ?, ?)",
+                (object_type, object_id, label_name, value),
+            )
+
+    def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels in a single transaction."""
+        rows = [
+            (object_type, object_id, label_name, self._encode(label_value))
+            for object_type, object_id, label_name, label_value in labels
+        ]
+        with self.batch():
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO objects (object_type, object_id) VALUES (?, ?)",
+                (row[:2] for row in rows),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO labels (object, label_name, value) VALUES "
+                "((SELECT id FROM objects WHERE object_type = ? AND object_id = ?), ?, ?)",
+                rows,
+            )
+
+    def update_label(self, label_name: str, label_value: Any, **labels):
+        """Updates the named label for all objects that match the given labels. If an object matches but doesn't
+        already have the named label, the label should be created."""
+        where, params = self._match(labels)
+        with self.batch():
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO labels (object, label_name, value) "
+                f"SELECT o.id, ?, ? FROM objects o WHERE {where}",
+                (label_name, self._encode(label_value), *params),
+            )
+
+    def _encode(self, value: Any) -> str:
+        return json.dumps(value, sort_keys=True)
+
+    def _build_labels(
+        self, object_type: str, object_id: int, rows: Iterable[Tuple[str, str]]
+    ) -> Labels:
+        object_labels = {
+            label_name: json.loads(value)
+            for label_name, value in rows
+            if label_name is not None
+        }
+        object_labels["object_type"] = object_type
+        object_labels["object_id"] = object_id
+        return object_labels
+
+    def _match(self, labels: Labels) -> Tuple[str, List[Any]]:
+        """Builds a where clause over the objects table, aliased as o, that matches the given labels."""
+        clauses, params = [], []
+        for label_name, label_value in labels.items():
+            if label_name == "object_type":
+                clauses.append("o.object_type = ?")
+                params.append(label_value)
+            elif label_name == "object_id":
+                clauses.append("o.object_id = ?")
+                params.append(label_value)
+            else:
+                clauses.append(
+                    "o.id IN (SELECT object FROM labels WHERE label_name = ? AND value = ?)"
+                )
+                params.extend((label_name, self._encode(label_value)))
+
+        return " AND ".join(clauses) or "1", params
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from dippy.labels.datastore import (
+    Datastore,
+    LabelAssignment,
+    Labels,
+    ObjectIdentifier,
+)
+from dippy.metrics.registry import MetricsRegistry
+from time import perf_counter
+from typing import Any, Callable, Iterable, Optional, Sequence, Set
+
+
+OPERATIONS = (
+    "clear_label",
+    "clear_labels",
+    "clear_labels_many",
+    "get_labels",
+    "get_object_labels",
+    "get_object_labels_many",
+    "set_label",
+    "set_labels_many",
+    "update_label",
+)
+
+
+class TimedDatastore(Datastore):
+    """Datastore that records how long each operation of another datastore takes, and how many of them raise, in a
+    metrics registry. The metrics are labelled with the store's name, which defaults to the wrapped datastore's class
+    name, and the operation.
+
+    To time an async store's operations, wrap the synchronous datastore before passing it to ExecutorStore, the timings
+    then cover only the time the operation ran on the executor. The metrics are not locked, so when the executor has
+    more than one worker the counts can miss operations that finish at the same moment."""
+
+    def __init__(
+        self,
+        datastore: Datastore,
+        registry: MetricsRegistry,
+        *,
+        name: Optional[str] = None,
+    ):
+        self.datastore = datastore
+        self.name = name or type(datastore).__name__
+        durations = registry.histogram(
+            "dippy_datastore_operation_seconds",
+            "Time taken by datastore operations.",
+            ("store", "operation"),
+        )
+        errors = registry.counter(
+            "dippy_datastore_operation_errors_total",
+            "Datastore operations that raised an exception.",
+            ("store", "operation"),
+        )
+        self._durations = {
+            operation: durations.labels(self.name, operation)
+            for operation in OPERATIONS
+        }
+        self._errors = {
+            operation: errors.labels(self.name, operation) for operation in OPERATIONS
+        }
+
+    @property
+    def supported_object_types(self) -> Set[str]:
+        """All object types that the wrapped datastore supports."""
+        return self.datastore.supported_object_types
+
+    def clear_label(self, label_name: str, **labels):
+        """Clears a named label from all objects that match the provided labels. Providing no labels will raise an
+        NoLabelsProvided exception."""
+        self._run("clear_label", self.datastore.clear_label, label_name, **labels)
+
+    def clear_labels(self, object_type: str, object_id: int):
+        """Clears all labels from an object."""
+        self._run("clear_labels", self.datastore.clear_labels, object_type, object_id)
+
+    def clear_labels_many(self, objects: Iterable[ObjectIdentifier]):
+        """Clears all labels from each of the (object_type, object_id) objects."""
+        self._run("clear_labels_many", self.datastore.clear_labels_many, objects)
+
+    def get_labels(self, **labels) -> Sequence[Labels]:
+        """Gets all objects that match the given labels. This should respect the object_type and object_id labels. If
+        no objects match the labels this will return an empty sequence."""
+        return self._run("get_labels", self.datastore.get_labels, **labels)
+
+    def get_object_labels(self, object_type: str, object_id: int) -> Labels:
+        """Gets the labels for a given object. If the object does not exist this should return a mapping containing
+        only the object_type and object_id keys and their provided values."""
+        return self._run(
+            "get_object_labels",
+            self.datastore.get_object_labels,
+            object_type,
+            object_id,
+        )
+
+    def get_object_labels_many(
+        self, objects: Iterable[ObjectIdentifier]
+    ) -> Sequence[Labels]:
+        """Gets the labels for each of the (object_type, object_id) objects, in the order they were given."""
+        return self._run(
+            "get_object_labels_many", self.datastore.get_object_labels_many, objects
+        )
+
+    def set_label(
+        self, object_type: str, object_id: int, label_name: str, label_value: Any
+    ):
+        """Sets the named label for the requested object."""
+        self._run(
+            "set_label",
+            self.datastore.set_label,
+            object_type,
+            object_id,
+            label_name,
+            label_value,
+        )
+
+    def set_labels_many(self, labels: Iterable[LabelAssignment]):
+        """Sets each of the (object_type, object_id, label_name, label_value) labels."""
+        self._run("set_labels_many", self.datastore.set_labels_many, labels)
+
+    def update_label(self, label_name: str, label_value: Any, **labels):
+        """Updates the named label for all objects that match the given labels. If an object matches but doesn't
+        already have the named label, the label should be created."""
+        self._run(
+            "update_label",
+            self.datastore.update_label,
+            label_name,
+            label_value,
+            **labels,
+        )
+
+    def _run(self, operation: str, method: Callable, /, *args, **kwargs) -> Any:
+        started = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            self._errors[operation].inc()
+            raise
+        finally:
+            self._durations[operation].observe(perf_counter() - started)
@@ -1,7 +1,70 @@
-from typing import Sequence
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+import atexit
 import dippy
+import enum
+import json
 import logging
 import pydantic
+import queue
+import re
+import time
+
+
+class LogOutputEnum(enum.Enum):
+    TEXT = "TEXT"
+    JSON = "JSON"
+    LOGFMT = "LOGFMT"
+
+
+class LogSampling(NamedTuple):
+    """ Limits how many records below the warning level a logger emits. Every keeps one record out of every N, per
+    second keeps at most N records each second. """
+
+    every: int = 1
+    per_second: Optional[float] = None
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().casefold() in {"1", "true", "yes", "on"}
+
+
+def _parse_output(value: Union[str, LogOutputEnum]) -> LogOutputEnum:
+    if isinstance(value, LogOutputEnum):
+        return value
+    return LogOutputEnum(value.strip().upper())
+
+
+def _parse_sampling_rule(value: Union[str, Dict[str, Any], LogSampling]) -> LogSampling:
+    """ Parses "1-in-N" into one out of every N records and "N/s" into at most N records per second. """
+    if isinstance(value, LogSampling):
+        rule = value
+    elif isinstance(value, dict):
+        rule = LogSampling(**value)
+    elif match := re.fullmatch(r"\s*1\s*-?\s*in\s*-?\s*(\d+)\s*", value, re.I):
+        rule = LogSampling(every=int(match.group(1)))
+    elif match := re.fullmatch(
+        r"\s*(\d+(?:\.\d*)?)\s*/\s*s(?:ec(?:ond)?)?\s*", value, re.I
+    ):
+        rule = LogSampling(per_second=float(match.group(1)))
+    else:
+        raise ValueError(f"Invalid log sampling rule: {value}, must be 1-in-N or N/s")
+
+    if rule.every < 1 or (rule.per_second is not None and rule.per_second <= 0):
+        raise ValueError(f"Invalid log sampling rule: {value}, rates must be positive")
+    return rule
+
+
+def _parse_sampling(
+    value: Union[str, Dict[str, Union[str, Dict[str, Any], LogSampling]]]
+) -> Dict[str, LogSampling]:
+    """ Parses logger sampling rules from a mapping of logger names to rules or from a comma separated string of
+    name=rule pairs. """
+    if isinstance(value, str):
+        pairs = (pair.partition("=") for pair in value.split(",") if pair.strip())
+        value = {name.strip(): rule for name, _, rule in pairs}
+
+    return {name: _parse_sampling_rule(rule) for name, rule in value.items()}
 
 
 class LoggingConfigModel(pydantic.BaseModel):
@@ -22,6 +85,14 @@ class LoggingConfigModel(pydantic.BaseModel):
             )
         return levels[value.casefold()]
 
+    @pydantic.validator("output", pre=True)
+    def validate_output(cls, value: Union[str, LogOutputEnum]) -> LogOutputEnum:
+        return _parse_output(value)
+
+    @pydantic.validator("sampling", pre=True)
+    def validate_sampling(cls, value: Any) -> Dict[str, LogSampling]:
+        return _parse_sampling(value)
+
     format: str = "%(asctime)s  %(levelname)-5s  %(name)-32s  %(message)s"
     date_format: str = "%m/%d/%Y %I:%M:%S %p"
 
@@ -33,9 +104,38 @@ class LoggingConfigModel(pydantic.BaseModel):
         converter=validate_level,
         default=logging.WARN,
     )
+    queue: bool = dippy.config.EnvField(
+        env_var="DIPPY_LOG_QUEUE", converter=_parse_bool, default=False
+    )
+    output: LogOutputEnum = dippy.config.EnvField(
+        env_var="DIPPY_LOG_OUTPUT", converter=_parse_output, default=LogOutputEnum.TEXT
+    )
+    sampling: Dict[str, LogSampling] = dippy.config.EnvField(
+        env_var="DIPPY_LOG_SAMPLING", converter=_parse_sampling, default={}
+    )
+
+
+_queue_listener: Optional[QueueListener] = None
 
 
 class Logging:
+    """ Wraps a standard library logger using the settings from the logging config section.
+
+    Messages use lazy %-style formatting, the arguments are only formatted into the message when the level is enabled,
+    and the wrapper methods check the level before calling the logger. Records report the wrapper method's caller as
+    their source. Use is_enabled_for to skip building expensive arguments.
+
+    The output setting switches the log lines from the text format to compact JSON objects or logfmt key=value pairs
+    carrying the time, level, logger, message, and any extra record fields. The sampling setting maps logger names to
+    "1-in-N" or "N/s" rules that bound how many records below the warning level those loggers and their children emit,
+    each kept record notes how many were dropped before it. Both can be set in the logging config section or with the
+    DIPPY_LOG_OUTPUT and DIPPY_LOG_SAMPLING environment variables, e.g. DIPPY_LOG_SAMPLING="dippy.hub=1-in-100".
+
+    When the queue setting is enabled, or setup_logger is called with queue=True, the root logger's handlers are moved
+    to a QueueListener running on a background thread and replaced with a QueueHandler, so formatting the log lines and
+    writing them happens off the event loop's thread. The listener is stopped at exit, flushing queued records.
+    """
+
     config: dippy.config.ConfigFactory[LoggingConfigModel]
 
     def __init__(self, name: str):
@@ -44,25 +144,235 @@ class Logging:
 
         self.logger.setLevel(self.settings.level)
 
-    def setup_logger(self):
+    def setup_logger(self, queue: Optional[bool] = None):
         self.logger.setLevel(self.settings.level)
+        handler = logging.StreamHandler()
+        if self.settings.output != LogOutputEnum.TEXT:
+            handler.setFormatter(_formatters[self.settings.output]())
         logging.basicConfig(
             format=self.settings.format,
             datefmt=self.settings.date_format,
             level=self.settings.global_level,
+            handlers=[handler],
         )
+        if self.settings.queue if queue is None else queue:
+            start_queue_listener()
+
+        if self.settings.sampling:
+            sampler = LogSampler(self.settings.sampling)
+            for root_handler in logging.getLogger().handlers:
+                root_handler.addFilter(sampler)
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
 
     def debug(self, msg, *args, **kwargs):
-        self.logger.debug(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.debug(msg, *args, **kwargs)
 
     def info(self, msg, *args, **kwargs):
-        self.logger.info(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.INFO):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.info(msg, *args, **kwargs)
 
     def warning(self, msg, *args, **kwargs):
-        self.logger.warning(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.warning(msg, *args, **kwargs)
 
     def error(self, msg, *args, **kwargs):
-        self.logger.error(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.ERROR):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.error(msg, *args, **kwargs)
 
     def critical(self, msg, *args, **kwargs):
-        self.logger.critical(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+            self.logger.critical(msg, *args, **kwargs)
+
+
+class LogSampler(logging.Filter):
+    """ Handler filter that applies sampling rules to the records of the named loggers and their children. A rule's
+    count is shared by the logger and all of its children, records at the warning level or above are never dropped.
+    Kept records get a dropped attribute with the number of records the rule dropped since the last one it kept. """
+
+    def __init__(
+        self,
+        sampling: Dict[str, LogSampling],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.clock = clock
+        self._states = {name: _SamplingState(rule) for name, rule in sampling.items()}
+        self._loggers: Dict[str, Optional[_SamplingState]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # A record is filtered once for each handler it reaches, only the first decision counts against the rule
+        keep = record.__dict__.get("_sampled")
+        if keep is not None:
+            return keep
+
+        keep = True
+        if record.levelno < logging.WARNING:
+            state = self._find_state(record.name)
+            if state:
+                keep = state.sample(self.clock)
+                if keep and state.dropped:
+                    record.dropped, state.dropped = state.dropped, 0
+
+        record._sampled = keep
+        return keep
+
+    def _find_state(self, name: str) -> Optional["_SamplingState"]:
+        if name in self._loggers:
+            return self._loggers[name]
+
+        state = None
+        parent = name
+        while parent:
+            if parent in self._states:
+                state = self._states[parent]
+                break
+            parent = parent.rpartition(".")[0]
+
+        self._loggers[name] = state
+        return state
+
+
+class _SamplingState:
+    __slots__ = ("rule", "count", "window_start", "window_count", "dropped")
+
+    def __init__(self, rule: LogSampling):
+        self.rule = rule
+        self.count = 0
+        self.window_start = float("-inf")
+        self.window_count = 0
+        self.dropped = 0
+
+    def sample(self, clock: Callable[[], float]) -> bool:
+        keep = self.count % self.rule.every == 0
+        self.count += 1
+        if keep and self.rule.per_second is not None:
+            now = clock()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            keep = self.window_count < self.rule.per_second
+            self.window_count += keep
+
+        self.dropped += not keep
+        return keep
+
+
+# Attributes every log record has, anything else on a record was passed as an extra field
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.NOTSET, "", 0, "", (), None))
+) | {"message", "asctime", "taskName"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """ Base for formatters that write records as fields: the UTC time in ISO 8601 format, the level, the logger name,
+    the message, any extra fields, and the formatted exception and stack when the record has them. """
+
+    def fields(self, record: logging.LogRecord) -> List[Tuple[str, Any]]:
+        fields = [
+            ("time", self._format_time(record.created)),
+            ("level", record.levelname),
+            ("logger", record.name),
+            ("message", record.getMessage()),
+        ]
+        fields.extend(
+            (name, value)
+            for name, value in record.__dict__.items()
+            if name not in _RECORD_ATTRIBUTES and not name.startswith("_")
+        )
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            fields.append(("exception", record.exc_text))
+        if record.stack_info:
+            fields.append(("stack", self.formatStack(record.stack_info)))
+        return fields
+
+    def _format_time(self, created: float) -> str:
+        seconds = int(created)
+        return (
+            f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}"
+            f".{int((created - seconds) * 1000):03d}Z"
+        )
+
+
+class JSONFormatter(StructuredFormatter):
+    """ Formats each record as a compact JSON object on a single line. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(dict(self.fields(record)), separators=(",", ":"), default=str)
+
+
+class LogfmtFormatter(StructuredFormatter):
+    """ Formats each record as logfmt key=value pairs, quoting values that are empty or contain spaces, quotes, equals
+    signs, or control characters. """
+
+    _needs_quotes = re.compile(r'[\s"=\\\x00-\x1f\x7f]').search
+
+    def format(self, record: logging.LogRecord) -> str:
+        return " ".join(
+            f"{name}={self._format_value(value)}" for name, value in self.fields(record)
+        )
+
+    def _format_value(self, value: Any) -> str:
+        value = str(value)
+        if not value or self._needs_quotes(value):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+
+_formatters = {LogOutputEnum.JSON: JSONFormatter, LogOutputEnum.LOGFMT: LogfmtFormatter}
+
+
+class DeferredQueueHandler(QueueHandler):
+    """ Queues records without formatting them, unlike QueueHandler which formats the message and traceback before
+    queueing the record. The listener's handlers format the records on the listener's thread, with their arguments
+    and exception info intact. Only suitable for queues read in the same process. """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_queue_listener():
+    """ Moves the root logger's handlers to a QueueListener on a background thread, leaving a DeferredQueueHandler on
+    the root logger. Does nothing if the listener is already running. """
+    global _queue_listener
+    if _queue_listener:
+        return
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    atexit.register(stop_queue_listener)
+
+
+def stop_queue_listener():
+    """ Stops the QueueListener after it has handled the queued records and moves its handlers back to the root
+    logger. """
+    global _queue_listener
+    if not _queue_listener:
+        return
+
+    listener, _queue_listener = _queue_listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+    atexit.unregister(stop_queue_listener)
@@ -0,0 +1,12 @@
+from dippy.metrics.registry import Counter, Gauge, Histogram, MetricsRegistry
+from dippy.metrics.server import MetricsServer, MetricsSettingsModel
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsServer",
+    "MetricsSettingsModel",
+]
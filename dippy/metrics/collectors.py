@@ -0,0 +1,130 @@
+from __future__ import annotations
+from dippy.components.manager import ComponentManager
+from dippy.config.manager import ConfigLoadProfile
+from dippy.events.instrumentation import EventHubInstrumentation
+from dippy.metrics.registry import MetricsRegistry
+
+
+class EventHubCollector:
+    """Exports an instrumented event hub's call counts, errors, slow calls, and latency histograms for every event and
+    handler, along with the loop lag histogram. The instrumentation's records are exported directly, they are only
+    looked up again when the instrumentation's revision shows a new event or handler has been recorded."""
+
+    def __init__(
+        self, registry: MetricsRegistry, instrumentation: EventHubInstrumentation
+    ):
+        self.instrumentation = instrumentation
+        self._revision = None
+
+        event_labels = ("event",)
+        handler_labels = ("event", "handler")
+        self.emits = registry.counter(
+            "dippy_event_emits_total", "Events emitted.", event_labels
+        )
+        self.emit_errors = registry.counter(
+            "dippy_event_emit_errors_total",
+            "Event emits where a handler failed.",
+            event_labels,
+        )
+        self.emit_duration = registry.histogram(
+            "dippy_event_emit_duration_seconds",
+            "Time taken to run all of an event's handlers.",
+            event_labels,
+        )
+        self.calls = registry.counter(
+            "dippy_event_handler_calls_total", "Event handler calls.", handler_labels
+        )
+        self.errors = registry.counter(
+            "dippy_event_handler_errors_total",
+            "Event handler calls that raised, timed out, or were cancelled.",
+            handler_labels,
+        )
+        self.slow = registry.counter(
+            "dippy_event_handler_slow_total",
+            "Event handler calls slower than the slow handler threshold.",
+            handler_labels,
+        )
+        self.duration = registry.histogram(
+            "dippy_event_handler_duration_seconds",
+            "Time taken by event handler calls.",
+            handler_labels,
+        )
+        registry.histogram(
+            "dippy_event_loop_lag_seconds",
+            "How late the event loop ran the loop lag monitor.",
+        ).bind(instrumentation.loop_lag)
+
+    def __call__(self):
+        if self._revision == self.instrumentation.revision:
+            return
+
+        self._revision = self.instrumentation.revision
+        events, handlers = self.instrumentation.records()
+        for metric in (self.emits, self.emit_errors, self.emit_duration):
+            metric.clear()
+        for metric in (self.calls, self.errors, self.slow, self.duration):
+            metric.clear()
+
+        for event_name, record in events.items():
+            self.emits.bind(record, "calls", event_name)
+            self.emit_errors.bind(record, "errors", event_name)
+            self.emit_duration.bind(record.latency, event_name)
+
+        for (event_name, handler_name), record in handlers.items():
+            self.calls.bind(record, "calls", event_name, handler_name)
+            self.errors.bind(record, "errors", event_name, handler_name)
+            self.slow.bind(record, "slow", event_name, handler_name)
+            self.duration.bind(record.latency, event_name, handler_name)
+
+
+class ComponentTimingCollector:
+    """Exports how long each stage of loading and starting the components took, picking up the timings the component
+    manager has recorded since the last export. A file or component that is loaded again reports its latest time."""
+
+    def __init__(self, registry: MetricsRegistry, component_manager: ComponentManager):
+        self.component_manager = component_manager
+        self._exported = 0
+        self.timings = registry.gauge(
+            "dippy_component_stage_seconds",
+            "Time taken by the last run of each component loading stage.",
+            ("name", "stage"),
+        )
+
+    def __call__(self):
+        timings = self.component_manager.timings
+        if self._exported == len(timings):
+            return
+
+        for timing in timings[self._exported :]:
+            self.timings.labels(timing.name, timing.stage).set(timing.seconds)
+        self._exported = len(timings)
+
+
+class ConfigLoadMetrics:
+    """Config manager profiler that counts config loads and records how long resolving and parsing the config files
+    took."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.loads = registry.counter(
+            "dippy_config_loads_total",
+            "Config file and section loads.",
+            ("file", "cached"),
+        )
+        self.resolution_time = registry.histogram(
+            "dippy_config_resolution_seconds",
+            "Time taken finding config files, their loaders, and cached configs.",
+            ("file",),
+        )
+        self.parse_time = registry.histogram(
+            "dippy_config_parse_seconds",
+            "Time taken parsing config files and sections.",
+            ("file",),
+        )
+
+    def __call__(self, profile: ConfigLoadProfile):
+        self.loads.labels(
+            profile.file_name, "true" if profile.cached else "false"
+        ).inc()
+        self.resolution_time.labels(profile.file_name).observe(profile.resolution_time)
+        if not profile.cached:
+            self.parse_time.labels(profile.file_name).observe(profile.parse_time)
@@ -0,0 +1,366 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Optional, Sequence
+import math
+import re
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_METRIC_NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+_LABEL_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+
+class MetricValue(ABC):
+    """The value of a metric for one set of label values.
+
+    Each value caches the lines it last rendered along with the version of the value they were rendered from, so
+    exporting a value that has not changed since the last export only copies the cached bytes into the export
+    buffer."""
+
+    __slots__ = ("_rendered", "_rendered_version")
+
+    def __init__(self):
+        self._rendered = b""
+        self._rendered_version: Any = None
+
+    def write(self, buffer: bytearray):
+        version = self._version()
+        if version != self._rendered_version:
+            self._rendered = self._render(version)
+            self._rendered_version = version
+        buffer += self._rendered
+
+    @abstractmethod
+    def _version(self) -> Any:
+        """Gets a value that changes whenever the rendered lines would change."""
+        ...
+
+    @abstractmethod
+    def _render(self, version: Any) -> bytes:
+        """Renders the value's sample lines for the given version."""
+        ...
+
+
+class CounterValue(MetricValue):
+    __slots__ = ("value", "_prefix")
+
+    def __init__(self, prefix: bytes):
+        super().__init__()
+        self.value = 0
+        self._prefix = prefix
+
+    def inc(self, amount: float = 1):
+        if amount < 0:
+            raise ValueError(f"Counters can only increase, received {amount}")
+        self.value += amount
+
+    def _version(self) -> Any:
+        return self.value
+
+    def _render(self, version: Any) -> bytes:
+        return self._prefix + _format_value(self.value) + b"\n"
+
+
+class GaugeValue(CounterValue):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class AttributeValue(MetricValue):
+    """Reads its value from an attribute of another object each time it is exported, so counts that are already kept
+    elsewhere can be exported without being copied into the registry."""
+
+    __slots__ = ("source", "attribute", "_prefix")
+
+    def __init__(self, prefix: bytes, source: Any, attribute: str):
+        super().__init__()
+        self.source = source
+        self.attribute = attribute
+        self._prefix = prefix
+
+    def _version(self) -> Any:
+        return getattr(self.source, self.attribute)
+
+    def _render(self, version: Any) -> bytes:
+        return self._prefix + _format_value(version) + b"\n"
+
+
+class HistogramValue(MetricValue):
+    """Counts observations in fixed buckets. The source is the object holding the bucket counts, count, and total, by
+    default the value itself. Another object with bounds, counts, count, and total attributes laid out the same way,
+    such as the event hub instrumentation's latency histograms, can be exported by passing it as the source. The
+    count is used as the value's version, so a source must increase it with every observation."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "source", "_prefixes")
+
+    def __init__(
+        self,
+        name: str,
+        labels: str,
+        bounds: Sequence[float],
+        source: Optional[Any] = None,
+    ):
+        super().__init__()
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.source = self if source is None else source
+
+        separator = "," if labels else ""
+        self._prefixes = (
+            *(
+                f'{name}_bucket{{{labels}{separator}le="{_format_bound(bound)}"}} '.encode()
+                for bound in (*self.source.bounds, math.inf)
+            ),
+            _sample_prefix(f"{name}_sum", labels),
+            _sample_prefix(f"{name}_count", labels),
+        )
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def _version(self) -> Any:
+        return self.source.count
+
+    def _render(self, version: Any) -> bytes:
+        source = self.source
+        lines = []
+        cumulative = 0
+        for prefix, count in zip(self._prefixes, source.counts):
+            cumulative += count
+            lines.append(prefix + _format_value(cumulative))
+        lines.append(self._prefixes[-2] + _format_value(source.total))
+        lines.append(self._prefixes[-1] + _format_value(cumulative))
+        return b"\n".join(lines) + b"\n"
+
+
+class Metric(ABC):
+    """A named metric and its values for each set of label values. Values are created by calling labels with the
+    label values, metrics without labels can be used directly."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        if not _METRIC_NAME.fullmatch(name):
+            raise ValueError(f"Invalid metric name: {name!r}")
+        for label_name in label_names:
+            if not _LABEL_NAME.fullmatch(label_name) or label_name.startswith("__"):
+                raise ValueError(f"Invalid label name for {name}: {label_name!r}")
+
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.values: dict[tuple[str, ...], MetricValue] = {}
+        self._header = (
+            f"# HELP {name} {_escape_help(documentation)}\n# TYPE {name} {self.type}\n"
+        ).encode()
+
+    def labels(self, *label_values: Any) -> Any:
+        """Gets the value for the label values, creating it the first time they are used."""
+        value = self.values.get(label_values)
+        if value is None:
+            value = self.values[label_values] = self._create_value(
+                self._format_labels(label_values)
+            )
+        return value
+
+    def bind(self, source: Any, attribute: str, *label_values: Any) -> AttributeValue:
+        """Exports an attribute of another object as the value for the label values."""
+        value = self.values[label_values] = AttributeValue(
+            _sample_prefix(self.name, self._format_labels(label_values)),
+            source,
+            attribute,
+        )
+        return value
+
+    def remove(self, *label_values: Any):
+        """Stops exporting the value for the label values."""
+        self.values.pop(label_values, None)
+
+    def clear(self):
+        self.values.clear()
+
+    def write(self, buffer: bytearray):
+        if not self.values:
+            return
+
+        buffer += self._header
+        for value in self.values.values():
+            value.write(buffer)
+
+    @abstractmethod
+    def _create_value(self, labels: str) -> MetricValue:
+        """Creates the value for one set of formatted label values."""
+        ...
+
+    def _format_labels(self, label_values: Sequence[Any]) -> str:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(
+                f"{self.name} has the labels {self.label_names}, received {len(label_values)} label values"
+            )
+        return ",".join(
+            f'{name}="{_escape_label(str(value))}"'
+            for name, value in zip(self.label_names, label_values)
+        )
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _create_value(self, labels: str) -> CounterValue:
+        return CounterValue(_sample_prefix(self.name, labels))
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def _create_value(self, labels: str) -> GaugeValue:
+        return GaugeValue(_sample_prefix(self.name, labels))
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def bind(self, source: Any, *label_values: Any) -> HistogramValue:
+        """Exports another object's histogram as the value for the label values, see HistogramValue."""
+        value = self.values[label_values] = HistogramValue(
+            self.name, self._format_labels(label_values), source.bounds, source
+        )
+        return value
+
+    def _create_value(self, labels: str) -> HistogramValue:
+        return HistogramValue(self.name, labels, self.buckets)
+
+
+class MetricsRegistry:
+    """Holds the bot's metrics and exports them in the Prometheus text format.
+
+    Metrics are created with counter, gauge, and histogram, asking for a metric that already exists returns it.
+    Collectors are called before every export so they can add values for things that have appeared since the last
+    export, they should do as little as possible when nothing has changed.
+
+    Exporting does not build a string for each metric, every value keeps its last rendered lines and only renders
+    them again when it has changed. The lines are copied into a buffer that is reused between exports."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], Any]] = []
+        self._buffer = bytearray()
+
+    def counter(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        return self._get(Counter, name, documentation, label_names)
+
+    def gauge(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get(Gauge, name, documentation, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], Any]):
+        self.collectors.append(collector)
+
+    def export(self) -> bytes:
+        """Runs the collectors and renders every metric in the Prometheus text format."""
+        for collector in self.collectors:
+            collector()
+
+        buffer = self._buffer
+        del buffer[:]
+        for metric in self.metrics.values():
+            metric.write(buffer)
+        return bytes(buffer)
+
+    def _get(
+        self,
+        metric_type: type,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        **kwargs,
+    ) -> Any:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = metric_type(
+                name, documentation, label_names, **kwargs
+            )
+        elif type(metric) is not metric_type or metric.label_names != tuple(
+            label_names
+        ):
+            raise ValueError(
+                f"{name} is already registered as a {metric.type} with the labels {metric.label_names}"
+            )
+        return metric
+
+
+def _sample_prefix(name: str, labels: str) -> bytes:
+    return f"{name}{{{labels}}} ".encode() if labels else f"{name} ".encode()
+
+
+def _escape_help(documentation: str) -> str:
+    return documentation.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _format_value(value: float) -> bytes:
+    if isinstance(value, int):
+        return str(value).encode()
+    if math.isnan(value):
+        return b"NaN"
+    if math.isinf(value):
+        return b"+Inf" if value > 0 else b"-Inf"
+    return repr(value).encode()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from asyncio import AbstractServer, StreamReader, StreamWriter, start_server, wait_for
+from dippy.metrics.registry import MetricsRegistry
+from typing import Optional
+import asyncio
+import pydantic
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsSettingsModel(pydantic.BaseModel):
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9464
+    path: str = "/metrics"
+    slow_handler_threshold: Optional[float] = None
+    loop_lag_interval: float = 0.5
+
+
+class MetricsServer:
+    """Minimal HTTP server that serves a metrics registry in the Prometheus text format.
+
+    Only GET and HEAD requests for the metrics path are answered, every connection is closed after its response. The
+    server runs on the event loop, so the export runs between event handlers and is never interleaved with them. Port
+    0 picks a free port, the port that was bound is available from port once the server has started."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+        path: str = "/metrics",
+        *,
+        request_timeout: float = 5.0,
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path.encode()
+        self.request_timeout = request_timeout
+        self._server: Optional[AbstractServer] = None
+
+    async def start(self):
+        self._server = await start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter):
+        try:
+            request = await wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.request_timeout
+            )
+            method, target, _ = request.split(b" ", 2)
+            if method not in (b"GET", b"HEAD"):
+                self._respond(
+                    writer, b"405 Method Not Allowed", b"", b"Allow: GET, HEAD\r\n"
+                )
+            elif target.partition(b"?")[0] != self.path:
+                self._respond(writer, b"404 Not Found", b"")
+            else:
+                body = self.registry.export()
+                self._respond(
+                    writer,
+                    b"200 OK",
+                    b"" if method == b"HEAD" else body,
+                    length=len(body),
+                )
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            asyncio.TimeoutError,
+            ConnectionError,
+            ValueError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(
+        self,
+        writer: StreamWriter,
+        status: bytes,
+        body: bytes,
+        headers: bytes = b"",
+        *,
+        length: Optional[int] = None,
+    ):
+        writer.writelines(
+            (
+                b"HTTP/1.1 %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n%s\r\n"
+                % (
+                    status,
+                    CONTENT_TYPE.encode(),
+                    len(body) if length is None else length,
+                    headers,
+                ),
+                body,
+            )
+        )
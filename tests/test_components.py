@@ -0,0 +1,431 @@
+from dippy.components import Component
+from dippy.components.manager import ComponentManager
+from dippy.components.manifest import ComponentManifest
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+import asyncio
+import bevy
+import os
+import pytest
+
+COMPONENT_SOURCE = """
+from dippy.components import Component, event_handler
+
+
+class {name}(Component):
+    def __init__(self):
+        self.received = []
+
+    async def setup(self):
+        self.set_up = True
+
+    @event_handler("{event}", "shared")
+    async def on_event(self, data):
+        self.received.append(data)
+"""
+
+
+@pytest.fixture(autouse=True)
+def components(monkeypatch):
+    components = []
+    monkeypatch.setattr(Component, "__components__", components)
+    return components
+
+
+@pytest.fixture()
+def app_path(tmp_path):
+    (tmp_path / "components").mkdir()
+    for name in ("Alpha", "Beta", "Gamma"):
+        (tmp_path / "components" / f"{name.lower()}.py").write_text(
+            COMPONENT_SOURCE.format(name=name, event=f"{name.lower()}_event")
+        )
+    (tmp_path / "components" / "_private.py").write_text("raise ImportError")
+    return tmp_path
+
+
+def create_manager(app_path, group="", **settings):
+    settings_yaml = "".join(f"  {key}: {value}\n" for key, value in settings.items())
+    (app_path / "config.yaml").write_text(
+        f"components:\n  groups:\n    - location: components\n{group}{settings_yaml}"
+    )
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(app_path), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    return context.create(ComponentManager, "bot")
+
+
+def component_names(components):
+    return sorted(component.__name__ for component in components)
+
+
+@pytest.mark.parametrize("parallel_import", [False, True])
+def test_load_components(app_path, components, parallel_import):
+    manager = create_manager(app_path, parallel_import=parallel_import)
+    manager.load_components(app_path)
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+
+
+def test_parallel_import_keeps_order(app_path, components):
+    serial = create_manager(app_path)
+    serial.load_components(app_path)
+    serial_order = [component.__name__ for component in components]
+    components.clear()
+
+    parallel = create_manager(app_path, parallel_import=True, import_workers=2)
+    parallel.load_components(app_path)
+    assert [component.__name__ for component in components] == serial_order
+
+
+def test_setup_components_concurrently(app_path, components):
+    (app_path / "components" / "waiting.py").write_text(
+        "from dippy.components import Component\n"
+        "import asyncio\n"
+        "\n"
+        "first, second = asyncio.Event(), asyncio.Event()\n"
+        "\n"
+        "\n"
+        "class First(Component):\n"
+        "    async def setup(self):\n"
+        "        first.set()\n"
+        "        await second.wait()\n"
+        "\n"
+        "\n"
+        "class Second(Component):\n"
+        "    async def setup(self):\n"
+        "        second.set()\n"
+        "        await first.wait()\n"
+    )
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    asyncio.get_event_loop().run_until_complete(
+        asyncio.wait_for(manager.setup_components(), 1)
+    )
+    assert sum(getattr(c, "set_up", False) for c in manager.components) == 3
+
+
+def test_timings(app_path):
+    manager = create_manager(app_path, parallel_import=True)
+    manager.load_components(app_path)
+    manager.create_components()
+    asyncio.get_event_loop().run_until_complete(manager.setup_components())
+    stages = {}
+    for timing in manager.timings:
+        stages.setdefault(timing.stage, []).append(timing.name)
+
+    assert sorted(stages) == ["compile", "create", "import", "setup"]
+    assert len(stages["compile"]) == len(stages["import"]) == 3
+    assert component_names_from(stages["setup"]) == ["Alpha", "Beta", "Gamma"]
+
+
+def component_names_from(names):
+    return sorted(name.rpartition(".")[2] for name in names)
+
+
+def emit(manager, event_name, data):
+    asyncio.get_event_loop().run_until_complete(
+        manager.event_hub.emit(event_name, data)
+    )
+
+
+def test_event_handlers_registered(app_path):
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    asyncio.get_event_loop().run_until_complete(manager.setup_components())
+    emit(manager, "alpha_event", 1)
+    emit(manager, "shared", 2)
+    received = {type(c).__name__: c.received for c in manager.components}
+    assert received == {"Alpha": [1, 2], "Beta": [2], "Gamma": [2]}
+
+
+def test_lazy_activation(app_path, components):
+    manager = create_manager(
+        app_path,
+        group="      activation: LAZY\n"
+        "      events:\n"
+        "        alpha: [alpha_event]\n"
+        "        beta: [beta_event, shared]\n",
+    )
+    manager.load_components(app_path)
+    manager.create_components()
+    assert component_names(components) == ["Gamma"]
+
+    emit(manager, "beta_event", 1)
+    assert component_names(components) == ["Beta", "Gamma"]
+    emit(manager, "beta_event", 2)
+    emit(manager, "shared", 3)
+    beta = next(c for c in manager.components if type(c).__name__ == "Beta")
+    assert beta.set_up and beta.received == [1, 2, 3]
+    activated = {lazy.path.stem: lazy.activated for lazy in manager.lazy_components}
+    assert activated == {"alpha": False, "beta": True}
+
+
+def test_lazy_activation_once(app_path, components):
+    manager = create_manager(
+        app_path,
+        group="      activation: LAZY\n      events:\n        alpha: [alpha_event]\n",
+    )
+    manager.load_components(app_path)
+    (lazy,) = manager.lazy_components
+
+    async def emit_together():
+        await asyncio.gather(
+            manager.event_hub.emit("alpha_event", 1),
+            manager.event_hub.emit("alpha_event", 2),
+        )
+
+    asyncio.get_event_loop().run_until_complete(emit_together())
+    assert lazy.activated
+    assert [c.__name__ for c in components].count("Alpha") == 1
+    (alpha,) = lazy.components
+    assert sorted(alpha.received) == [1, 2]
+
+
+def test_lazy_activation_waits_for_setup(app_path, components):
+    (app_path / "components" / "slow.py").write_text(
+        "from dippy.components import Component, event_handler\n"
+        "import asyncio\n\n\n"
+        "class Slow(Component):\n"
+        "    received = []\n"
+        "    set_up = False\n\n"
+        "    async def setup(self):\n"
+        "        await asyncio.sleep(0.05)\n"
+        "        self.set_up = True\n\n"
+        "    @event_handler('slow_event')\n"
+        "    async def on_event(self, data):\n"
+        "        self.received.append((data, self.set_up))\n"
+    )
+    manager = create_manager(
+        app_path,
+        group="      activation: LAZY\n      events:\n        slow: [slow_event]\n",
+    )
+    manager.load_components(app_path)
+
+    async def emit_during_setup():
+        first = asyncio.ensure_future(manager.event_hub.emit("slow_event", 1))
+        await asyncio.sleep(0.005)
+        await manager.event_hub.emit("slow_event", 2)
+        await first
+
+    run(emit_during_setup())
+    slow = next(c for c in manager.components if type(c).__name__ == "Slow")
+    assert slow.received == [(1, True), (2, True)]
+
+
+def test_manifest(app_path, components):
+    group = "      activation: LAZY\n"
+    manager = create_manager(app_path, group=group, manifest=".manifest.json")
+    manager.load_components(app_path)
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+    entry = manager.manifest.get(app_path / "components" / "beta.py")
+    assert entry.components == ("Beta",)
+    assert entry.events == ("beta_event", "shared")
+    assert (app_path / ".manifest.json").exists()
+
+    components.clear()
+    (app_path / "components" / "gamma.py").write_text(
+        COMPONENT_SOURCE.format(name="Gamma", event="changed_event")
+    )
+    manager = create_manager(app_path, group=group, manifest=".manifest.json")
+    manager.load_components(app_path)
+    assert component_names(components) == ["Gamma"]
+    assert sorted(lazy.path.stem for lazy in manager.lazy_components) == [
+        "alpha",
+        "beta",
+    ]
+
+    emit(manager, "alpha_event", 1)
+    assert component_names(components) == ["Alpha", "Gamma"]
+
+
+def test_manifest_unchanged_on_warm_start(app_path, components, monkeypatch):
+    manager = create_manager(app_path, manifest=".manifest.json")
+    manager.load_components(app_path)
+    os.utime(app_path / ".manifest.json", ns=(0, 0))
+    hashed = []
+    monkeypatch.setattr(
+        ComponentManifest, "_hash", lambda self, file: hashed.append(file)
+    )
+
+    components.clear()
+    manager = create_manager(app_path, manifest=".manifest.json")
+    manager.load_components(app_path)
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+    assert hashed == []
+    assert (app_path / ".manifest.json").stat().st_mtime_ns == 0
+
+
+def test_manifest_directory_listing(tmp_path):
+    manifest = ComponentManifest(tmp_path / "manifest.json")
+    (tmp_path / "components").mkdir()
+    (tmp_path / "components" / "a.py").write_text("")
+    listed = []
+
+    def predicate(path):
+        listed.append(path.name)
+        return True
+
+    assert manifest.list_directory(tmp_path / "components", predicate)
+    manifest.save()
+    manifest = ComponentManifest.load(tmp_path / "manifest.json")
+    assert [
+        path.name
+        for path in manifest.list_directory(tmp_path / "components", predicate)
+    ] == ["a.py"]
+    assert listed == ["a.py"]
+
+    (tmp_path / "components" / "b.py").write_text("")
+    os.utime(tmp_path / "components", ns=(0, 0))
+    assert sorted(
+        path.name
+        for path in manifest.list_directory(tmp_path / "components", predicate)
+    ) == ["a.py", "b.py"]
+
+
+def test_manifest_keeps_touched_files(tmp_path):
+    path = tmp_path / "component.py"
+    path.write_text("pass")
+    manifest = ComponentManifest(tmp_path / "manifest.json")
+    manifest.record(path, ["Component"], ["event"])
+    os.utime(path, ns=(0, 0))
+    assert manifest.get(path).events == ("event",)
+
+    path.write_text("changed")
+    assert manifest.get(path) is None
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def test_unload(app_path, components):
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    run(manager.unload(app_path / "components" / "beta.py"))
+    assert component_names(components) == ["Alpha", "Gamma"]
+    assert sorted(type(c).__name__ for c in manager.components) == ["Alpha", "Gamma"]
+
+    emit(manager, "beta_event", 1)
+    emit(manager, "shared", 2)
+    received = {type(c).__name__: c.received for c in manager.components}
+    assert received == {"Alpha": [2], "Gamma": [2]}
+
+
+def test_reload(app_path, components):
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    path = app_path / "components" / "beta.py"
+    path.write_text(COMPONENT_SOURCE.format(name="Beta", event="new_event"))
+    (beta,) = run(manager.reload(path))
+    assert beta.set_up
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+
+    emit(manager, "beta_event", 1)
+    emit(manager, "new_event", 2)
+    assert beta.received == [2]
+    assert len(manager.components) == 3
+
+
+def test_reload_failure_keeps_components(app_path, components):
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    path = app_path / "components" / "beta.py"
+    path.write_text(
+        COMPONENT_SOURCE.format(name="Beta", event="new_event") + "raise ValueError\n"
+    )
+    with pytest.raises(ValueError):
+        run(manager.reload(path))
+
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+    emit(manager, "beta_event", 1)
+    beta = next(c for c in manager.components if type(c).__name__ == "Beta")
+    assert beta.received == [1]
+
+
+FAILING_TEARDOWN = """
+
+    async def teardown(self):
+        raise RuntimeError("teardown")
+"""
+
+
+def test_reload_failed_teardown(app_path, components):
+    path = app_path / "components" / "beta.py"
+    path.write_text(
+        COMPONENT_SOURCE.format(name="Beta", event="beta_event") + FAILING_TEARDOWN
+    )
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    path.write_text(COMPONENT_SOURCE.format(name="Beta", event="new_event"))
+    (beta,) = run(manager.reload(path))
+
+    emit(manager, "new_event", 1)
+    assert beta.received == [1]
+    assert component_names(components) == ["Alpha", "Beta", "Gamma"]
+
+
+def test_reload_changed(app_path, components):
+    manager = create_manager(app_path)
+    manager.load_components(app_path)
+    manager.create_components()
+    changed = app_path / "components" / "alpha.py"
+    changed.write_text(COMPONENT_SOURCE.format(name="Delta", event="delta_event"))
+    deleted = app_path / "components" / "gamma.py"
+    deleted.unlink()
+    assert sorted(run(manager.reload_changed())) == [changed, deleted]
+    assert component_names(components) == ["Beta", "Delta"]
+    assert run(manager.reload_changed()) == []
+
+
+def test_watch(app_path, components):
+    manager = create_manager(app_path, watch_interval=0.01)
+    manager.load_components(app_path)
+    manager.create_components()
+
+    async def change_and_wait():
+        await manager.start()
+        (app_path / "components" / "alpha.py").unlink()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(components) == 2:
+                break
+        manager.stop_watching()
+
+    run(change_and_wait())
+    assert component_names(components) == ["Beta", "Gamma"]
+
+
+def test_watch_continues_after_errors(app_path, components):
+    (app_path / "components" / "alpha.py").write_text(
+        COMPONENT_SOURCE.format(name="Alpha", event="alpha_event") + FAILING_TEARDOWN
+    )
+    manager = create_manager(app_path, watch_interval=0.01)
+    manager.load_components(app_path)
+    manager.create_components()
+
+    async def change_and_wait():
+        await manager.start()
+        (app_path / "components" / "alpha.py").unlink()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(components) == 2:
+                break
+        (app_path / "components" / "beta.py").write_text(
+            COMPONENT_SOURCE.format(name="Delta", event="delta_event")
+        )
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if "Delta" in component_names(components):
+                break
+        manager.stop_watching()
+
+    run(change_and_wait())
+    assert component_names(components) == ["Delta", "Gamma"]
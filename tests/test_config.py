@@ -1,8 +1,13 @@
+from dippy.events import EventHub
+import asyncio
 import bevy
 import dippy.config.config as config
+import dippy.config.loaders as loaders
 import dippy.config.manager as manager
+import json
 import pydantic
 import pytest
+import re
 import os
 
 
@@ -95,3 +100,387 @@ class TestConfig:
     def test_get_value_environment(self, config_context, component_env, model_env):
         c = config_context.create(component_env)
         assert c.config("test_config.py") == model_env(test="testing", env="TEST")
+
+
+class TestConfigCache:
+    @pytest.fixture()
+    def config_dir(self, tmp_path):
+        (tmp_path / "a.cfg").write_text("a")
+        (tmp_path / "b.cfg").write_text("b")
+        return tmp_path
+
+    @pytest.fixture()
+    def loads(self):
+        return []
+
+    def create_manager(self, config_dir, loads, **kwargs):
+        def loader(path):
+            loads.append(path.name)
+            return {"value": path.read_text()}
+
+        m = manager.ConfigManager(str(config_dir), **kwargs)
+        m.register_loader("test", r"\.cfg$", loader)
+        return m
+
+    def test_cached_load(self, config_dir, loads):
+        m = self.create_manager(config_dir, loads)
+        for _ in range(3):
+            assert m.load("a.cfg") == {"value": "a"}
+        assert loads == ["a.cfg"]
+
+    def test_cache_invalidated_on_change(self, config_dir, loads):
+        m = self.create_manager(config_dir, loads)
+        m.load("a.cfg")
+        (config_dir / "a.cfg").write_text("changed")
+        assert m.load("a.cfg") == {"value": "changed"}
+        assert loads == ["a.cfg", "a.cfg"]
+
+    def test_cache_eviction(self, config_dir, loads):
+        m = self.create_manager(config_dir, loads, cache_size=1)
+        m.load("a.cfg")
+        m.load("b.cfg")
+        m.load("b.cfg")
+        m.load("a.cfg")
+        assert loads == ["a.cfg", "b.cfg", "a.cfg"]
+
+    def test_cache_disabled(self, config_dir, loads):
+        m = self.create_manager(config_dir, loads, cache_size=0)
+        m.load("a.cfg")
+        m.load("a.cfg")
+        assert loads == ["a.cfg", "a.cfg"]
+
+
+class TestConfigReload:
+    @pytest.fixture()
+    def config_file(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text('{"section": {"test": "before"}, "other": {"test": "same"}}')
+        return path
+
+    @pytest.fixture()
+    def config_manager(self, config_file):
+        m = manager.ConfigManager(str(config_file.parent))
+        m.register_loader("json", r"\.json$", lambda f: json.loads(f.read_text()))
+        return m
+
+    @pytest.fixture()
+    def model(self):
+        class Model(pydantic.BaseModel):
+            test: str
+
+        return Model
+
+    def test_reload_updates_subscribed_model(self, config_manager, config_file, model):
+        class Component:
+            factory: config.ConfigFactory[model]
+
+        context = bevy.Context().load(config_manager)
+        component = context.create(Component)
+        settings = component.factory("config.json", key="section", subscribe=True)
+        other = component.factory("config.json", key="other", subscribe=True)
+
+        config_file.write_text(
+            '{"section": {"test": "after change"}, "other": {"test": "same"}}'
+        )
+        received = []
+
+        async def listener(event):
+            received.append(event)
+
+        hub = EventHub()
+        hub.on("config_reloaded", listener)
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(config_manager.reload(hub))
+
+        assert settings.test == "after change"
+        assert other.test == "same"
+        assert component.factory("config.json", key="section") is settings
+        assert [(e.file_name, e.errors) for e in received] == [("config.json", [])]
+        assert config_manager.load("config.json")["section"] == {"test": "after change"}
+        assert loop.run_until_complete(config_manager.reload(hub)) == []
+
+    def test_reload_after_load(self, config_manager, config_file, model):
+        settings = model(test="before")
+        config_manager.subscribe(settings, "config.json", key="section")
+        config_file.write_text('{"section": {"test": "loaded first"}}')
+        assert config_manager.load("config.json", key="section") == {
+            "test": "loaded first"
+        }
+
+        changes = asyncio.get_event_loop().run_until_complete(config_manager.reload())
+
+        assert [change.config for change in changes] == [
+            {"section": {"test": "loaded first"}}
+        ]
+        assert settings.test == "loaded first"
+
+    def test_reload_invalid_config(self, config_manager, config_file, model):
+        settings = model(test="before")
+        config_manager.subscribe(settings, "config.json", key="section")
+        config_file.write_text('{"section": {"missing": "test field"}}')
+
+        changes = asyncio.get_event_loop().run_until_complete(config_manager.reload())
+
+        assert settings.test == "before"
+        assert isinstance(changes[0].errors[0], pydantic.ValidationError)
+
+    def test_watch(self, config_manager, config_file):
+        config_manager.load("config.json")
+        received = []
+
+        async def listener(event):
+            received.append(event.config)
+
+        async def run():
+            hub = EventHub()
+            hub.on("config_reloaded", listener)
+            config_manager.watch(hub, interval=0.01)
+            config_file.write_text('{"changed": true}')
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if received:
+                    break
+            config_manager.stop_watching()
+
+        asyncio.get_event_loop().run_until_complete(run())
+        assert received == [{"changed": True}]
+
+    def test_watch_continues_after_errors(self, config_manager, config_file, caplog):
+        config_manager.load("config.json")
+        received = []
+
+        async def listener(event):
+            received.append(event.config)
+            if len(received) == 1:
+                raise ValueError("handler failed")
+
+        async def run():
+            hub = EventHub()
+            hub.on("config_reloaded", listener)
+            config_manager.watch(hub, interval=0.01)
+            for config in ('{"changed": 1}', '{"changed": 22}'):
+                config_file.write_text(config)
+                for _ in range(100):
+                    await asyncio.sleep(0.01)
+                    if json.loads(config) in received:
+                        break
+            config_manager.stop_watching()
+
+        asyncio.get_event_loop().run_until_complete(run())
+        assert received == [{"changed": 1}, {"changed": 22}]
+        assert "Failed to reload the changed config files" in caplog.text
+
+
+class TestConfigModelMemoization:
+    @pytest.fixture()
+    def config_file(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text('{"section": {"test": "before"}}')
+        return path
+
+    @pytest.fixture()
+    def validations(self):
+        return []
+
+    @pytest.fixture()
+    def model(self, validations):
+        class Model(pydantic.BaseModel):
+            test: str
+
+            @pydantic.validator("test", allow_reuse=True)
+            def count(cls, value):
+                validations.append(value)
+                return value
+
+        return Model
+
+    def create_manager(self, config_file, **kwargs):
+        m = manager.ConfigManager(str(config_file.parent), **kwargs)
+        m.register_loader("json", r"\.json$", lambda f: json.loads(f.read_text()))
+        return m
+
+    def test_models_memoized(self, config_file, model, validations):
+        m = self.create_manager(config_file)
+        models = [m.build(model, "config.json", key="section") for _ in range(10)]
+        assert all(item is models[0] for item in models)
+        assert validations == ["before"]
+
+    def test_memoized_model_rebuilt_on_change(self, config_file, model, validations):
+        m = self.create_manager(config_file)
+        before = m.build(model, "config.json", key="section")
+        config_file.write_text('{"section": {"test": "after change"}}')
+        after = m.build(model, "config.json", key="section")
+        assert (before.test, after.test) == ("before", "after change")
+        assert validations == ["before", "after change"]
+
+    def test_memoization_disabled(self, config_file, model, validations):
+        m = self.create_manager(config_file, cache_size=0)
+        m.build(model, "config.json", key="section")
+        m.build(model, "config.json", key="section")
+        assert validations == ["before", "before"]
+
+
+class TestConfigLoaders:
+    def test_yaml_loader(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("logging:\n  level: info\n")
+        assert loaders.yaml_loader.load(path) == {"logging": {"level": "info"}}
+
+    def test_json_loader(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text('{"logging": {"level": "info"}}')
+        assert loaders.json_loader.load(path) == {"logging": {"level": "info"}}
+
+    def test_snapshot_loader(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("value: 1\n")
+        parses = []
+
+        def loader(file_path):
+            parses.append(file_path.name)
+            return loaders.yaml_loader.load(file_path)
+
+        snapshot = loaders.snapshot_loader(
+            manager.ConfigLoader("yaml", r"\.ya?ml$", loader)
+        )
+        assert snapshot.matches("production.yaml")
+        assert snapshot.load(path) == {"value": 1}
+        assert (tmp_path / ".config.yaml.snapshot").exists()
+        assert snapshot.load(path) == {"value": 1}
+        assert parses == ["config.yaml"]
+
+        path.write_text("value: 2\n")
+        assert snapshot.load(path) == {"value": 2}
+        assert parses == ["config.yaml", "config.yaml"]
+
+
+class TestConfigSections:
+    config = (
+        "guild_1:\n"
+        "  name: Guild ü\n"
+        "  roles: [1, 2]\n"
+        "  welcome: |\n"
+        "    Hello\n"
+        "    there\n"
+        "# A comment between sections\n"
+        "guild_2:\n"
+        "  - 3\n"
+        "  - 4\n"
+        "'guild 3': {name: three}\n"
+    )
+
+    def test_yaml_section_loader(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_bytes(self.config.encode().replace(b"\n", b"\r\n"))
+        full = loaders.yaml_loader.load(path)
+        for key in ("guild_1", "guild_2", "guild 3", "missing"):
+            assert loaders.yaml_loader.load_section(
+                path, key
+            ) == manager.get_config_section(full, key)
+
+    @pytest.mark.parametrize(
+        "contents",
+        ["a: &x 1\nb: *x\n", "{a: 1}\n", "a: 1\n---\nb: 2\n", "1: a\nb: 2\n", ""],
+    )
+    def test_yaml_section_loader_cannot_split(self, tmp_path, contents):
+        path = tmp_path / "config.yaml"
+        path.write_text(contents)
+        with pytest.raises(manager.SectionNotLoadable):
+            loaders.yaml_loader.load_section(path, "a")
+
+    def test_lazy_load(self, tmp_path):
+        (tmp_path / "config.yaml").write_text(self.config)
+        parses = []
+
+        def loader(file_path):
+            parses.append(file_path.name)
+            return loaders.yaml_loader.load(file_path)
+
+        m = manager.ConfigManager(
+            str(tmp_path),
+            config_loaders=[
+                manager.ConfigLoader(
+                    "yaml", r"\.ya?ml$", loader, loaders.yaml_loader.section_loader
+                )
+            ],
+            lazy=True,
+        )
+        assert m.load("config.yaml", key="guild_1")["roles"] == [1, 2]
+        assert m.load("config.yaml", key="guild 3") == {"name": "three"}
+        assert m.load("config.yaml", key="missing") == {}
+        assert parses == []
+
+        assert m.load("config.yaml")["guild_2"] == [3, 4]
+        assert parses == ["config.yaml"]
+
+    def test_lazy_load_falls_back(self, tmp_path):
+        (tmp_path / "config.yaml").write_text("a: &x {b: 1}\nc: *x\n")
+        m = manager.ConfigManager(
+            str(tmp_path), config_loaders=[loaders.yaml_loader], lazy=True
+        )
+        assert m.load("config.yaml", key="c") == {"b": 1}
+
+    def test_lazy_section_changes(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("a:\n  value: 1\n")
+        m = manager.ConfigManager(
+            str(tmp_path), config_loaders=[loaders.yaml_loader], lazy=True
+        )
+        assert m.load("config.yaml", key="a") == {"value": 1}
+
+        path.write_text("a:\n  value: 22\n")
+        assert m.load("config.yaml", key="a") == {"value": 22}
+
+
+class TestConfigResolution:
+    def test_first_registered_loader_wins(self):
+        c = manager.ConfigManager(__file__, "")
+        c.register_loader("python", r"\.py$", lambda f: "python")
+        c.register_loader("test", r"^test_", lambda f: "test")
+        assert c.get_loader("test_config.py").name == "python"
+        assert c.get_loader("test_config.txt").name == "test"
+        assert c.get_loader("TEST.PY").name == "python"
+
+    def test_loader_memo_cleared_on_register(self):
+        c = manager.ConfigManager(__file__, "")
+        c.register_loader("python", r"\.py$", lambda f: "python")
+        assert c.get_loader("test_config.py").name == "python"
+        c.register_loader("python", r"\.pyi$", lambda f: "stubs")
+        with pytest.raises(manager.NoConfigLoaderFound):
+            c.get_loader("test_config.py")
+
+    def test_uncombinable_patterns(self):
+        assert manager.combine_patterns([re.compile(r"(a)\1")]) is None
+        c = manager.ConfigManager(__file__, "")
+        c.register_loader("repeated", r"(a)\1\.py$", lambda f: "repeated")
+        assert c.get_loader("aa.py").name == "repeated"
+
+        assert manager.combine_patterns([re.compile(r"(?i)\.toml$")]) is None
+        c.register_loader(
+            manager.ConfigLoader("toml", re.compile(r"(?i)\.toml$"), lambda f: {})
+        )
+        assert c.get_loader("CONFIG.TOML").name == "toml"
+
+    def test_resolved_file_reused_until_directory_changes(self, tmp_path):
+        (tmp_path / "production.cfg").write_text("production")
+        m = manager.ConfigManager(str(tmp_path))
+        m.register_loader("cfg", r"\.cfg$", lambda f: f.read_text())
+        assert m.load("development.cfg", "production.cfg") == "production"
+
+        (tmp_path / "development.cfg").write_text("development")
+        os.utime(tmp_path, ns=(0, 0))
+        assert m.load("development.cfg", "production.cfg") == "development"
+
+    def test_profiler(self, tmp_path):
+        (tmp_path / "config.cfg").write_text("value")
+        profiles = []
+        m = manager.ConfigManager(str(tmp_path), profiler=profiles.append)
+        m.register_loader("cfg", r"\.cfg$", lambda f: f.read_text())
+        m.load("config.cfg")
+        m.load("config.cfg")
+        assert [(p.file_name, p.key, p.cached) for p in profiles] == [
+            ("config.cfg", None, False),
+            ("config.cfg", None, True),
+        ]
+        assert profiles[0].parse_time > 0 and profiles[1].parse_time == 0
+        assert all(p.resolution_time > 0 for p in profiles)
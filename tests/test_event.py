@@ -0,0 +1,50 @@
+from dataclasses import FrozenInstanceError
+from dippy.filters.event import Event, FrozenEvent
+from pytest import raises
+from types import SimpleNamespace
+
+
+class TestEvent:
+    def test_defaults_shared(self):
+        e1, e2 = Event(), Event()
+        assert e1.labels is e2.labels
+        assert e1.role_ids is e2.role_ids
+        assert not e1.labels and not e1.role_ids
+
+    def test_no_instance_dict(self):
+        with raises(AttributeError):
+            Event().foo = "bar"
+
+    def test_equality(self):
+        assert Event(guild_id=1, labels={"a"}) == Event(guild_id=1, labels={"a"})
+        assert Event(guild_id=1) != Event(guild_id=2)
+        assert repr(Event(guild_id=1)).startswith("Event(guild_id=1, channel_id=None")
+
+    def test_frozen_event(self):
+        e = FrozenEvent(guild_id=1, labels={"a"})
+        assert isinstance(e.labels, frozenset)
+        assert hash(e) == hash(FrozenEvent(guild_id=1, labels={"a"}))
+        with raises(FrozenInstanceError):
+            e.guild_id = 2
+
+    def test_from_message(self):
+        author = SimpleNamespace(id=3, roles=[SimpleNamespace(id=4)])
+        message = SimpleNamespace(
+            guild=SimpleNamespace(id=1), channel=SimpleNamespace(id=2), author=author
+        )
+        assert Event.from_message(message) == Event(
+            guild_id=1, channel_id=2, role_ids=frozenset({4}), member_id=3
+        )
+
+    def test_from_direct_message(self):
+        message = SimpleNamespace(
+            guild=None, channel=SimpleNamespace(id=2), author=SimpleNamespace(id=3)
+        )
+        assert Event.from_message(message, labels={"dm"}) == Event(
+            channel_id=2, member_id=3, labels={"dm"}
+        )
+
+    def test_from_member(self):
+        member = SimpleNamespace(id=3, guild=SimpleNamespace(id=1), roles=[])
+        event = FrozenEvent.from_member(member)
+        assert event == FrozenEvent(guild_id=1, member_id=3)
@@ -1,6 +1,10 @@
 from pytest import raises
-from dippy.events import EventHub
+from dippy.events import EventHub, EventHubInstrumentation, HandlerErrors
+from dippy.filters.event import Event
+from dippy.filters.filters import ChannelFilter, GuildFilter, LabelFilter
 import asyncio
+import gc
+import time
 
 
 def test_event_emit():
@@ -81,3 +85,309 @@ def test_event_register_function():
     hub = EventHub()
     with raises(ValueError):
         hub.on("testing", listener)
+
+
+def test_event_emit_concurrent():
+    order = []
+
+    async def slow(event):
+        await asyncio.sleep(0.02)
+        order.append("slow")
+
+    async def fast(event):
+        order.append("fast")
+
+    hub = EventHub(concurrent=True)
+    hub.on("testing", slow)
+    hub.on("testing", fast)
+    asyncio.get_event_loop().run_until_complete(hub.emit("testing", None))
+
+    assert order == ["fast", "slow"]
+
+
+def test_event_emit_concurrent_error_isolation():
+    event_data = []
+
+    async def failing(event):
+        raise RuntimeError("failed")
+
+    async def listener(event):
+        event_data.append(event)
+
+    hub = EventHub(concurrent=True)
+    hub.on("testing", failing)
+    hub.on("testing", listener)
+    with raises(HandlerErrors) as error:
+        asyncio.get_event_loop().run_until_complete(hub.emit("testing", "foobar"))
+
+    assert event_data == ["foobar"]
+    assert [type(e) for e in error.value.exceptions] == [RuntimeError]
+
+
+def test_event_emit_concurrent_limit():
+    running = 0
+    peak = 0
+
+    async def listener(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    hub = EventHub(concurrent=True, max_concurrency=2)
+    for _ in range(5):
+
+        async def handler(event):
+            await listener(event)
+
+        hub.on("testing", handler)
+    asyncio.get_event_loop().run_until_complete(hub.emit("testing", None))
+
+    assert peak == 2
+
+
+def test_event_emit_timeout():
+    async def slow(event):
+        await asyncio.sleep(1)
+
+    hub = EventHub(concurrent=True, handler_timeout=0.01)
+    hub.on("testing", slow)
+    with raises(HandlerErrors) as error:
+        asyncio.get_event_loop().run_until_complete(hub.emit("testing", None))
+
+    assert isinstance(error.value.exceptions[0], asyncio.TimeoutError)
+
+
+def test_event_filtered_handlers():
+    received = []
+
+    async def guild_listener(event):
+        received.append(("guild", event.guild_id))
+
+    async def channel_listener(event):
+        received.append(("channel", event.channel_id))
+
+    async def inverse_listener(event):
+        received.append(("inverse", event.guild_id))
+
+    hub = EventHub()
+    hub.on("testing", guild_listener, GuildFilter(1) & ~ChannelFilter(3))
+    hub.on("testing", channel_listener, ChannelFilter(2) | LabelFilter("a"))
+    hub.on("testing", inverse_listener, ~GuildFilter(1))
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=1, channel_id=2)))
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=1, channel_id=3)))
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=2, labels={"a"})))
+
+    assert sorted(received, key=str) == [
+        ("channel", 2),
+        ("channel", None),
+        ("guild", 1),
+        ("inverse", 2),
+    ]
+
+
+def test_event_filtered_explicit_event():
+    received = []
+
+    async def listener(event):
+        received.append(event)
+
+    hub = EventHub()
+    hub.on("testing", listener, GuildFilter(1))
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("testing", "foobar", Event(guild_id=1)))
+    loop.run_until_complete(hub.emit("testing", "ignored", Event(guild_id=2)))
+    loop.run_until_complete(hub.emit("testing", "no event"))
+
+    assert received == ["foobar"]
+
+
+def test_event_filter_updates():
+    received = []
+
+    async def listener(event):
+        received.append(event.guild_id)
+
+    guilds = GuildFilter(1)
+    hub = EventHub()
+    hub.on("testing", listener, guilds & ~ChannelFilter(3))
+    loop = asyncio.get_event_loop()
+    guilds.add(2)
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=2)))
+    guilds.discard(1)
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=1)))
+    hub.stop("testing", listener)
+    guilds.add(3)
+    loop.run_until_complete(hub.emit("testing", Event(guild_id=3)))
+
+    assert received == [2]
+    assert guilds._watchers == ()
+
+
+def test_event_filtered_handler_order():
+    received = []
+
+    def create_listener(number):
+        async def listener(event):
+            received.append(number)
+
+        return listener
+
+    hub = EventHub()
+    hub.on("testing", create_listener("unfiltered"))
+    for number in range(8):
+        filter_ = GuildFilter(1) if number % 2 else ~ChannelFilter(number)
+        hub.on("testing", create_listener(number), filter_)
+    asyncio.get_event_loop().run_until_complete(hub.emit("testing", Event(guild_id=1)))
+
+    assert received == ["unfiltered", *range(8)]
+
+
+def test_event_stop_filtered():
+    received = []
+
+    async def listener(event):
+        received.append(event)
+
+    hub = EventHub()
+    hub.on("testing", listener, GuildFilter(1))
+    hub.stop("testing", listener)
+    asyncio.get_event_loop().run_until_complete(hub.emit("testing", Event(guild_id=1)))
+
+    assert received == []
+    with raises(KeyError):
+        hub.stop("testing", listener)
+
+
+def test_event_instrumentation():
+    async def fast(event):
+        pass
+
+    async def slow(event):
+        await asyncio.sleep(0.02)
+
+    async def failing(event):
+        raise ValueError()
+
+    hub = EventHub(
+        concurrent=True,
+        instrumentation=EventHubInstrumentation(slow_handler_threshold=0.01),
+    )
+    hub.on("testing", fast)
+    hub.on("testing", slow)
+    hub.on("other", failing)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("testing", None))
+    loop.run_until_complete(hub.emit("testing", None))
+    with raises(HandlerErrors):
+        loop.run_until_complete(hub.emit("other", None))
+
+    stats = hub.stats()
+    assert stats.events["testing"].calls == 2
+    assert stats.events["testing"].latency.quantile(0.5) >= 0.02
+    assert stats.events["other"].errors == 1
+
+    slow_stats = stats.handlers["testing", handler_key(slow)]
+    assert (slow_stats.calls, slow_stats.errors, slow_stats.slow) == (2, 0, 2)
+    assert slow_stats.latency.count == 2
+    assert 0.02 <= slow_stats.latency.quantile(0.99) <= slow_stats.latency.max
+    assert stats.slowest_handlers(limit=1)[0][0] == ("testing", handler_key(slow))
+
+    failing_stats = stats.handlers["other", handler_key(failing)]
+    assert (failing_stats.calls, failing_stats.errors) == (1, 1)
+    assert EventHub().stats() is None
+
+
+def handler_key(handler):
+    return f"{handler.__module__}.{handler.__qualname__}"
+
+
+def test_event_loop_lag_monitor():
+    instrumentation = EventHubInstrumentation()
+
+    async def block():
+        instrumentation.start_loop_lag_monitor(0.001)
+        await asyncio.sleep(0.005)
+        time.sleep(0.02)
+        await asyncio.sleep(0.005)
+        instrumentation.stop_loop_lag_monitor()
+
+    asyncio.get_event_loop().run_until_complete(block())
+
+    lag = instrumentation.stats().loop_lag
+    assert lag.count > 0
+    assert lag.max >= 0.015
+
+
+def test_event_change_handlers_during_emit():
+    received = []
+
+    async def late(event):
+        received.append("late")
+
+    async def first(event):
+        received.append("first")
+        hub.stop("testing", second)
+        hub.on("testing", late)
+
+    async def second(event):
+        received.append("second")
+
+    hub = EventHub()
+    hub.on("testing", first)
+    hub.on("testing", second)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("testing", None))
+    assert received == ["first", "second"]
+
+    received.clear()
+    hub.stop("testing", first)
+    loop.run_until_complete(hub.emit("testing", None))
+    assert received == ["late"]
+
+
+def test_event_weak_handlers():
+    received = []
+
+    class Listener:
+        def __init__(self, name):
+            self.name = name
+
+        async def handle(self, event):
+            received.append(self.name)
+
+    kept, dropped, stopped = Listener("kept"), Listener("dropped"), Listener("stopped")
+    hub = EventHub(weak_handlers=True)
+    hub.on("testing", kept.handle)
+    hub.on("testing", dropped.handle)
+    hub.on("testing", stopped.handle)
+    hub.on("filtered", dropped.handle, GuildFilter(1))
+    hub.stop("testing", stopped.handle)
+    del dropped
+    gc.collect()
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("testing", None))
+    loop.run_until_complete(hub.emit("filtered", Event(guild_id=1)))
+    assert received == ["kept"]
+    assert len(hub._handlers["testing"]) == 1
+    assert not hub._routers["filtered"]
+
+
+def test_event_strong_handler_in_weak_hub():
+    received = []
+
+    def create_listener():
+        async def listener(event):
+            received.append(event)
+
+        return listener
+
+    hub = EventHub(weak_handlers=True)
+    hub.on("testing", create_listener(), weak=False)
+    gc.collect()
+    asyncio.get_event_loop().run_until_complete(hub.emit("testing", "kept"))
+
+    assert received == ["kept"]
@@ -0,0 +1,69 @@
+from pytest import fixture, raises
+from dippy.labels.executor_store import ExecutorStore
+from dippy.labels.datastore import NoLabelsProvided
+from dippy.labels.memory_store import MemoryStore
+import asyncio
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+class TestExecutorStore:
+    @fixture
+    def datastore(self):
+        store = ExecutorStore(MemoryStore())
+        yield store
+        store.shutdown()
+
+    def test_set_get_label(self, datastore):
+        run(datastore.set_label("message", 0, "foo", "bar"))
+        assert run(datastore.get_object_labels("message", 0))["foo"] == "bar"
+
+    def test_get_update_labels(self, datastore):
+        run(datastore.set_label("message", 0, "foo", "bar"))
+        run(datastore.set_label("server", 0, "foo", "baz"))
+        run(datastore.update_label("new", "value", object_id=0))
+        labels = run(datastore.get_labels(new="value"))
+        assert [item["object_type"] for item in labels] == ["message", "server"]
+
+    def test_clear_labels(self, datastore):
+        run(datastore.set_label("message", 0, "foo", "bar"))
+        run(datastore.clear_label("foo", foo="bar"))
+        assert "foo" not in run(datastore.get_object_labels("message", 0))
+        run(datastore.clear_labels("message", 0))
+        assert run(datastore.get_labels(object_type="message")) == ()
+
+    def test_method_label(self, datastore):
+        run(datastore.set_label("message", 0, "method", "dm"))
+        assert len(run(datastore.get_labels(method="dm"))) == 1
+        run(datastore.update_label("foo", "bar", method="dm"))
+        run(datastore.clear_label("foo", method="dm"))
+
+    def test_errors_propagate(self, datastore):
+        with raises(NoLabelsProvided):
+            run(datastore.clear_label("foo"))
+
+    def test_concurrent_calls(self, datastore):
+        async def set_many():
+            await asyncio.gather(
+                *(datastore.set_label("user", i, "n", i) for i in range(50))
+            )
+
+        run(set_many())
+        assert len(run(datastore.get_labels(object_type="user"))) == 50
+
+    def test_bulk_operations(self, datastore):
+        run(datastore.set_labels_many(("user", i, "n", i) for i in range(5)))
+        labels = run(datastore.get_object_labels_many([("user", 4), ("user", 0)]))
+        assert [item["n"] for item in labels] == [4, 0]
+        run(datastore.clear_labels_many([("user", i) for i in range(5)]))
+        assert run(datastore.get_labels()) == ()
+
+    def test_labels_copied(self, datastore):
+        run(datastore.set_label("user", 0, "n", 0))
+        labels = run(datastore.get_object_labels("user", 0))
+        (matched,) = run(datastore.get_labels(n=0))
+        (bulk,) = run(datastore.get_object_labels_many([("user", 0)]))
+        run(datastore.set_label("user", 0, "n", 1))
+        assert labels["n"] == matched["n"] == bulk["n"] == 0
@@ -1,3 +1,4 @@
+from dippy.filters.compiler import simplify
 from dippy.filters.filters import (
     LabelFilter,
     GlobalFilter,
@@ -72,3 +73,64 @@ class TestFilters:
         assert f.matches(Event(role_ids={1, 2}))
         assert f.matches(Event(role_ids={1, 3}))
         assert not f.matches(Event(role_ids={3}))
+
+    def test_compile_matches_interpreted(self):
+        f = (
+            (GuildFilter(1) | GuildFilter(2) | ~~ChannelFilter(3))
+            & ~UserFilter(4)
+            & (LabelFilter("a") | RoleFilter(5) | LabelFilter("b"))
+        )
+        predicate = f.compile()
+        events = [
+            Event(guild_id=g, channel_id=c, member_id=m, labels=l, role_ids=r)
+            for g in (1, 2, 9)
+            for c in (3, 9)
+            for m in (4, 9)
+            for l in (set(), {"a"}, {"b", "c"})
+            for r in (set(), {5})
+        ]
+        assert [predicate(e) for e in events] == [f.matches(e) for e in events]
+
+    def test_compile_merges_id_filters(self):
+        f = GuildFilter(1) | GuildFilter(2) | GuildFilter(3)
+        simplified = simplify(f)
+        assert isinstance(simplified, GuildFilter)
+        assert set(simplified.guild_ids) == {1, 2, 3}
+
+    def test_compile_intersects_id_filters(self):
+        f = GuildFilter(1, 2) & GuildFilter(2, 3)
+        predicate = f.compile()
+        assert predicate(Event(guild_id=2))
+        assert not predicate(Event(guild_id=1))
+        assert not predicate(Event(guild_id=3))
+
+    def test_compile_removes_double_negation(self):
+        f = ~~GuildFilter(1)
+        assert isinstance(simplify(f), GuildFilter)
+        assert f.compile()(Event(guild_id=1))
+
+    def test_compile_global_filter(self):
+        assert (GuildFilter(1) | GlobalFilter()).compile()(Event())
+        assert not (~GlobalFilter()).compile()(Event())
+
+    def test_compile_custom_filter(self):
+        class EvenGuildFilter(GuildFilter):
+            def matches(self, event: Event) -> bool:
+                return event.guild_id % 2 == 0
+
+        predicate = (EvenGuildFilter() & ChannelFilter(1)).compile()
+        assert predicate(Event(guild_id=2, channel_id=1))
+        assert not predicate(Event(guild_id=3, channel_id=1))
+
+    def test_id_filter_add_discard(self):
+        for filter_type, attribute in (
+            (GuildFilter, "guild_id"),
+            (ChannelFilter, "channel_id"),
+            (UserFilter, "member_id"),
+        ):
+            f = filter_type(1)
+            f.add(2, 3)
+            assert f.matches(Event(**{attribute: 3}))
+            f.discard(1, 4)
+            assert not f.matches(Event(**{attribute: 1}))
+            assert f.matches(Event(**{attribute: 2}))
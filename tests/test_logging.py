@@ -0,0 +1,205 @@
+from dippy.config.loaders import yaml_loader
+from dippy.config.manager import ConfigManager
+import bevy
+import dippy.logging
+import json
+import logging
+import logging.handlers
+import pytest
+import threading
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.append(threading.current_thread())
+
+
+class CountingArgument:
+    def __init__(self):
+        self.formatted = 0
+        self.threads = []
+
+    def __str__(self):
+        self.formatted += 1
+        self.threads.append(threading.current_thread())
+        return "argument"
+
+
+@pytest.fixture()
+def handler():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    handler = RecordingHandler()
+    root.handlers[:] = [handler]
+    yield handler
+    dippy.logging.stop_queue_listener()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def create_logging(tmp_path, name="test", level="debug"):
+    (tmp_path / "config.yaml").write_text(f"logging:\n  level: {level}\n")
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(tmp_path), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    return context.create(dippy.logging.Logging, name)
+
+
+def test_lazy_formatting(tmp_path, handler):
+    logger = create_logging(tmp_path, level="info")
+    argument = CountingArgument()
+    logger.debug("Skipped %s", argument)
+    assert argument.formatted == 0
+    logger.info("Logged %s", argument)
+    assert handler.records[0].getMessage() == "Logged argument"
+
+
+def test_caller_is_reported(tmp_path, handler):
+    logger = create_logging(tmp_path)
+    logger.warning("From the test")
+    (record,) = handler.records
+    assert record.funcName == "test_caller_is_reported"
+    assert record.filename == "test_logging.py"
+
+
+def test_queue_listener(tmp_path, handler):
+    logger = create_logging(tmp_path)
+    logger.setup_logger(queue=True)
+    root = logging.getLogger()
+    assert handler not in root.handlers
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+    logger.debug("Queued %d", 1)
+    dippy.logging.stop_queue_listener()
+    (record,) = handler.records
+    assert record.getMessage() == "Queued 1"
+    assert handler.threads[0] is not threading.current_thread()
+    assert handler in root.handlers
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+
+def test_queue_listener_formats_on_listener_thread(tmp_path, handler):
+    argument = CountingArgument()
+    logger = create_logging(tmp_path)
+    logger.setup_logger(queue=True)
+    logger.debug("Queued %s", argument)
+    dippy.logging.stop_queue_listener()
+    assert threading.current_thread() not in argument.threads
+    assert handler.records[0].getMessage() == "Queued argument"
+
+
+def test_queue_listener_structured_exception(tmp_path, handler):
+    handler.setFormatter(dippy.logging.JSONFormatter())
+    logger = create_logging(tmp_path)
+    logger.setup_logger(queue=True)
+    try:
+        raise ValueError("failed")
+    except ValueError:
+        logger.error("Handling %s", "event", exc_info=True)
+    dippy.logging.stop_queue_listener()
+
+    output = json.loads(handler.format(handler.records[0]))
+    assert output["message"] == "Handling event"
+    assert "ValueError: failed" in output["exception"]
+
+
+def test_sampling_settings(tmp_path):
+    (tmp_path / "config.yaml").write_text(
+        "logging:\n"
+        "  output: json\n"
+        "  sampling:\n"
+        "    dippy.hub: 1-in-10\n"
+        "    dippy.events: {per_second: 5}\n"
+    )
+    context = bevy.Context()
+    context.load(
+        ConfigManager(
+            str(tmp_path), config_files=["config.yaml"], config_loaders=[yaml_loader]
+        )
+    )
+    settings = context.create(dippy.logging.Logging, "test").settings
+    assert settings.output == dippy.logging.LogOutputEnum.JSON
+    assert settings.sampling == {
+        "dippy.hub": dippy.logging.LogSampling(every=10),
+        "dippy.events": dippy.logging.LogSampling(per_second=5),
+    }
+
+    assert dippy.logging._parse_sampling("a=1-in-3, b.c = 20/s") == {
+        "a": dippy.logging.LogSampling(every=3),
+        "b.c": dippy.logging.LogSampling(per_second=20),
+    }
+    with pytest.raises(ValueError):
+        dippy.logging._parse_sampling("a=1-in-0")
+    with pytest.raises(ValueError):
+        dippy.logging._parse_sampling("a=often")
+
+
+def test_sampling_one_in_n(handler):
+    handler.addFilter(
+        dippy.logging.LogSampler({"sampled": dippy.logging.LogSampling(every=3)})
+    )
+    logger = logging.getLogger("sampled.child")
+    logger.setLevel(logging.DEBUG)
+    for index in range(7):
+        logger.debug("Record %d", index)
+    logger.warning("Always kept")
+    logging.getLogger("other").warning("Not sampled")
+
+    messages = [record.getMessage() for record in handler.records]
+    assert messages == [
+        "Record 0",
+        "Record 3",
+        "Record 6",
+        "Always kept",
+        "Not sampled",
+    ]
+    assert [getattr(record, "dropped", 0) for record in handler.records[:3]] == [
+        0,
+        2,
+        2,
+    ]
+
+
+def test_sampling_per_second(handler):
+    now = [0.0]
+    handler.addFilter(
+        dippy.logging.LogSampler(
+            {"sampled": dippy.logging.LogSampling(per_second=2)}, clock=lambda: now[0]
+        )
+    )
+    logger = logging.getLogger("sampled")
+    logger.setLevel(logging.DEBUG)
+    for _ in range(5):
+        logger.debug("First second")
+    now[0] = 1.5
+    logger.debug("Next second")
+
+    assert len(handler.records) == 3
+    assert handler.records[2].dropped == 3
+
+
+def test_structured_output():
+    record = logging.LogRecord(
+        "dippy.hub", logging.INFO, __file__, 1, "Dispatched %s", ("ready",), None
+    )
+    record.created = 0.25
+    record.event = "on ready"
+    record._private = True
+
+    assert dippy.logging.JSONFormatter().format(record) == (
+        '{"time":"1970-01-01T00:00:00.250Z","level":"INFO","logger":"dippy.hub",'
+        '"message":"Dispatched ready","event":"on ready"}'
+    )
+    assert dippy.logging.LogfmtFormatter().format(record) == (
+        "time=1970-01-01T00:00:00.250Z level=INFO logger=dippy.hub "
+        'message="Dispatched ready" event="on ready"'
+    )
@@ -1,4 +1,4 @@
-from pytest import fixture
+from pytest import fixture, raises
 from dippy.labels.memory_store import MemoryStore
 from dippy.labels.datastore import NoLabelsProvided
 
@@ -56,3 +56,85 @@ class TestMemoryStore:
         populated_store.update_label("new", "value", object_id=0)
         assert populated_store.get_object_labels("message", 0)["new"] == "value"
         assert populated_store.get_object_labels("server", 0)["new"] == "value"
+
+    def test_get_labels_insertion_order(self, datastore):
+        datastore.set_label("user", 2, "team", "red")
+        datastore.set_label("user", 1, "team", "blue")
+        datastore.set_label("user", 3, "team", "red")
+        datastore.set_label("user", 1, "team", "red")
+        labels = datastore.get_labels(team="red", object_type="user")
+        assert [item["object_id"] for item in labels] == [2, 1, 3]
+
+    def test_get_labels_after_clear(self, populated_store):
+        populated_store.clear_labels("server", 0)
+        assert populated_store.get_labels(name="John") == ()
+        assert len(populated_store.get_labels(object_id=0)) == 1
+
+    def test_get_labels_changed_value(self, populated_store):
+        populated_store.set_label("message", 0, "foo", "baz")
+        assert populated_store.get_labels(foo="bar") == ()
+        assert populated_store.get_labels(foo="baz")[0]["object_type"] == "message"
+
+    def test_get_labels_unhashable_value(self, datastore):
+        datastore.set_label("user", 0, "roles", [1, 2])
+        datastore.set_label("user", 1, "roles", [3])
+        labels = datastore.get_labels(roles=[1, 2])
+        assert [item["object_id"] for item in labels] == [0]
+
+    def test_object_labels_read_only(self, populated_store):
+        labels = populated_store.get_object_labels("message", 0)
+        assert dict(labels) == {
+            "foo": "bar",
+            "bar": "foo",
+            "object_type": "message",
+            "object_id": 0,
+        }
+        assert len(labels) == 4
+        with raises(TypeError):
+            labels["foo"] = "baz"
+
+    def test_object_labels_hide_stored_object_keys(self, datastore):
+        datastore.set_label("message", 0, "object_id", 5)
+        labels = datastore.get_object_labels("message", 0)
+        assert labels["object_id"] == 0
+        assert list(labels) == ["object_type", "object_id"]
+
+    def test_set_labels_many(self, datastore):
+        datastore.set_labels_many(
+            ("user", user_id, "team", user_id % 2) for user_id in range(10)
+        )
+        datastore.set_labels_many([("user", 0, "team", 5)])
+        assert [item["object_id"] for item in datastore.get_labels(team=1)] == [
+            1,
+            3,
+            5,
+            7,
+            9,
+        ]
+        assert datastore.get_object_labels("user", 0)["team"] == 5
+
+    def test_get_object_labels_many(self, populated_store):
+        labels = populated_store.get_object_labels_many(
+            [("server", 0), ("message", 1), ("message", 0)]
+        )
+        assert [dict(item) for item in labels] == [
+            {"name": "John", "object_type": "server", "object_id": 0},
+            {"object_type": "message", "object_id": 1},
+            {"foo": "bar", "bar": "foo", "object_type": "message", "object_id": 0},
+        ]
+
+    def test_clear_labels_many(self, populated_store):
+        populated_store.clear_labels_many([("message", 0), ("server", 0)])
+        assert populated_store.get_labels() == ()
+
+    def test_clear_labels_many_updates_indexes(self, populated_store):
+        populated_store.set_label("message", 1, "foo", "bar")
+        populated_store.set_label("message", 0, "tags", ["a"])
+        populated_store.clear_labels_many([("message", 0), ("server", 0)])
+        assert [
+            item["object_id"] for item in populated_store.get_labels(foo="bar")
+        ] == [1]
+        assert populated_store.get_labels(object_id=0) == ()
+        assert populated_store.get_labels(tags=["a"]) == ()
+        assert list(populated_store._label_index) == [("foo", "bar")]
+        assert not populated_store._unhashable_labels["tags"]
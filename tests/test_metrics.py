@@ -0,0 +1,236 @@
+from pytest import raises
+from dippy.bot import Bot
+from dippy.components.manager import ComponentTiming
+from dippy.config.manager import ConfigManager
+from dippy.events import EventHub, EventHubInstrumentation
+from dippy.labels.memory_store import MemoryStore
+from dippy.labels.timed_store import TimedDatastore
+from dippy.metrics import MetricsRegistry, MetricsServer
+from dippy.metrics.collectors import (
+    ComponentTimingCollector,
+    ConfigLoadMetrics,
+    EventHubCollector,
+)
+import asyncio
+
+
+def samples(registry):
+    return {
+        line.rpartition(" ")[0]: line.rpartition(" ")[2]
+        for line in registry.export().decode().splitlines()
+        if not line.startswith("#")
+    }
+
+
+def test_registry_export():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.\nServed.", ("path",))
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    registry.gauge("temperature", "Current temperature.").set(21.5)
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.export().decode() == (
+        "# HELP requests_total Requests.\\nServed.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b"} 3\n'
+        "# HELP temperature Current temperature.\n"
+        "# TYPE temperature gauge\n"
+        "temperature 21.5\n"
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1.0"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+    )
+
+
+def test_registry_renders_changed_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.")
+    counter.inc()
+    registry.export()
+    rendered = counter.labels()._rendered
+    registry.export()
+    assert counter.labels()._rendered is rendered
+
+    counter.inc()
+    assert samples(registry)["events_total"] == "2"
+
+
+def test_registry_validation():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events.", ("name",))
+    assert registry.counter("events_total", "Events.", ("name",))
+    with raises(ValueError):
+        registry.gauge("events_total", "Events.", ("name",))
+    with raises(ValueError):
+        registry.counter("invalid-name", "Invalid.")
+    with raises(ValueError):
+        registry.counter("events_total", "Events.", ("name",)).labels()
+    with raises(ValueError):
+        registry.counter("events_total", "Events.", ("name",)).labels("a").inc(-1)
+
+
+def test_event_hub_collector():
+    async def handler(event):
+        pass
+
+    instrumentation = EventHubInstrumentation()
+    hub = EventHub(instrumentation=instrumentation)
+    hub.on("ready", handler)
+    registry = MetricsRegistry()
+    registry.add_collector(EventHubCollector(registry, instrumentation))
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(hub.emit("ready", None))
+
+    handler_name = f"{handler.__module__}.{handler.__qualname__}"
+    exported = samples(registry)
+    assert exported['dippy_event_emits_total{event="ready"}'] == "1"
+    assert (
+        exported[
+            f'dippy_event_handler_calls_total{{event="ready",handler="{handler_name}"}}'
+        ]
+        == "1"
+    )
+
+    loop.run_until_complete(hub.emit("ready", None))
+    exported = samples(registry)
+    assert exported['dippy_event_emits_total{event="ready"}'] == "2"
+    assert (
+        exported[
+            f'dippy_event_handler_duration_seconds_count{{event="ready",handler="{handler_name}"}}'
+        ]
+        == "2"
+    )
+    assert exported["dippy_event_loop_lag_seconds_count"] == "0"
+
+
+def test_config_and_component_metrics(tmp_path):
+    (tmp_path / "config.cfg").write_text("value")
+    registry = MetricsRegistry()
+    m = ConfigManager(str(tmp_path), profiler=ConfigLoadMetrics(registry))
+    m.register_loader("cfg", r"\.cfg$", lambda f: f.read_text())
+    m.load("config.cfg")
+    m.load("config.cfg")
+
+    class Manager:
+        timings = [ComponentTiming("a.py", "import", 0.5)]
+
+    registry.add_collector(ComponentTimingCollector(registry, Manager))
+    exported = samples(registry)
+    assert exported['dippy_config_loads_total{file="config.cfg",cached="false"}'] == "1"
+    assert exported['dippy_config_loads_total{file="config.cfg",cached="true"}'] == "1"
+    assert exported['dippy_config_parse_seconds_count{file="config.cfg"}'] == "1"
+    assert (
+        exported['dippy_component_stage_seconds{name="a.py",stage="import"}'] == "0.5"
+    )
+
+    Manager.timings.append(ComponentTiming("a.py", "import", 0.25))
+    assert (
+        samples(registry)['dippy_component_stage_seconds{name="a.py",stage="import"}']
+        == "0.25"
+    )
+
+
+def test_timed_datastore():
+    registry = MetricsRegistry()
+    store = TimedDatastore(MemoryStore(), registry)
+    store.set_label("message", 0, "foo", "bar")
+    assert store.get_object_labels("message", 0)["foo"] == "bar"
+    with raises(Exception):
+        store.clear_label("foo")
+
+    exported = samples(registry)
+    prefix = 'dippy_datastore_operation_seconds_count{store="MemoryStore",operation='
+    assert exported[prefix + '"set_label"}'] == "1"
+    assert exported[prefix + '"get_object_labels"}'] == "1"
+    assert (
+        exported[
+            'dippy_datastore_operation_errors_total{store="MemoryStore",operation="clear_label"}'
+        ]
+        == "1"
+    )
+
+
+def test_timed_datastore_operation_labels():
+    store = TimedDatastore(MemoryStore(), MetricsRegistry())
+    store.set_label("message", 0, "operation", "a")
+    store.set_label("message", 0, "method", "b")
+    assert len(store.get_labels(operation="a")) == 1
+    assert len(store.get_labels(method="b")) == 1
+
+
+def test_metrics_server():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events.").inc()
+    server = MetricsServer(registry, port=0)
+
+    async def request(request_line):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(request_line + b"\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scrape():
+        await server.start()
+        try:
+            return (
+                await request(b"GET /metrics HTTP/1.1"),
+                await request(b"GET /other HTTP/1.1"),
+                await request(b"POST /metrics HTTP/1.1"),
+            )
+        finally:
+            await server.stop()
+
+    ok, missing, post = asyncio.get_event_loop().run_until_complete(scrape())
+    headers, _, body = ok.partition(b"\r\n\r\n")
+    assert headers.startswith(b"HTTP/1.1 200 OK")
+    assert b"Content-Type: text/plain; version=0.0.4" in headers
+    assert body == registry.export()
+    assert missing.startswith(b"HTTP/1.1 404")
+    assert post.startswith(b"HTTP/1.1 405")
+
+
+def test_bot_serves_metrics(tmp_path, monkeypatch):
+    (tmp_path / "components").mkdir()
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "development.yaml").write_text(
+        "components:\n  groups:\n    - location: components\n"
+        "metrics:\n  enabled: true\n  port: 0\n"
+    )
+    loop = asyncio.new_event_loop()
+
+    class Client:
+        def __init__(self, **kwargs):
+            self.loop = loop
+
+        def run(self, token):
+            pass
+
+    monkeypatch.setattr(Bot, "create_bot_client", lambda self, **kwargs: Client())
+    bot = Bot.create("test", "status", tmp_path)
+    bot.run("token")
+
+    async def scrape():
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", bot.metrics_server.port
+        )
+        writer.write(b"GET /metrics HTTP/1.1\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        bot.event_hub.instrumentation.stop_loop_lag_monitor()
+        await bot.metrics_server.stop()
+        return response
+
+    response = loop.run_until_complete(scrape())
+    loop.close()
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b'dippy_config_loads_total{file="development.yaml"' in response
+    assert b"# TYPE dippy_event_loop_lag_seconds histogram" in response
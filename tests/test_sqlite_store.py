@@ -0,0 +1,107 @@
+from pytest import fixture, raises
+from dippy.labels.sqlite_store import SqliteStore
+from dippy.labels.datastore import NoLabelsProvided
+
+
+class TestSqliteStore:
+    @fixture
+    def datastore(self):
+        store = SqliteStore()
+        yield store
+        store.close()
+
+    @fixture
+    def populated_store(self, datastore):
+        datastore.set_label("message", 0, "foo", "bar")
+        datastore.set_label("message", 0, "bar", "foo")
+        datastore.set_label("server", 0, "name", "John")
+        return datastore
+
+    def test_supported_object_types(self, datastore):
+        assert len(datastore.supported_object_types) > 0
+
+    def test_set_get_label(self, datastore):
+        datastore.set_label("message", 0, "foo", "bar")
+        assert datastore.get_object_labels("message", 0)["foo"] == "bar"
+
+    def test_clear_label(self, populated_store):
+        populated_store.clear_label("foo", foo="bar")
+        assert "foo" not in populated_store.get_object_labels("message", 0)
+
+    def test_clear_label_no_labels(self, populated_store):
+        with raises(NoLabelsProvided):
+            populated_store.clear_label("foo")
+
+    def test_clear_labels(self, populated_store):
+        populated_store.clear_labels("message", 0)
+        assert populated_store.get_object_labels("message", 0) == {
+            "object_type": "message",
+            "object_id": 0,
+        }
+        assert len(populated_store.get_labels(object_id=0)) == 1
+
+    def test_get_labels(self, populated_store):
+        labels = populated_store.get_labels(name="John")
+        assert labels == ({"name": "John", "object_type": "server", "object_id": 0},)
+
+    def test_get_labels_multiple_matches(self, populated_store):
+        labels = populated_store.get_labels(object_id=0)
+        assert [item["object_type"] for item in labels] == ["message", "server"]
+
+    def test_update_label(self, populated_store):
+        populated_store.update_label("bar", "foooo", foo="bar")
+        assert populated_store.get_object_labels("message", 0)["bar"] == "foooo"
+
+    def test_update_multiple_objects(self, populated_store):
+        populated_store.update_label("new", {"nested": [1, 2]}, object_id=0)
+        assert populated_store.get_object_labels("message", 0)["new"] == {
+            "nested": [1, 2]
+        }
+        assert populated_store.get_labels(new={"nested": [1, 2]})[1]["name"] == "John"
+
+    def test_batch_rollback(self, datastore):
+        with raises(RuntimeError):
+            with datastore.batch():
+                datastore.set_label("user", 1, "foo", "bar")
+                raise RuntimeError()
+
+        assert datastore.get_labels(object_type="user") == ()
+
+    def test_persistence(self, tmp_path):
+        store = SqliteStore(tmp_path / "labels.db")
+        store.set_label("user", 1, "foo", "bar")
+        store.close()
+
+        store = SqliteStore(tmp_path / "labels.db")
+        assert store.get_object_labels("user", 1)["foo"] == "bar"
+        store.close()
+
+    def test_set_labels_many(self, datastore):
+        datastore.set_labels_many(
+            ("user", user_id, "team", user_id % 2) for user_id in range(10)
+        )
+        datastore.set_labels_many([("user", 0, "team", 5)])
+        assert [item["object_id"] for item in datastore.get_labels(team=1)] == [
+            1,
+            3,
+            5,
+            7,
+            9,
+        ]
+        assert datastore.get_object_labels("user", 0)["team"] == 5
+
+    def test_get_object_labels_many(self, populated_store):
+        labels = populated_store.get_object_labels_many(
+            [("server", 0), ("message", 1), ("message", 0)]
+        )
+        assert [dict(item) for item in labels] == [
+            {"name": "John", "object_type": "server", "object_id": 0},
+            {"object_type": "message", "object_id": 1},
+            {"foo": "bar", "bar": "foo", "object_type": "message", "object_id": 0},
+        ]
+        labels = populated_store.get_object_labels_many([("server", 0), ("server", 0)])
+        assert [item["name"] for item in labels] == ["John", "John"]
+
+    def test_clear_labels_many(self, populated_store):
+        populated_store.clear_labels_many([("message", 0), ("server", 0)])
+        assert populated_store.get_labels() == ()